@@ -0,0 +1,14 @@
+-- Case-insensitive unique index for the player tag lookups ("player_tag = ? COLLATE NOCASE").
+-- It replaces idx_player_tag, the UNIQUE constraint on player_tag already indexes the exact-case lookups.
+-- Run once per database: sqlite3 player_metrics.db < SQLite-Scripts/Migrate_Player_Tag_Index.sql
+
+-- The CREATE fails if two tags differ only in case, this lists them so they can be merged first
+SELECT group_concat(player_tag, ', ') AS duplicate_player_tags
+  FROM players
+ GROUP BY player_tag COLLATE NOCASE
+HAVING COUNT(*) > 1;
+
+BEGIN;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_player_tag_nocase ON players (player_tag COLLATE NOCASE);
+DROP INDEX IF EXISTS idx_player_tag;
+COMMIT;
@@ -1,9 +1,16 @@
+import functools
+import json
 import logging
 import sqlite3
+import string
 import threading
 
+from contextlib import contextmanager
 from datetime import datetime
 
+from cls_sqlite_pool import SqliteConnectionPool
+from cls_sqlite_tools import SqliteTools
+
 def validate_and_format_date(date_str):
     """
     Validate and format the date to yyyy-mm-dd.
@@ -14,10 +21,55 @@ def validate_and_format_date(date_str):
     except ValueError:
         raise ValueError(f"Invalid date format: {date_str}. Expected format: yyyy-mm-dd")
 
+def writes(method):
+    """
+    Decorator for the repository methods that write, in pooled mode they run on the writer connection one thread at a time.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._writing():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def to_db_integer(value):
+    """
+    Return an OCR number such as "1,234" as the int stored in the INTEGER columns, None stays None.
+    The bulk upserts compare with the stored values, a string never equals the int SQLite returns.
+    """
+    if value is None or isinstance(value, int):
+        return value
+    return int(str(value).replace(",", "").strip())
+
+# SQLite's NOCASE collation only folds the ASCII letters
+_NOCASE_TABLE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+def player_tag_key(player_tag) -> str:
+    """
+    Return the player directory key of a tag: lowercased the way COLLATE NOCASE compares it, ASCII letters only,
+    so the directory and idx_player_tag_nocase agree on which tags are the same player ("ß" and "SS" are not).
+    """
+    return str(player_tag).translate(_NOCASE_TABLE)
+
 class DbRepositorySingleton:
     _instance = None
     _lock = threading.Lock()  # Lock object to ensure thread safety
 
+    # Status of a screenshot in the processed_images ledger
+    IMAGE_COMMITTED = "committed"  # Every row was recorded and the file was sent to trash
+    IMAGE_NEEDS_REVIEW = "needs_review"  # Some text or rows weren't recorded and the file was kept
+
+    # Outcome of each row passed to the bulk upserts
+    ROW_INSERTED = "inserted"
+    ROW_UPDATED = "updated"
+    ROW_UNCHANGED = "unchanged"  # Same values, or a zero score that didn't replace the existing non-zero score
+
+    # Bound parameters per IN (...) lookup, under SQLite's default limit
+    _IN_CHUNK_SIZE = 500
+
+    # Case-insensitive unique index for the player tag lookups, created by SQLite-Scripts/Migrate_Player_Tag_Index.sql
+    PLAYER_TAG_INDEX = "idx_player_tag_nocase"
+    PLAYER_TAG_LOOKUP = "SELECT id FROM players WHERE player_tag = ? COLLATE NOCASE"
+
     def __new__(cls, *args, **kwargs):
         """
         Ensures only one instance of the class is created, even in a multithreaded environment.
@@ -28,12 +80,29 @@ class DbRepositorySingleton:
                     cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, db_path):
+    def __init__(self, db_path, profile="default", pool_size=None):
         """
         Initialize the singleton instance.
+
+        Args:
+            db_path: Database file
+            profile: SQLite PRAGMA profile from config.json, see SqliteTools
+            pool_size: Read connections of the pooled mode, see SqliteConnectionPool. None keeps the single
+                connection, which can only be used by the thread that created the repository.
         """
         if not hasattr(self, '_initialized'):
-            self.connection = sqlite3.connect(db_path)
+            if pool_size:
+                self._pool = SqliteConnectionPool(db_path, profile, max_readers=pool_size)
+                self._connection = None
+            else:
+                self._pool = None
+                self._connection = SqliteTools.connect(db_path, profile)
+            self._player_directory = None  # Loaded on first player lookup, see load_player_directory()
+            self._player_tags_by_id = {}
+            self._player_directory_version = None  # PRAGMA data_version when the directory was loaded
+            self._processed_images_ready = False  # The ledger table is created on first use
+            self._player_tag_index_checked = False  # The query plan of the tag lookup is checked on first load
+            self._transaction_depth = 0  # Open transaction() blocks, the methods only commit outside them
             self._initialized = True
 
     @classmethod
@@ -49,8 +118,89 @@ class DbRepositorySingleton:
         """
         Destructor to handle cleanup automatically if the singleton is deleted.
         """
-        self.connection.close()
+        if self._pool is not None:
+            self._pool.close()
+        else:
+            self._connection.close()
 
+    @property
+    def connection(self):
+        """
+        The connection for the calling thread. In pooled mode that is the writer connection inside the methods that
+        write and transaction() blocks, and the thread's own read connection otherwise.
+        """
+        if self._pool is None:
+            return self._connection
+
+        return self._pool.connection()
+
+    @contextmanager
+    def _writing(self):
+        """
+        Hold the writer connection in pooled mode, other threads wait until the block exits.
+        """
+        if self._pool is None:
+            yield
+        else:
+            with self._pool.writer():
+                yield
+
+    def release_reader(self):
+        """
+        Give the calling thread's read connection back to the pool, for worker threads that are done with the repository.
+        """
+        if self._pool is not None:
+            self._pool.release_reader()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work: the repository methods called inside the block don't commit, everything is committed
+        once when the outermost block exits and rolled back if it raises.
+
+        Blocks can nest, an inner block is a savepoint so an exception caught outside of it only rolls
+        back the inner block's changes. In pooled mode the block holds the writer connection, other threads
+        wait to write until the outermost block exits.
+
+        Usage:
+            with db_repository.transaction():
+                db_repository.upsert_weekend_player_score(weekend_date, player_id, score)
+                ...
+        """
+        with self._writing():
+            savepoint = f"unit_of_work_{self._transaction_depth}"
+            self.connection.execute(f"SAVEPOINT {savepoint}")
+            self._transaction_depth += 1
+
+            try:
+                yield self
+            except BaseException:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self.connection.rollback()
+                else:
+                    self.connection.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                    self.connection.execute(f"RELEASE SAVEPOINT {savepoint}")
+
+                # The cached players and ledger table may be from the rolled back changes
+                self._player_directory = None
+                self._player_tags_by_id = {}
+                self._processed_images_ready = False
+                raise
+            else:
+                self._transaction_depth -= 1
+                self.connection.execute(f"RELEASE SAVEPOINT {savepoint}")
+                if self._transaction_depth == 0:
+                    self.connection.commit()
+
+    def _commit(self):
+        """
+        Commit unless a transaction() block is open, it commits when it exits.
+        """
+        if self._transaction_depth == 0:
+            self.connection.commit()
+
+    @writes
     def upsert_weekend_player_score(self, weekend_date, player_id, score):
         """
         Insert or update extracted data into SQLite database.
@@ -69,10 +219,11 @@ class DbRepositorySingleton:
             END
         """
         cursor.execute(insert_query, (weekend_date, player_id, score))
-        self.connection.commit()
+        self._commit()
 
         return
 
+    @writes
     def insert_weekend_team_rank(self, weekend_date, rank):
         """
         Insert extracted data into SQLite database.
@@ -84,10 +235,11 @@ class DbRepositorySingleton:
             VALUES (?, ?)
             """
         cursor.execute(insert_query, (weekend_date, rank))
-        self.connection.commit()
+        self._commit()
 
         return
 
+    @writes
     def upsert_weekend_team_rank(self, weekend_date, rank):
         """
         Insert or update team rank for a weekend date in SQLite database.
@@ -105,19 +257,21 @@ class DbRepositorySingleton:
             END
             """
         cursor.execute(insert_query, (weekend_date, rank))
-        self.connection.commit()
+        self._commit()
 
         return
 
+    @writes
     def update_weekend_team_score(self, weekend_date, score):
         weekend_date = validate_and_format_date(weekend_date)
         cursor = self.connection.cursor()
         insert_query = """UPDATE team_tournament_results SET team_score = ? WHERE weekend_date = ?"""
         cursor.execute(insert_query, (score, weekend_date))
-        self.connection.commit()
+        self._commit()
 
         return
 
+    @writes
     def upsert_weekend_team_scores(self):
         cursor = self.connection.cursor()
         insert_query = """
@@ -129,10 +283,11 @@ class DbRepositorySingleton:
                 team_score = excluded.team_score;
         """
         cursor.execute(insert_query)
-        self.connection.commit()
+        self._commit()
 
         return
 
+    @writes
     def upsert_weekend_team_score_for_date(self, weekend_date):
         """
         Insert or update team score for a specific weekend date in SQLite database.
@@ -149,10 +304,123 @@ class DbRepositorySingleton:
                 team_score = excluded.team_score;
         """
         cursor.execute(insert_query, (weekend_date, weekend_date))
-        self.connection.commit()
+        self._commit()
 
         return
 
+    def _select_weekend_rows(self, table, columns, weekend_date, player_ids) -> dict:
+        """
+        Return {player_id: (columns...)} for the players that already have a row in the table for the weekend.
+        """
+        existing = {}
+        player_ids = list(dict.fromkeys(player_ids))
+        cursor = self.connection.cursor()
+        for start in range(0, len(player_ids), self._IN_CHUNK_SIZE):
+            chunk = player_ids[start:start + self._IN_CHUNK_SIZE]
+            cursor.execute(
+                f"SELECT player_id, {', '.join(columns)} FROM {table} "
+                f"WHERE weekend_date = ? AND player_id IN ({', '.join('?' * len(chunk))})",
+                (weekend_date, *chunk))
+            for row in cursor.fetchall():
+                existing[row[0]] = tuple(row[1:])
+
+        return existing
+
+    @writes
+    def bulk_upsert_weekend_player_scores(self, weekend_date, rows) -> list:
+        """
+        Upsert many scores for a weekend with one executemany, same conflict rules as upsert_weekend_player_score:
+        a non-zero score replaces the existing score, a zero score only replaces an existing zero.
+        The rows are written as one transaction, nothing is written if any of them fails.
+
+        Args:
+            weekend_date: Weekend the scores are for
+            rows: List of (player_id, score), an OCR score string like "1,234" is stored as an int
+
+        Returns:
+            The outcome of each row, ROW_INSERTED, ROW_UPDATED or ROW_UNCHANGED
+        """
+        weekend_date = validate_and_format_date(weekend_date)
+        rows = [(player_id, to_db_integer(score)) for player_id, score in rows]
+        if not rows:
+            return []
+
+        existing = self._select_weekend_rows("tournament_results", ("score",), weekend_date, [player_id for player_id, score in rows])
+
+        # Work out each outcome in order, a player listed twice sees the score written by the earlier row
+        outcomes = []
+        for player_id, score in rows:
+            current = existing.get(player_id)
+            if current is None:
+                outcomes.append(self.ROW_INSERTED)
+                existing[player_id] = (score,)
+            elif (score != 0 or current[0] == 0) and current[0] != score:
+                outcomes.append(self.ROW_UPDATED)
+                existing[player_id] = (score,)
+            else:
+                outcomes.append(self.ROW_UNCHANGED)
+
+        insert_query = """
+            INSERT INTO tournament_results (weekend_date, player_id, score)
+            VALUES (?, ?, ?)
+            ON CONFLICT(weekend_date, player_id) DO UPDATE SET
+            score = CASE 
+                WHEN excluded.score != 0 THEN excluded.score
+                WHEN tournament_results.score = 0 THEN excluded.score
+                ELSE tournament_results.score
+            END
+        """
+        with self.transaction():
+            self.connection.cursor().executemany(insert_query, [(weekend_date, player_id, score) for player_id, score in rows])
+
+        return outcomes
+
+    @writes
+    def bulk_upsert_weekly_player_stats(self, weekend_date, rows) -> list:
+        """
+        Upsert many players' helps and stars for a weekend with one executemany, same as upsert_weekly_player_stats.
+        The rows are written as one transaction, nothing is written if any of them fails.
+
+        Args:
+            weekend_date: Weekend the stats are for
+            rows: List of (player_id, helps, stars), OCR number strings are stored as ints
+
+        Returns:
+            The outcome of each row, ROW_INSERTED, ROW_UPDATED or ROW_UNCHANGED
+        """
+        weekend_date = validate_and_format_date(weekend_date)
+        rows = [(player_id, to_db_integer(helps), to_db_integer(stars)) for player_id, helps, stars in rows]
+        if not rows:
+            return []
+
+        existing = self._select_weekend_rows("weekly_player_stats", ("helps", "stars"), weekend_date,
+                                             [player_id for player_id, helps, stars in rows])
+
+        outcomes = []
+        for player_id, helps, stars in rows:
+            current = existing.get(player_id)
+            if current is None:
+                outcomes.append(self.ROW_INSERTED)
+            elif current != (helps, stars):
+                outcomes.append(self.ROW_UPDATED)
+            else:
+                outcomes.append(self.ROW_UNCHANGED)
+            existing[player_id] = (helps, stars)
+
+        insert_query = """
+            INSERT INTO weekly_player_stats (weekend_date, player_id, helps, stars)
+                VALUES (?, ?, ?, ?)
+                    ON CONFLICT(weekend_date, player_id) DO UPDATE SET
+                        helps = excluded.helps,
+                        stars = excluded.stars
+        """
+        with self.transaction():
+            self.connection.cursor().executemany(insert_query, [(weekend_date, player_id, helps, stars)
+                                                               for player_id, helps, stars in rows])
+
+        return outcomes
+
+    @writes
     def upsert_weekly_player_stats(self, weekend_date, player_id, helps, stars):
         """
         Insert or update extracted data into SQLite database.
@@ -167,21 +435,99 @@ class DbRepositorySingleton:
                         stars = excluded.stars
         """
         cursor.execute(insert_query, (weekend_date, player_id, helps, stars))
-        self.connection.commit()
+        self._commit()
 
         return
 
-    def get_player_id(self, player_tag):
+    @writes
+    def load_player_directory(self):
+        """
+        Load every player into the in-memory player directory.
+        The directory maps the player_tag_key of each tag to (player_id, on_team, is_active).
+        It is read on the writer connection, whose PRAGMA data_version refresh_player_directory() compares.
+        """
+        if not self._player_tag_index_checked:
+            self._player_tag_index_checked = True
+            if not self.uses_player_tag_index():
+                logging.warning(f"Player tag lookups scan the players table, run SQLite-Scripts/Migrate_Player_Tag_Index.sql "
+                                f"to create {self.PLAYER_TAG_INDEX}: {self.explain_player_tag_lookup()}")
+
         cursor = self.connection.cursor()
-        cursor.execute("SELECT id FROM players WHERE LOWER(player_tag) = LOWER(?)", (player_tag,))
-        row = cursor.fetchone()
-        if row:
-            player_id = row[0]
+        cursor.execute("SELECT id, player_tag, on_team, is_active FROM players")
+        player_directory = {
+            player_tag_key(player_tag): (player_id, bool(on_team), bool(is_active))
+            for player_id, player_tag, on_team, is_active in cursor.fetchall()
+        }
+        self._player_tags_by_id = {entry[0]: key for key, entry in player_directory.items()}
+        self._player_directory = player_directory
+        self._player_directory_version = self._data_version()
+
+        return player_directory
+
+    def _data_version(self):
+        """
+        SQLite's count of the commits other connections made to the database, this connection's own commits don't change it.
+        """
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    @writes
+    def refresh_player_directory(self):
+        """
+        Reload the player directory if another connection, e.g. manage_team_players.py in another process, has
+        committed changes since it was loaded. This connection's own player changes are already in the directory.
+        Long-running callers run it before each batch, it costs one PRAGMA when nothing changed.
+
+        Returns:
+            The player directory
+        """
+        if self._player_directory is None or self._data_version() != self._player_directory_version:
+            return self.load_player_directory()
+
+        return self._player_directory
+
+    def find_player(self, player_tag):
+        """
+        Return (player_id, on_team, is_active) for the player tag (case-insensitive) or None if the player doesn't exist.
+        The player directory is loaded on first use so repeated lookups don't query the database.
+        """
+        if player_tag is None:
+            return None
+
+        # Local reference, in pooled mode another thread's rollback can reset the directory
+        player_directory = self._player_directory
+        if player_directory is None:
+            player_directory = self.load_player_directory()
+
+        return player_directory.get(player_tag_key(player_tag))
+
+    def _update_player_directory(self, player_id, on_team=None, is_active=None):
+        """
+        Keep the player directory in sync after the players table is updated.
+        """
+        if self._player_directory is None:
+            return
+
+        key = self._player_tags_by_id.get(player_id)
+        if key is None:
+            return
+
+        entry_id, entry_on_team, entry_is_active = self._player_directory[key]
+        self._player_directory[key] = (
+            entry_id,
+            entry_on_team if on_team is None else on_team,
+            entry_is_active if is_active is None else is_active,
+        )
+
+    def get_player_id(self, player_tag):
+        player = self.find_player(player_tag)
+        if player:
+            player_id = player[0]
         else:
             player_id = None
 
         return player_id
 
+    @writes
     def get_player_id_create_if_new(self, player_tag, friday_date):
 
         player_id = self.get_player_id(player_tag)
@@ -192,19 +538,73 @@ class DbRepositorySingleton:
         cursor = self.connection.cursor()
         cursor.execute("INSERT INTO players (player_tag, start_date) VALUES (?, ?)", (player_tag, friday_date,))
         player_id = cursor.lastrowid
-        self.connection.commit()
+        self._commit()
+
+        # Add the new player to the directory before the on_team / active updates below
+        if self._player_directory is not None:
+            key = player_tag_key(player_tag)
+            self._player_directory[key] = (player_id, False, False)
+            self._player_tags_by_id[player_id] = key
 
         self.set_player_on_team(player_id)  # Set the player on the team after creation
         self.set_player_active(player_id)  # Set the player as active after creation
 
         return player_id
 
+    @writes
+    def ensure_players(self, player_tags, friday_date) -> list:
+        """
+        Resolve many player tags at once, creating the ones that don't exist yet.
+
+        The tags are looked up in the player directory (case-insensitive). The missing ones are inserted
+        with one executemany, on the team and active with friday_date as the start date like
+        get_player_id_create_if_new, and their ids read back with one query.
+
+        Returns:
+            (player_id, on_team, is_active, created) for each tag, in the same order
+        """
+        if self._player_directory is None:
+            self.load_player_directory()
+
+        # Each new tag is created once, in the spelling it was first seen with
+        new_tags = {}
+        for player_tag in player_tags:
+            key = player_tag_key(player_tag)
+            if key not in self._player_directory and key not in new_tags:
+                new_tags[key] = str(player_tag)
+
+        if new_tags:
+            friday_date = validate_and_format_date(friday_date)
+
+            with self.transaction():
+                cursor = self.connection.cursor()
+                cursor.executemany("INSERT INTO players (player_tag, start_date, on_team, is_active) VALUES (?, ?, 1, 1)",
+                                   [(player_tag, friday_date) for player_tag in new_tags.values()])
+
+                created_tags = list(new_tags.values())
+                for start in range(0, len(created_tags), self._IN_CHUNK_SIZE):
+                    chunk = created_tags[start:start + self._IN_CHUNK_SIZE]
+                    cursor.execute(f"SELECT id, player_tag FROM players WHERE player_tag COLLATE NOCASE IN ({', '.join('?' * len(chunk))})",
+                                   chunk)
+                    for player_id, player_tag in cursor.fetchall():
+                        key = player_tag_key(player_tag)
+                        self._player_directory[key] = (player_id, True, True)
+                        self._player_tags_by_id[player_id] = key
+
+        players = []
+        for player_tag in player_tags:
+            key = player_tag_key(player_tag)
+            player_id, on_team, is_active = self._player_directory[key]
+            players.append((player_id, on_team, is_active, key in new_tags))
+
+        return players
+
     def get_players(self):
 
         cursor = self.connection.cursor()
         cursor.execute("SELECT id AS player_id, player_tag, on_team, is_active, leave_date FROM players WHERE leave_date IS NULL") # Get all players
         rows = cursor.fetchall()
-        self.connection.commit()
+        self._commit()
 
         return rows
 
@@ -213,66 +613,77 @@ class DbRepositorySingleton:
         cursor = self.connection.cursor()
         cursor.execute("SELECT id AS player_id, player_tag, is_active FROM players WHERE on_team = 1") # Get all players
         rows = cursor.fetchall()
-        self.connection.commit()
+        self._commit()
 
         return rows
 
+    @writes
     def reset_scores_for_tournament(self, weekend_date):
         """
         Reset all player scores for a given weekend date to 0.
         """
         cursor = self.connection.cursor()
         cursor.execute("UPDATE tournament_results SET score = 0 WHERE weekend_date = ? AND score IS NULL", (weekend_date,))
-        self.connection.commit()
+        self._commit()
 
         return
 
+    @writes
     def set_player_active(self, player_id):
         """
         Set a player to active in the players table.
         """
         cursor = self.connection.cursor()
         cursor.execute("UPDATE players SET is_active = 1 WHERE id = ?", (player_id,))
-        self.connection.commit()
+        self._commit()
+        self._update_player_directory(player_id, is_active=True)
 
         return
 
+    @writes
     def set_player_inactive(self, player_id):
         """
         Set a player to inactive in the players table.
         """
         cursor = self.connection.cursor()
         cursor.execute("UPDATE players SET is_active = 0 WHERE id = ?", (player_id,))
-        self.connection.commit()
+        self._commit()
+        self._update_player_directory(player_id, is_active=False)
 
         return
 
+    @writes
     def set_player_on_team(self, player_id):
         """
         Set a player to on_team in the players table.
         """
         cursor = self.connection.cursor()
         cursor.execute("UPDATE players SET on_team = 1, leave_date = NULL WHERE id = ?", (player_id,))
-        self.connection.commit()
+        self._commit()
+        self._update_player_directory(player_id, on_team=True)
 
         return
 
-    def set_player_off_team(self, player_id):
+    @writes
+    def set_player_off_team(self, player_id, leave_date=None):
         """
         Set a player to not on_team in the players table.
+        The leave_date defaults to today.
         """
-        # Get the current date
-        current_date = datetime.now()
-
-        # Format the date as yyyy-mm-dd
-        formatted_date = current_date.strftime('%Y-%m-%d')
+        if leave_date is None:
+            # Format the current date as yyyy-mm-dd
+            formatted_date = datetime.now().strftime('%Y-%m-%d')
+        else:
+            formatted_date = validate_and_format_date(leave_date)
 
         cursor = self.connection.cursor()
         cursor.execute("UPDATE players SET on_team = 0, leave_date = ? WHERE id = ?", (formatted_date, player_id,))
-        self.connection.commit()
+        self._commit()
+        self._update_player_directory(player_id, on_team=False)
 
         return
 
+    @writes
     def set_missing_scores_to_zero_for_weekend(self, weekend_date):
         """
         Sets the score to 0 in the tournament_results table for players
@@ -305,11 +716,16 @@ class DbRepositorySingleton:
             cursor.execute(query, (weekend_date, weekend_date))
 
             # Commit the changes
-            self.connection.commit()
+            self._commit()
 
         except sqlite3.Error as e:
             logging.critical(f"An error occurred: {e}")
 
+            # Inside a unit of work the error rolls the whole weekend back instead of committing it part way
+            if self._transaction_depth > 0:
+                raise
+
+    @writes
     def update_player_start_date(self, player_id, start_date):
         """
         Update the player's start_date in the players table if it's earlier than the existing start_date.
@@ -322,10 +738,11 @@ class DbRepositorySingleton:
             current_start_date = row[0]
             if current_start_date is None or start_date < current_start_date:
                 cursor.execute("UPDATE players SET start_date = ? WHERE id = ?", (start_date, player_id))
-        self.connection.commit()
+        self._commit()
 
         return
 
+    @writes
     def update_ranks_for_weekend_date(self, weekend_date):
         weekend_date = validate_and_format_date(weekend_date)
         cursor = self.connection.cursor()
@@ -349,37 +766,140 @@ class DbRepositorySingleton:
 
         # Execute the query with the specified date
         cursor.execute(sql, (weekend_date, weekend_date))
-        self.connection.commit()
+        self._commit()
 
         return
 
+    def _find_player_by_id(self, player_id):
+        player_directory = self._player_directory
+        if player_directory is None:
+            player_directory = self.load_player_directory()
+
+        key = self._player_tags_by_id.get(player_id)
+        return player_directory.get(key) if key is not None else None
+
     def is_player_active(self, player_id):
         """
         Return True if the player is marked active in the players table.
         """
-        cursor = self.connection.cursor()
-        cursor.execute("SELECT is_active FROM players WHERE id = ?", (player_id,))
-        row = cursor.fetchone()
-        if not row:
-            return False
-        try:
-            return bool(row[0])
-        except Exception:
-            return False
+        player = self._find_player_by_id(player_id)
+        return bool(player and player[2])
 
     def is_player_on_team(self, player_id):
         """
         Return True if the player is marked on_team in the players table.
         """
+        player = self._find_player_by_id(player_id)
+        return bool(player and player[1])
+
+    def explain_player_tag_lookup(self) -> list:
+        """
+        Return the EXPLAIN QUERY PLAN details of the case-insensitive player tag lookup.
+        """
         cursor = self.connection.cursor()
-        cursor.execute("SELECT on_team FROM players WHERE id = ?", (player_id,))
+        cursor.execute(f"EXPLAIN QUERY PLAN {self.PLAYER_TAG_LOOKUP}", ("",))
+        return [row[-1] for row in cursor.fetchall()]
+
+    def uses_player_tag_index(self) -> bool:
+        """
+        Check that the case-insensitive player tag lookup searches the index instead of scanning the players table.
+        """
+        return any(self.PLAYER_TAG_INDEX in detail for detail in self.explain_player_tag_lookup())
+
+    @writes
+    def _ensure_processed_images_table(self):
+        """
+        Create the processed_images ledger table the first time it is used.
+        """
+        if self._processed_images_ready:
+            return
+
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS processed_images (
+                image_hash TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL,
+                import_type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                weekend_date TEXT,
+                matched_rows TEXT,
+                recorded_rows TEXT,
+                ocr_seconds REAL,
+                db_seconds REAL,
+                attempts INTEGER NOT NULL DEFAULT 1,
+                processed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self._commit()
+        self._processed_images_ready = True
+
+    def get_processed_image(self, image_hash):
+        """
+        Return the processed_images ledger entry for a screenshot content hash as a dict, or None if it hasn't been processed.
+        matched_rows and recorded_rows are decoded from JSON.
+        """
+        self._ensure_processed_images_table()
+
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            SELECT image_hash, file_name, import_type, status, weekend_date, matched_rows, recorded_rows,
+                   ocr_seconds, db_seconds, attempts, processed_at
+            FROM processed_images WHERE image_hash = ?
+        """, (image_hash,))
         row = cursor.fetchone()
-        if not row:
-            return False
-        try:
-            return bool(row[0])
-        except Exception:
-            return False
+        if row is None:
+            return None
+
+        entry = dict(zip([column[0] for column in cursor.description], row))
+        for column in ('matched_rows', 'recorded_rows'):
+            entry[column] = json.loads(entry[column]) if entry[column] is not None else []
+
+        return entry
+
+    @writes
+    def record_processed_image(self, image_hash, file_name, import_type, status, weekend_date=None,
+                               matched_rows=None, recorded_rows=None, ocr_seconds=None, db_seconds=None):
+        """
+        Insert or update the processed_images ledger entry for a screenshot, counting the attempts.
+
+        Args:
+            image_hash: Content hash of the screenshot, see ProjectTools.get_file_hash
+            file_name: File name of the screenshot when it was processed
+            import_type: The importer, e.g. "tournament_scores" or "team_stats"
+            status: IMAGE_COMMITTED or IMAGE_NEEDS_REVIEW
+            weekend_date: Weekend the screenshot was mapped to
+            matched_rows: Rows matched to players, stored as JSON
+            recorded_rows: Rows written to the database, stored as JSON
+            ocr_seconds: Time spent reading the screenshot
+            db_seconds: Time spent writing its rows
+        """
+        if weekend_date is not None:
+            weekend_date = validate_and_format_date(weekend_date)
+
+        self._ensure_processed_images_table()
+
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            INSERT INTO processed_images (image_hash, file_name, import_type, status, weekend_date,
+                                          matched_rows, recorded_rows, ocr_seconds, db_seconds)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(image_hash) DO UPDATE SET
+                file_name = excluded.file_name,
+                import_type = excluded.import_type,
+                status = excluded.status,
+                weekend_date = excluded.weekend_date,
+                matched_rows = excluded.matched_rows,
+                recorded_rows = excluded.recorded_rows,
+                ocr_seconds = excluded.ocr_seconds,
+                db_seconds = excluded.db_seconds,
+                attempts = processed_images.attempts + 1,
+                processed_at = CURRENT_TIMESTAMP
+        """, (image_hash, file_name, import_type, status, weekend_date,
+              json.dumps(matched_rows if matched_rows is not None else []),
+              json.dumps(recorded_rows if recorded_rows is not None else []),
+              ocr_seconds, db_seconds))
+        self._commit()
+
+        return
 
 # Example usage
 #if __name__ == "__main__":
@@ -0,0 +1,94 @@
+import logging
+import os
+import threading
+import time
+
+class FolderWatcher:
+    """
+    Polls folders for new files, without needing file system event services from the OS.
+
+    A file is ready once its size and modification time haven't changed for settle_seconds, so
+    screenshots that are still being copied or exported aren't picked up half written. Each version of a
+    file is reported once. A file left in the folder is only reported again if it changes, and files that
+    disappear (e.g. sent to trash after a successful import) are forgotten.
+    """
+    def __init__(self, folders, suffix: str = '.png', settle_seconds: float = 3.0):
+        """
+        Args:
+            folders: Folders to watch, not recursive
+            suffix: File suffix to watch for, case-insensitive
+            settle_seconds: How long a file's size and modification time must stay the same before it is ready
+        """
+        self.folders = [os.path.abspath(folder) for folder in folders]
+        self.suffix = suffix.lower()
+        self.settle_seconds = settle_seconds
+
+        self._pending = {}  # path -> ((size, mtime_ns), time the file was first seen with that stat)
+        self._reported = {}  # path -> (size, mtime_ns) when it was reported
+        self._missing_folders = set()
+
+    def poll(self, now: float = None) -> list:
+        """
+        Scan the folders once.
+
+        Returns:
+            Sorted paths of the files that have settled since the last poll
+        """
+        now = time.monotonic() if now is None else now
+
+        seen = set()
+        ready = []
+        for folder in self.folders:
+            try:
+                entries = os.scandir(folder)
+            except FileNotFoundError:
+                if folder not in self._missing_folders:
+                    logging.warning(f"Watched folder {folder} does not exist")
+                    self._missing_folders.add(folder)
+                continue
+            self._missing_folders.discard(folder)
+
+            with entries:
+                for entry in entries:
+                    if not entry.name.lower().endswith(self.suffix) or not entry.is_file():
+                        continue
+
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+
+                    path = entry.path
+                    seen.add(path)
+
+                    signature = (stat.st_size, stat.st_mtime_ns)
+                    if self._reported.get(path) == signature:
+                        continue
+
+                    # Empty files are still being created
+                    pending = self._pending.get(path)
+                    if pending is None or pending[0] != signature or stat.st_size == 0:
+                        self._pending[path] = (signature, now)
+                        continue
+
+                    if now - pending[1] >= self.settle_seconds:
+                        ready.append(path)
+                        self._reported[path] = signature
+                        del self._pending[path]
+
+        for tracked in (self._pending, self._reported):
+            for path in [path for path in tracked if path not in seen]:
+                del tracked[path]
+
+        return sorted(ready)
+
+    def watch(self, poll_seconds: float = 2.0, stop_event: threading.Event = None):
+        """
+        Yield each file as it settles, polling every poll_seconds until stop_event is set.
+        """
+        stop_event = stop_event or threading.Event()
+
+        while not stop_event.is_set():
+            for path in self.poll():
+                yield path
+            stop_event.wait(poll_seconds)
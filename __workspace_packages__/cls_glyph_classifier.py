@@ -0,0 +1,170 @@
+import cv2
+import numpy as np
+import os
+
+class GlyphClassifier:
+    """
+    Nearest-template classifier for the digits (and '#' / ',') drawn in the game font.
+
+    A thresholded image (white text on black) is split into its connected components and each glyph
+    is scaled to a fixed size and compared with every template in one vectorized distance computation.
+    Templates are harvested from labelled screenshots with add_glyphs, see src/tools/harvest_digit_glyphs.py.
+    """
+    GLYPH_WIDTH = 16
+    GLYPH_HEIGHT = 24
+
+    def __init__(self, templates=None, labels=None, max_glyph_distance=0.12, min_area=12):
+        """
+        Args:
+            templates: Array of flattened glyph templates (N, GLYPH_WIDTH * GLYPH_HEIGHT)
+            labels: The character for each template
+            max_glyph_distance: Mean squared pixel distance above which a glyph is treated as unknown
+            min_area: Connected components smaller than this many pixels are treated as noise
+        """
+        glyph_size = self.GLYPH_WIDTH * self.GLYPH_HEIGHT
+        self.templates = np.zeros((0, glyph_size), dtype=np.float32) if templates is None else np.asarray(templates, dtype=np.float32)
+        self.labels = np.array(labels if labels is not None else [], dtype='<U1')
+        self.max_glyph_distance = max_glyph_distance
+        self.min_area = min_area
+        self._template_norms = (self.templates ** 2).sum(axis=1)
+
+    @classmethod
+    def load(cls, glyphs_path: str):
+        """
+        Load the glyph templates saved by save(). Returns None if the file doesn't exist.
+        """
+        if not os.path.exists(glyphs_path):
+            return None
+
+        with np.load(glyphs_path) as data:
+            return cls(data['templates'], data['labels'].tolist())
+
+    def save(self, glyphs_path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(glyphs_path)), exist_ok=True)
+        np.savez_compressed(glyphs_path, templates=self.templates, labels=self.labels)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def segment(self, binary: np.ndarray, ignore_border: bool = False) -> np.ndarray:
+        """
+        Split a thresholded image into glyph vectors, ordered left to right.
+
+        Components that overlap horizontally are merged so broken strokes stay one glyph. Every glyph is
+        cut from the full line height before scaling so low glyphs like ',' keep their position.
+
+        Args:
+            binary: Thresholded image, white text on black
+            ignore_border: Skip components touching the image edge, e.g. the background around the rank badge
+
+        Returns:
+            Array of flattened glyphs (k, GLYPH_WIDTH * GLYPH_HEIGHT) scaled to 0.0 - 1.0
+        """
+        if binary.ndim == 3:
+            binary = binary[:, :, 0]
+
+        count, _, stats, _ = cv2.connectedComponentsWithStats((binary > 0).astype(np.uint8), connectivity=8)
+
+        boxes = []
+        for x, y, width, height, area in sorted(stats[1:count].tolist()):
+            if area < self.min_area:
+                continue
+            if ignore_border and (x == 0 or y == 0 or x + width == binary.shape[1] or y + height == binary.shape[0]):
+                continue
+            if boxes and x < boxes[-1][1]:
+                left, right, top, bottom = boxes[-1]
+                boxes[-1] = [left, max(right, x + width), min(top, y), max(bottom, y + height)]
+            else:
+                boxes.append([x, x + width, y, y + height])
+
+        if not boxes:
+            return np.zeros((0, self.GLYPH_WIDTH * self.GLYPH_HEIGHT), dtype=np.float32)
+
+        line_top = min(box[2] for box in boxes)
+        line_bottom = max(box[3] for box in boxes)
+
+        glyphs = np.empty((len(boxes), self.GLYPH_HEIGHT, self.GLYPH_WIDTH), dtype=np.float32)
+        for i, (left, right, top, bottom) in enumerate(boxes):
+            glyph = binary[line_top:line_bottom, left:right]
+            glyphs[i] = cv2.resize(glyph, (self.GLYPH_WIDTH, self.GLYPH_HEIGHT), interpolation=cv2.INTER_AREA) / 255.0
+
+        return glyphs.reshape(len(boxes), -1)
+
+    def add_glyphs(self, binary: np.ndarray, text: str, ignore_border: bool = False) -> int:
+        """
+        Add the glyphs in the image as templates labelled with the characters of text.
+        Nothing is added if the number of glyphs doesn't match the number of characters.
+
+        Returns:
+            The number of templates added
+        """
+        characters = [character for character in text if not character.isspace()]
+        glyphs = self.segment(binary, ignore_border)
+        if len(glyphs) == 0 or len(glyphs) != len(characters):
+            return 0
+
+        self.templates = np.vstack([self.templates, glyphs])
+        self.labels = np.concatenate([self.labels, np.array(characters, dtype='<U1')])
+        self._template_norms = (self.templates ** 2).sum(axis=1)
+
+        return len(characters)
+
+    def classify(self, binary: np.ndarray, ignore_border: bool = False) -> tuple:
+        """
+        Read the glyphs in a thresholded image.
+
+        Returns:
+            (text, confidence) where confidence is the lowest per-glyph margin between the nearest template
+            and the nearest template of a different character, or ("", 0.0) if nothing could be read
+        """
+        if len(self.labels) == 0:
+            return "", 0.0
+
+        glyphs = self.segment(binary, ignore_border)
+        if len(glyphs) == 0:
+            return "", 0.0
+
+        # Squared distance of every glyph to every template: |g|^2 + |t|^2 - 2 g.t
+        distances = (glyphs ** 2).sum(axis=1)[:, None] + self._template_norms[None, :] - 2.0 * glyphs @ self.templates.T
+        np.maximum(distances, 0.0, out=distances)
+
+        nearest = distances.argmin(axis=1)
+        nearest_labels = self.labels[nearest]
+        nearest_distances = distances[np.arange(len(glyphs)), nearest]
+
+        # Nearest template of any other character gives the confidence margin
+        other_distances = np.where(self.labels[None, :] == nearest_labels[:, None], np.inf, distances).min(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            confidences = np.where(np.isfinite(other_distances), 1.0 - nearest_distances / other_distances, 1.0)
+
+        # Glyphs that aren't close to any template are unknown
+        confidences[nearest_distances / glyphs.shape[1] > self.max_glyph_distance] = 0.0
+
+        return "".join(nearest_labels.tolist()), float(confidences.min())
+
+    def read_cells(self, binary: np.ndarray, cells: list, allowed_characters: str, min_confidence: float) -> tuple:
+        """
+        Read the numbers in [x_min, x_max, y_min, y_max] cells of a thresholded image.
+
+        A cell is only read when every glyph is confident and the text is made of allowed_characters,
+        starting and ending with a digit.
+
+        Returns:
+            (results, unread_cells) where results are EasyOCR style (box, text, confidence) items and
+            unread_cells are the cells left for EasyOCR
+        """
+        results = []
+        unread_cells = []
+
+        for cell in cells:
+            x_min, x_max, y_min, y_max = (max(int(value), 0) for value in cell)
+            text, confidence = self.classify(binary[y_min:y_max, x_min:x_max], ignore_border=True)
+
+            if (confidence >= min_confidence and text[:1].isdigit() and text[-1:].isdigit()
+                    and set(text) <= set(allowed_characters)):
+                box = [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+                results.append((box, text, confidence))
+            else:
+                unread_cells.append(cell)
+
+        return results, unread_cells
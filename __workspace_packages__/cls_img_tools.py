@@ -1,14 +1,21 @@
 import cv2
+import functools
 import numpy as np
+import os
 
 from PIL import Image
 
 class ImageTools:
     @staticmethod
-    def resize_image_opencv(image_path: str, new_width: int = 1200) -> np.ndarray:
+    def resize_image_opencv(image_path: str, new_width: int = 1200, grayscale: bool = False) -> np.ndarray:
         # Read the image
         img = cv2.imread(image_path)
 
+        # Convert before resizing so the resize only touches one channel. IMREAD_GRAYSCALE isn't used
+        # because the PNG decoder's conversion differs from cvtColor by enough to move the thresholds.
+        if grayscale:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
         # Get the original dimensions
         original_height, original_width = img.shape[:2]
 
@@ -21,6 +28,72 @@ class ImageTools:
 
         return resized_img, new_height
 
+    @staticmethod
+    def decode_for_regions(image_path: str, new_width: int = 1200) -> tuple:
+        """
+        Decode a screenshot for resize_region_opencv, so several regions can be resized from one decode.
+
+        Sources at least twice new_width wide are decoded with IMREAD_REDUCED_COLOR_* to skip most of
+        the pixels up front.
+
+        Returns:
+            (img, new_width, new_height) where new_height is the height of the image resized to new_width
+        """
+        with Image.open(image_path) as image:
+            original_width, original_height = image.size
+
+        # Decode at 1/2, 1/4 or 1/8 size when that is still at least new_width wide
+        reduced_flags = {8: cv2.IMREAD_REDUCED_COLOR_8, 4: cv2.IMREAD_REDUCED_COLOR_4, 2: cv2.IMREAD_REDUCED_COLOR_2}
+        reduction = next((factor for factor in (8, 4, 2) if original_width // factor >= new_width), None)
+        img = cv2.imread(image_path, reduced_flags[reduction] if reduction else cv2.IMREAD_COLOR)
+
+        return img, new_width, int(original_height / original_width * new_width)
+
+    @staticmethod
+    def resize_region_opencv(source: tuple, region: tuple, grayscale: bool = False) -> np.ndarray:
+        """
+        Resize one (x, y, width, height) region of a screenshot decoded by decode_for_regions.
+        A height of None runs to the bottom of the image.
+        """
+        img, new_width, new_height = source
+        x, y, width, height = region
+
+        source_height, source_width = img.shape[:2]
+
+        # Same scale factors cv2.resize uses for the full frame in resize_image_opencv
+        scale_x = new_width / source_width
+        scale_y = new_height / source_height
+
+        width = min(width, new_width - x)
+        height = new_height - y if height is None else min(height, new_height - y)
+
+        x_start, x_end, x_offset = ImageTools._map_span(x, width, scale_x, source_width)
+        y_start, y_end, y_offset = ImageTools._map_span(y, height, scale_y, source_height)
+
+        patch = img[y_start:y_end, x_start:x_end]
+        if grayscale:
+            patch = cv2.cvtColor(patch, cv2.COLOR_BGR2GRAY)
+        patch = cv2.resize(patch, None, fx=scale_x, fy=scale_y, interpolation=cv2.INTER_LANCZOS4)
+
+        return patch[y_offset:y_offset + height, x_offset:x_offset + width]
+
+    @staticmethod
+    def _map_span(start: int, length: int, scale: float, source_length: int, margin: int = 4, search: int = 64) -> tuple:
+        """
+        Map [start, start + length) of the resized image to a source span for resize_region_opencv.
+
+        The span starts on the source pixel (within search pixels of the margin) whose resized position is
+        closest to a whole pixel, so the resized patch lands on the same pixel grid as the full frame resize.
+
+        Returns:
+            (source_start, source_end, offset) where offset is the position of start in the resized patch
+        """
+        first = max(int(start / scale) - margin, 0)
+        source_start = min(range(max(first - search, 0), first + 1), key=lambda s: abs(s * scale - round(s * scale)))
+        source_end = min(int(np.ceil((start + length) / scale)) + margin, source_length)
+
+        return source_start, source_end, start - round(source_start * scale)
+
     @staticmethod
     def crop_image_opencv(image: np.ndarray, x: int, y: int, width: int, height: int) -> np.ndarray:
         # Crop the image using array slicing
@@ -28,20 +101,41 @@ class ImageTools:
         return cropped_img
 
     @staticmethod
-    def convert_non_white_to_black_opencv(image: np.ndarray, threshold=225) -> np.ndarray:
-        # Convert the image to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    def to_grayscale(image: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Return the image as a single channel. Grayscale images are returned as is (or copied into out).
+        """
+        if image.ndim == 2:
+            if out is None:
+                return image
+            np.copyto(out, image)
+            return out
 
-        # Create a mask where pixels above the threshold are considered white
-        mask = gray > threshold
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=out)
 
-        # Create an output image and set all pixels to black
-        output = np.zeros_like(image)
+    @staticmethod
+    def threshold_gray(image: np.ndarray, threshold=225, out: np.ndarray = None) -> np.ndarray:
+        """
+        Single channel threshold: pixels brighter than threshold become 255 and everything else 0.
 
-        # Set the pixels that are above the threshold in the original image to white in the output image
-        output[mask] = [255, 255, 255]
+        Args:
+            image: Grayscale or BGR image
+            threshold: Brightness threshold (0-255)
+            out: Optional preallocated uint8 buffer (or view, e.g. a slice of a canvas) the same size as the image
 
-        return output
+        Returns:
+            The uint8 binary image, out when it was given
+        """
+        gray = ImageTools.to_grayscale(image)
+        _, binary = cv2.threshold(gray, threshold, 255, cv2.THRESH_BINARY, dst=out)
+        return binary
+
+    @staticmethod
+    def convert_non_white_to_black_opencv(image: np.ndarray, threshold=225) -> np.ndarray:
+        """
+        3-channel version of threshold_gray, kept for scripts that still work in BGR.
+        """
+        return cv2.cvtColor(ImageTools.threshold_gray(image, threshold), cv2.COLOR_GRAY2BGR)
 
     @staticmethod
     def isolate_dark_text_opencv(image: np.ndarray, threshold=127) -> np.ndarray:
@@ -56,49 +150,209 @@ class ImageTools:
                       Higher values = more colors are treated as text
         
         Returns:
-            Binary image with dark text as black on white background
+            Binary image with dark text as black on white background, single channel for grayscale input
+        """
+        # Pixels below threshold become black (text), above become white (background)
+        binary = ImageTools.threshold_gray(image, threshold)
+
+        # Keep BGR input as a 3-channel image for consistency
+        if image.ndim == 2:
+            return binary
+        return cv2.cvtColor(binary, cv2.COLOR_GRAY2BGR)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def load_template(template_path: str):
         """
-        # Convert the image to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        Load a grayscale template image once per process. Returns None if the file doesn't exist.
+        """
+        if not os.path.exists(template_path):
+            return None
+        return cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
 
-        # Create a binary image: pixels below threshold become black (text), above become white (background)
-        _, binary = cv2.threshold(gray, threshold, 255, cv2.THRESH_BINARY)
+    @staticmethod
+    def create_text_template(image: np.ndarray, threshold=200) -> np.ndarray:
+        """
+        Create a template from the white text in an image, cropped tight to the text.
+        Returns None if the image has no white text.
+        """
+        binary = ImageTools.threshold_gray(image, threshold)
 
-        # Convert back to 3-channel image for consistency
-        output = cv2.cvtColor(binary, cv2.COLOR_GRAY2BGR)
+        # The text is the band with the most white pixels, which skips thin borders above and below it
+        bands = ImageTools.find_row_bands(binary, min_gap=3)
+        if not bands:
+            return None
+        y_start, y_end = max(bands, key=lambda band: np.count_nonzero(binary[band[0]:band[1]]))
 
-        return output
+        xs = np.flatnonzero(np.count_nonzero(binary[y_start:y_end], axis=0))
+        return binary[y_start:y_end, xs[0]:xs[-1] + 1]
 
     @staticmethod
-    def remove_everything_but_white(image, threshold=250):
+    def match_text_template(image: np.ndarray, template: np.ndarray, threshold=200, scales=(0.8, 0.9, 1.0, 1.1, 1.2, 1.3)) -> float:
+        """
+        Return the best normalized cross-correlation (-1 to 1) of a text template created by
+        create_text_template against the white text in the image, trying the template at several scales
+        so small layout differences between devices still match.
+        """
+        return ImageTools.locate_text_template(image, template, threshold, scales)[0]
+
+    @staticmethod
+    def locate_text_template(image: np.ndarray, template: np.ndarray, threshold=200, scales=(0.8, 0.9, 1.0, 1.1, 1.2, 1.3)) -> tuple:
+        """
+        Find a text template created by create_text_template in the white text of the image, see match_text_template.
+
+        Returns:
+            (score, (x, y)) for the best match, where (x, y) is the top left corner of the matched template,
+            or (-1.0, None) when the template is larger than the image at every scale
+        """
+        binary = ImageTools.threshold_gray(image, threshold)
+
+        best_score, best_location = -1.0, None
+        for scale in scales:
+            scaled = template if scale == 1.0 else cv2.resize(template, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            if scaled.shape[0] > binary.shape[0] or scaled.shape[1] > binary.shape[1]:
+                continue
+            _, score, _, location = cv2.minMaxLoc(cv2.matchTemplate(binary, scaled, cv2.TM_CCOEFF_NORMED))
+            if score > best_score:
+                best_score, best_location = float(score), location
+
+        return best_score, best_location
+
+    @staticmethod
+    def classify_tournament_state(state_img: np.ndarray, finished_template: np.ndarray,
+                                  finished_threshold=0.75, in_progress_threshold=0.45) -> tuple:
+        """
+        Classify the tournament state banner by matching it against the FINISHED banner template.
+
+        Args:
+            state_img: Crop of the state banner
+            finished_template: Template created with create_text_template from a FINISHED banner
+            finished_threshold: Scores at or above this are FINISHED
+            in_progress_threshold: Scores at or below this are IN_PROGRESS (the banner shows the time left)
+
+        Returns:
+            ("FINISHED" or "IN_PROGRESS", confidence). The confidence is 0.0 when the score falls between
+            the two thresholds so the caller should fall back to another check.
+        """
+        score = ImageTools.match_text_template(state_img, finished_template)
+
+        if score >= finished_threshold:
+            return "FINISHED", score
+        if score <= in_progress_threshold:
+            return "IN_PROGRESS", 1.0 - max(score, 0.0)
+
+        midpoint = (finished_threshold + in_progress_threshold) / 2
+        return ("FINISHED" if score >= midpoint else "IN_PROGRESS"), 0.0
+
+    @staticmethod
+    def find_row_bands(binary: np.ndarray, min_height: int = 1, max_height: int = None, min_gap: int = 1) -> list:
+        """
+        Find the horizontal bands containing text in a thresholded image (white text on black)
+        using its horizontal projection profile.
+
+        Args:
+            binary: Thresholded image
+            min_height: Bands shorter than this are dropped (noise, separators)
+            max_height: Bands taller than this are dropped (icons, buttons)
+            min_gap: Bands separated by fewer empty rows than this are merged
+
+        Returns:
+            List of (y_start, y_end) tuples, y_end is exclusive
+        """
+        if binary.ndim == 3:
+            binary = binary[:, :, 0]
+
+        # Rising and falling edges of the "row has text" profile
+        has_text = (np.count_nonzero(binary, axis=1) > 0).astype(np.int8)
+        edges = np.diff(np.concatenate(([0], has_text, [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        bands = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            if bands and start - bands[-1][1] < min_gap:
+                bands[-1] = (bands[-1][0], end)
+            else:
+                bands.append((start, end))
+
+        return [
+            (start, end) for start, end in bands
+            if end - start >= min_height and (max_height is None or end - start <= max_height)
+        ]
+
+    @staticmethod
+    def remove_line_art(binary: np.ndarray, stroke: int = 3, line_length: int = 100) -> np.ndarray:
+        """
+        Keep only the solid text strokes of a thresholded image (white text on black) for the projection profiles.
+
+        Specks and strokes thinner than stroke pixels, like the outlines of avatar art, are opened away, then
+        straight lines at least line_length pixels long, like card borders, are removed. Only use the result to
+        find the text, the strokes are thinner than in the original image.
+        """
+        if binary.ndim == 3:
+            binary = binary[:, :, 0]
+
+        text = cv2.morphologyEx(binary, cv2.MORPH_OPEN, np.ones((stroke, stroke), np.uint8))
+        horizontal_lines = cv2.morphologyEx(text, cv2.MORPH_OPEN, np.ones((1, line_length), np.uint8))
+        vertical_lines = cv2.morphologyEx(text, cv2.MORPH_OPEN, np.ones((line_length, 1), np.uint8))
+
+        return cv2.subtract(text, cv2.bitwise_or(horizontal_lines, vertical_lines))
+
+    @staticmethod
+    def find_text_cells(binary: np.ndarray, x_start: int, x_end: int, min_height: int = 1, max_height: int = None,
+                        min_gap: int = 1, margin: float = 0.1) -> list:
+        """
+        Segment one column of a thresholded leaderboard into text cells, one per row band.
+
+        Args:
+            binary: Thresholded image
+            x_start, x_end: Column span to segment
+            min_height, max_height, min_gap: See find_row_bands
+            margin: Padding added around each cell as a fraction of its height
+
+        Returns:
+            List of [x_min, x_max, y_min, y_max] boxes in image coordinates (the EasyOCR horizontal_list format)
+        """
+        if binary.ndim == 3:
+            binary = binary[:, :, 0]
+
+        image_height, image_width = binary.shape[:2]
+        column = binary[:, x_start:x_end]
+
+        cells = []
+        for y_start, y_end in ImageTools.find_row_bands(column, min_height, max_height, min_gap):
+            text_columns = np.flatnonzero(np.count_nonzero(column[y_start:y_end], axis=0))
+            padding = int(round((y_end - y_start) * margin))
+            cells.append([
+                max(x_start + int(text_columns[0]) - padding, 0),
+                min(x_start + int(text_columns[-1]) + 1 + padding, image_width),
+                max(y_start - padding, 0),
+                min(y_end + padding, image_height),
+            ])
+
+        return cells
+
+    @staticmethod
+    def remove_everything_but_white(image, threshold=250, as_array=False):
         """
         Remove everything but white from an image.
 
         Args:
             image (PIL.Image.Image): The image to process.
-            threshold (int): Brightness threshold for white (0-255). Defaults to 200.
+            threshold (int): Brightness threshold for white (0-255). Defaults to 250.
+            as_array (bool): Return the RGB NumPy array instead of a PIL image.
 
         Returns:
-            PIL.Image.Image: The processed image with only white pixels retained.
+            PIL.Image.Image: The processed image with only white pixels retained (an RGB array when as_array is True).
         """
-        # Ensure the image is in RGB mode
-        image = image.convert("RGB")
-
-        # Create a new image for the output
-        output_image = Image.new("RGB", image.size, (0, 0, 0))  # Black background
+        # Convert to a NumPy array once, in RGB mode
+        pixels = np.asarray(image.convert("RGB"))
 
-        # Process each pixel
-        pixels = image.load()
-        output_pixels = output_image.load()
+        # A pixel is "white" when all channels are above the threshold, inRange builds that mask in one pass
+        mask = cv2.inRange(pixels, (threshold + 1,) * 3, (255,) * 3)
 
-        for y in range(image.height):
-            for x in range(image.width):
-                r, g, b = pixels[x, y]
-                # Check if the pixel is "white" (all channels above the threshold)
-                if r > threshold and g > threshold and b > threshold:
-                    output_pixels[x, y] = (255, 255, 255)  # Keep white
-                else:
-                    output_pixels[x, y] = (0, 0, 0)  # Set everything else to black
+        # Keep white, set everything else to black
+        output = cv2.cvtColor(mask, cv2.COLOR_GRAY2RGB)
 
-        return output_image
+        return output if as_array else Image.fromarray(output)
 
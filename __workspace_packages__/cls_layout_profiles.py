@@ -0,0 +1,172 @@
+import json
+import logging
+import os
+import threading
+
+from PIL import Image
+
+from cls_img_tools import ImageTools
+
+class LayoutProfiles:
+    """
+    Crop rectangles for one screen, calibrated once per source resolution and cached in a JSON file.
+
+    The crops are defined in the 1200 px wide layout of the reference screenshots, each one tied to an
+    anchor: a text template (a tab label or banner) whose position in the reference layout is known.
+    The first screenshot of a new resolution is searched for the anchors, every crop is shifted down by
+    how far its anchor moved and the shifted rectangles are saved, so later screenshots of that resolution
+    go straight to the cached rectangles. Only the rows move between devices at the normalized width so the
+    x positions are kept.
+
+    A crop whose anchor isn't found keeps its reference rectangle and isn't cached, the anchor is searched
+    for again in the next screenshot of that resolution. Some anchors are only on some screenshots, e.g.
+    the FINISHED banner is missing from in-progress tournaments. Delete the cache file to recalibrate.
+    """
+    def __init__(self, cache_path: str, screen: str, crops: dict, anchors: dict, min_score: float = 0.5):
+        """
+        Args:
+            cache_path: JSON file the calibrated rectangles are saved to, None keeps them in memory only
+            screen: Name of the screen in the cache file, the importers share one file
+            crops: dict of name -> ((x, y, width, height), anchor name or None) in the reference layout
+            anchors: dict of name -> (template_path, search_rect, reference_y) where search_rect is the
+                (x, y, width, height) area searched for the template and reference_y the top of the
+                template in the reference layout
+            min_score: Lowest template match score accepted as the anchor
+        """
+        self.cache_path = cache_path
+        self.screen = screen
+        self.crops = crops
+        self.anchors = anchors
+        self.min_score = min_score
+
+        # resolution -> {crop key -> rectangle}
+        self.profiles = self._load().get(screen, {})
+
+        # Anchors whose template file is missing, the only misses that can't change with the next screenshot
+        self._missing_templates = set()
+
+        # The importers' preprocess threads share one instance
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def resolution_key(image_path: str) -> str:
+        """
+        Return the "widthxheight" of the source image, read from the header only.
+        """
+        with Image.open(image_path) as image:
+            return f"{image.width}x{image.height}"
+
+    @staticmethod
+    def crop_key(name: str, variant: str = None) -> str:
+        return f"{name}:{variant}" if variant else name
+
+    def get_crops(self, image_path: str, source: tuple, names, variant: str = None) -> dict:
+        """
+        Return the crop rectangles for a screenshot, calibrating them the first time its resolution is seen.
+
+        Args:
+            image_path: Screenshot the crops are for
+            source: The screenshot decoded by ImageTools.decode_for_regions, used to search for the anchors
+            names: Names of the crops to return
+            variant: Screen variant whose rows sit at a different height, e.g. the tournament state,
+                calibrated and cached separately
+
+        Returns:
+            dict of name -> (x, y, width, height), a height of None runs to the bottom of the image
+        """
+        resolution = self.resolution_key(image_path)
+
+        with self._lock:
+            profile = self.profiles.setdefault(resolution, {})
+
+            missing = [name for name in names if self.crop_key(name, variant) not in profile]
+            if missing:
+                self._calibrate(resolution, profile, source, missing, variant)
+
+            crops = {}
+            for name in names:
+                rect = profile.get(self.crop_key(name, variant))
+                crops[name] = tuple(rect) if rect is not None else self.crops[name][0]
+            return crops
+
+    def _calibrate(self, resolution: str, profile: dict, source: tuple, names: list, variant: str):
+        """
+        Locate the anchors of the named crops and add the shifted rectangles to the profile.
+        """
+        offsets = {}
+        calibrated = False
+
+        for name in names:
+            (x, y, width, height), anchor_name = self.crops[name]
+
+            if anchor_name is None:
+                profile[self.crop_key(name, variant)] = [x, y, width, height]
+                calibrated = True
+                continue
+
+            if anchor_name not in offsets:
+                offsets[anchor_name] = self._locate_anchor(resolution, anchor_name, source, variant)
+
+            dy = offsets[anchor_name]
+            if dy is None:
+                continue
+
+            profile[self.crop_key(name, variant)] = [x, y + dy, width, height]
+            calibrated = True
+            logging.info(f"Layout {self.screen} {resolution}: {self.crop_key(name, variant)} crop at y {y + dy} "
+                         f"({dy:+d} px from the reference layout)")
+
+        if calibrated:
+            self._save(resolution, profile)
+
+    def _locate_anchor(self, resolution: str, anchor_name: str, source: tuple, variant: str):
+        """
+        Return how far the anchor moved down from the reference layout, or None if it wasn't found.
+        """
+        if anchor_name in self._missing_templates:
+            return None
+
+        template_path, search_rect, reference_y = self.anchors[anchor_name]
+        template = ImageTools.load_template(template_path)
+        if template is None:
+            logging.warning(f"Layout anchor template {template_path} not found")
+            self._missing_templates.add(anchor_name)
+            return None
+
+        search_img = ImageTools.resize_region_opencv(source, search_rect, grayscale=True)
+        score, location = ImageTools.locate_text_template(search_img, template)
+        logging.debug(f"Layout anchor {anchor_name} in {resolution}: score {score:.2f} at {location}")
+
+        # Not cached, the anchor may be on the next screenshot of this resolution
+        if location is None or score < self.min_score:
+            return None
+
+        return search_rect[1] + location[1] - reference_y
+
+    def _load(self) -> dict:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable layout cache {self.cache_path}: {e}")
+            return {}
+
+    def _save(self, resolution: str, profile: dict):
+        """
+        Merge the profile into the cache file. OCR worker processes share the file so it is re-read first
+        and replaced in one step.
+        """
+        if not self.cache_path:
+            return
+
+        cache = self._load()
+        cache.setdefault(self.screen, {}).setdefault(resolution, {}).update(profile)
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.cache_path)
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+class OcrCache:
+    """
+    Persistent on-disk cache of raw OCR results.
+
+    Entries are keyed by the source image content hash, the crop rectangle, the preprocessing
+    threshold and the OCR kwargs. The least recently used entries are evicted once the cache
+    grows past max_mb.
+    """
+    def __init__(self, cache_path: str, max_mb: int = 256):
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+
+        # Several OCR worker processes can share the cache file so wait on locks instead of failing.
+        # Within a process the importer pipeline reads the cache from its OCR thread, the lock serializes access.
+        self.connection = sqlite3.connect(cache_path, timeout=30, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_cache (
+                cache_key TEXT PRIMARY KEY,
+                results TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_ocr_cache_last_used ON ocr_cache (last_used)")
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def make_key(image_hash: str, crop, threshold, ocr_kwargs: dict) -> str:
+        """
+        Build the cache key for one crop of an image.
+        """
+        key_parts = [image_hash, list(crop) if crop is not None else None, threshold, ocr_kwargs]
+        key_json = json.dumps(key_parts, sort_keys=True, default=str)
+        return hashlib.sha256(key_json.encode("utf-8")).hexdigest()
+
+    def get(self, cache_key: str):
+        """
+        Return the cached results or None when the key isn't cached.
+        """
+        with self._lock:
+            cursor = self.connection.cursor()
+            cursor.execute("SELECT results FROM ocr_cache WHERE cache_key = ?", (cache_key,))
+            row = cursor.fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            cursor.execute("UPDATE ocr_cache SET last_used = ? WHERE cache_key = ?", (time.time(), cache_key))
+            self.connection.commit()
+
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, cache_key: str, results):
+        """
+        Store the results and evict the least recently used entries if the cache is over its size limit.
+        """
+        results_json = json.dumps(results)
+        with self._lock:
+            cursor = self.connection.cursor()
+            cursor.execute(
+                "INSERT OR REPLACE INTO ocr_cache (cache_key, results, size, last_used) VALUES (?, ?, ?, ?)",
+                (cache_key, results_json, len(results_json), time.time())
+            )
+            self._evict(cursor)
+            self.connection.commit()
+
+    def _evict(self, cursor):
+        cursor.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache")
+        total_bytes = cursor.fetchone()[0]
+        if total_bytes <= self.max_bytes:
+            return
+
+        # Walk the entries from least to most recently used until enough space is freed
+        evict_keys = []
+        cursor.execute("SELECT cache_key, size FROM ocr_cache ORDER BY last_used ASC")
+        for cache_key, size in cursor.fetchall():
+            if total_bytes <= self.max_bytes:
+                break
+            evict_keys.append((cache_key,))
+            total_bytes -= size
+
+        cursor.executemany("DELETE FROM ocr_cache WHERE cache_key = ?", evict_keys)
+        logging.debug(f"Evicted {len(evict_keys)} OCR cache entries")
+
+    def log_stats(self):
+        lookups = self.hits + self.misses
+        if lookups > 0:
+            logging.info(f"OCR cache: {self.hits} hits, {self.misses} misses ({100.0 * self.hits / lookups:.1f}% hit rate)")
@@ -0,0 +1,370 @@
+import logging
+import os
+import secrets
+import socket
+import stat
+import threading
+
+from multiprocessing.connection import AuthenticationError, Client, Listener
+
+from cls_ocr_cache import OcrCache
+
+# TCP address, only used where Unix domain sockets aren't available (Windows)
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 50515
+
+# Per-user directory for the service socket and generated authkey, only the user can access it
+DEFAULT_SERVICE_DIR = os.path.join(os.path.expanduser("~"), ".wordscape-ocr")
+SOCKET_NAME = "ocr_service.sock"
+AUTHKEY_FILE_NAME = "authkey"
+
+# Reader methods the OCR service will run on behalf of a client
+SERVICE_METHODS = {"readtext", "detect", "recognize"}
+
+def _to_authkey(authkey) -> bytes:
+    return authkey.encode("utf-8") if isinstance(authkey, str) else authkey
+
+def _private_dir(service_dir: str, create: bool) -> bool:
+    """
+    Check that the service directory belongs to this user and only the user can access it.
+    The service messages are pickles, so anyone who can reach the socket or read the key can run code in the service
+    and its clients.
+
+    Args:
+        create: Create the directory (mode 0700) if it doesn't exist, and tighten its mode if it is ours
+    """
+    if create:
+        os.makedirs(service_dir, mode=0o700, exist_ok=True)
+    if not os.path.isdir(service_dir):
+        return False
+
+    dir_stat = os.stat(service_dir)
+    if hasattr(os, "getuid") and dir_stat.st_uid != os.getuid():
+        logging.error(f"OCR service directory {service_dir} belongs to another user")
+        return False
+
+    if stat.S_IMODE(dir_stat.st_mode) & 0o077:
+        if not create:
+            logging.error(f"OCR service directory {service_dir} can be accessed by other users")
+            return False
+        os.chmod(service_dir, 0o700)
+
+    return True
+
+def load_authkey(authkey=None, service_dir: str = DEFAULT_SERVICE_DIR, create: bool = False) -> bytes:
+    """
+    Return the OCR service authkey: the ocr_service.authkey from app_keys.json when it is set, otherwise the key
+    generated in the service directory.
+
+    Args:
+        authkey: Key from the configuration
+        service_dir: Directory holding the generated key
+        create: Generate a random key in a 0600 file when there is none, the server does on first start
+
+    Returns:
+        The key, or None when there is no key
+    """
+    if authkey:
+        return _to_authkey(authkey)
+
+    if not _private_dir(service_dir, create):
+        return None
+
+    key_path = os.path.join(service_dir, AUTHKEY_FILE_NAME)
+    if not os.path.exists(key_path):
+        if not create:
+            return None
+
+        try:
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass  # Another process created it first
+        else:
+            with os.fdopen(fd, "w") as f:
+                f.write(secrets.token_hex(32))
+            logging.info(f"Generated OCR service authkey {key_path}")
+
+    if stat.S_IMODE(os.stat(key_path).st_mode) & 0o077:
+        logging.error(f"OCR service authkey {key_path} can be read by other users, run chmod 600 on it")
+        return None
+
+    with open(key_path, "r") as f:
+        key = f.read().strip()
+
+    return _to_authkey(key) if key else None
+
+def service_address(service_dir: str = DEFAULT_SERVICE_DIR, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    Return the OCR service address: a Unix domain socket in the service directory, or host and port on Windows.
+    """
+    if hasattr(socket, "AF_UNIX") and os.name != "nt":
+        return os.path.join(service_dir, SOCKET_NAME)
+
+    return (host, int(port))
+
+def _describe_address(address) -> str:
+    return address if isinstance(address, str) else f"{address[0]}:{address[1]}"
+
+def _to_builtin(value):
+    """
+    Convert EasyOCR results (which contain numpy scalars) to plain Python values so they can be cached as JSON.
+    """
+    if isinstance(value, dict):
+        return {key: _to_builtin(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(item) for item in value]
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return value
+
+def _create_reader(languages):
+    # Import here so torch is only loaded by the process that actually runs the OCR
+    import easyocr
+
+    logging.info(f"Loading EasyOCR reader for {languages} . . .")
+    return easyocr.Reader(list(languages))
+
+class OcrEngineSingleton:
+    """
+    Runs EasyOCR requests through the local OCR service when it is running,
+    otherwise through an EasyOCR reader loaded in this process.
+    """
+    _instance = None
+    _lock = threading.Lock()  # Lock object to ensure thread safety
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Ensures only one instance of the class is created, even in a multithreaded environment.
+        """
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:  # Double-checked locking
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, authkey=None, languages=("en",), use_service=True,
+                 service_dir=DEFAULT_SERVICE_DIR):
+        """
+        Initialize the singleton instance.
+
+        Args:
+            authkey: OCR service key from app_keys.json, otherwise the key the service generated in service_dir is used
+            service_dir: Directory of the service socket and generated key
+        """
+        if not hasattr(self, '_initialized'):
+            self._service_dir = service_dir
+            self._address = service_address(service_dir, host, port)
+            self._authkey = authkey
+            self._languages = tuple(languages)
+            self._use_service = use_service
+            self._service_checked = False
+            self._connection = None
+            self._reader = None
+            self._cache = None
+            self._call_lock = threading.Lock()
+            self._initialized = True
+
+    @classmethod
+    def cleanup(cls):
+        """
+        Cleanup method to reset or release resources.
+        """
+        with cls._lock:
+            if cls._instance is not None:
+                cls._instance.close()
+                cls._instance = None
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def set_cache(self, cache: OcrCache):
+        """
+        Use the OCR result cache for readtext_cached calls.
+        """
+        self._cache = cache
+
+    @property
+    def cache(self) -> OcrCache:
+        return self._cache
+
+    @property
+    def reader(self):
+        """
+        The in-process EasyOCR reader, loaded on first use.
+        """
+        if self._reader is None:
+            self._reader = _create_reader(self._languages)
+        return self._reader
+
+    @property
+    def using_service(self) -> bool:
+        return self._service_connection() is not None
+
+    def warm_up(self):
+        """
+        Connect to the OCR service, or load the in-process reader when the service isn't running.
+        """
+        if not self.using_service:
+            self.reader
+
+    def _service_connection(self):
+        # Only try to connect once per process, a missing service means we use the in-process reader
+        if self._use_service and not self._service_checked:
+            self._service_checked = True
+
+            # Without a key, or with a socket directory other users can reach, the service isn't trusted
+            authkey = load_authkey(self._authkey, self._service_dir)
+            if authkey is None or (isinstance(self._address, str) and not _private_dir(self._service_dir, create=False)):
+                logging.debug(f"No OCR service authkey in {self._service_dir}; using in-process OCR")
+                return None
+
+            try:
+                self._connection = Client(self._address, authkey=authkey)
+                logging.info(f"Using OCR service at {_describe_address(self._address)}")
+            except (OSError, AuthenticationError) as e:
+                logging.debug(f"OCR service not available at {_describe_address(self._address)} ({e}); using in-process OCR")
+                self._connection = None
+
+        return self._connection
+
+    def _call(self, method, *args, **kwargs):
+        with self._call_lock:
+            connection = self._service_connection()
+            if connection is not None:
+                try:
+                    connection.send((method, args, kwargs))
+                    ok, payload = connection.recv()
+                except (EOFError, OSError) as e:
+                    logging.warning(f"Lost connection to the OCR service ({e}); falling back to in-process OCR")
+                    self.close()
+                else:
+                    if not ok:
+                        raise payload
+                    return payload
+
+        return getattr(self.reader, method)(*args, **kwargs)
+
+    def readtext(self, image, **kwargs) -> list:
+        """
+        Same as easyocr.Reader.readtext.
+        """
+        return self._call("readtext", image, **kwargs)
+
+    def detect(self, image, **kwargs) -> tuple:
+        """
+        Same as easyocr.Reader.detect, returns (horizontal_list, free_list) with one list per image.
+        """
+        return self._call("detect", image, **kwargs)
+
+    def recognize(self, image, horizontal_list=None, free_list=None, **kwargs) -> list:
+        """
+        Same as easyocr.Reader.recognize, runs only the recognizer over the given boxes.
+        """
+        return self._call("recognize", image, horizontal_list, free_list, **kwargs)
+
+    def cached(self, image_hash: str, crop, threshold, ocr_kwargs: dict, compute):
+        """
+        Return the cached OCR results for the key, or call compute() and cache what it returns.
+
+        The cache key is the source image hash, the crop rectangle the image was cut from,
+        the preprocessing threshold and the OCR kwargs.
+        """
+        if self._cache is None:
+            return compute()
+
+        cache_key = OcrCache.make_key(image_hash, crop, threshold, ocr_kwargs)
+        results = self._cache.get(cache_key)
+        if results is None:
+            results = _to_builtin(compute())
+            self._cache.put(cache_key, results)
+
+        return results
+
+    def readtext_cached(self, image, image_hash: str, crop, threshold=None, **kwargs) -> list:
+        """
+        Same as readtext, but the results are looked up in the OCR cache first.
+        """
+        return self.cached(image_hash, crop, threshold, kwargs, lambda: self.readtext(image, **kwargs))
+
+class OcrServer:
+    """
+    Long-lived OCR service that keeps an EasyOCR reader warm and answers requests from OcrEngineSingleton clients.
+    """
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, authkey=None, languages=("en",), service_dir=DEFAULT_SERVICE_DIR):
+        """
+        Args:
+            authkey: Key from app_keys.json, otherwise a random key is generated in service_dir on first start
+            service_dir: Directory of the service socket and generated key, created with mode 0700
+        """
+        self._service_dir = service_dir
+        self._address = service_address(service_dir, host, port)
+        self._authkey = authkey
+        self._languages = tuple(languages)
+        self._reader = None
+        self._reader_lock = threading.Lock()  # A single reader can only run one request at a time
+
+    def _remove_stale_socket(self):
+        """
+        Remove the socket file left by a service that stopped, refuse to start when one is still running.
+        """
+        if not isinstance(self._address, str) or not os.path.exists(self._address):
+            return
+
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self._address)
+        except OSError:
+            os.unlink(self._address)
+        else:
+            raise RuntimeError(f"An OCR service is already listening on {self._address}")
+        finally:
+            probe.close()
+
+    def serve_forever(self):
+        authkey = load_authkey(self._authkey, self._service_dir, create=True)
+        if authkey is None:
+            raise ValueError(f"No OCR service authkey, set ocr_service.authkey in app_keys.json or fix {self._service_dir}")
+
+        self._remove_stale_socket()
+        self._reader = _create_reader(self._languages)
+
+        with Listener(self._address, authkey=authkey) as listener:
+            logging.info(f"OCR service listening on {_describe_address(self._address)}")
+            while True:
+                try:
+                    connection = listener.accept()
+                except AuthenticationError as e:
+                    logging.warning(f"Rejected OCR client: {e}")
+                    continue
+                except (EOFError, OSError) as e:
+                    # A client that disconnects during the handshake, e.g. another service checking the socket
+                    logging.debug(f"OCR client dropped before authenticating: {e}")
+                    continue
+
+                threading.Thread(target=self._handle_client, args=(connection,), daemon=True).start()
+
+    def _handle_client(self, connection):
+        logging.debug("OCR client connected")
+        with connection:
+            while True:
+                try:
+                    method, args, kwargs = connection.recv()
+                except (EOFError, OSError):
+                    break
+
+                if method not in SERVICE_METHODS:
+                    connection.send((False, ValueError(f"Unsupported OCR method: {method}")))
+                    continue
+
+                try:
+                    with self._reader_lock:
+                        result = getattr(self._reader, method)(*args, **kwargs)
+                except Exception as e:
+                    logging.exception(f"OCR request failed: {e}")
+                    connection.send((False, e))
+                else:
+                    connection.send((True, result))
+
+        logging.debug("OCR client disconnected")
@@ -0,0 +1,59 @@
+import json
+import logging
+import os
+import time
+
+class OcrJournal:
+    """
+    Append-only JSON Lines journal of the raw OCR results of each screenshot.
+
+    The importers add an entry per screenshot before matching the results to players, so a change to the
+    tag corrections, the ignore list or the row matching can be replayed from the journal without running
+    the OCR again. A screenshot read again gets a new entry and the latest entry per image hash wins.
+    """
+    def __init__(self, journal_path: str):
+        self.journal_path = journal_path
+
+    def append(self, entry: dict):
+        """
+        Add an entry, stamped with the time it was recorded. The line is flushed to disk right away so
+        the OCR of a run that stops part way through is kept.
+        """
+        entry = {**entry, 'recorded_at': time.strftime("%Y-%m-%d %H:%M:%S")}
+
+        # EasyOCR results contain numpy scalars when they don't come through the OCR cache
+        line = json.dumps(entry, default=lambda value: value.tolist() if hasattr(value, "tolist") else str(value))
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.journal_path)), exist_ok=True)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+
+    def latest_entries(self, import_type: str = None) -> list:
+        """
+        Return the latest entry for each image hash, sorted by weekend date, capture group and file name.
+
+        Args:
+            import_type: Only return the entries of this importer
+        """
+        if not os.path.exists(self.journal_path):
+            return []
+
+        entries = {}
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+
+                # A run killed while writing leaves a partial last line
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logging.warning(f"Skipping unreadable line {line_number} of {self.journal_path}")
+                    continue
+
+                if import_type is None or entry.get('import_type') == import_type:
+                    entries[entry['image_hash']] = entry
+
+        return sorted(entries.values(), key=lambda entry: (entry.get('weekend_date') or "", entry.get('capture_group') or "",
+                                                           entry.get('file_name') or ""))
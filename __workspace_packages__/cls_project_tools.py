@@ -1,4 +1,5 @@
 import fnmatch
+import hashlib
 import logging
 import os
 import re
@@ -7,6 +8,9 @@ from pathlib import Path
 from datetime import datetime, timedelta
 
 class ProjectTools:
+    # Screenshot file names start with yyyy-mm-dd_HH-MM_NN: the capture date, the capture minute and the series number
+    CAPTURE_NAME_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2})_(\d{2}-\d{2})_(\d{2})")
+
     @staticmethod
     def get_img_files(directory: str, pattern='.png', recursive: bool = False) -> list:
 
@@ -22,6 +26,18 @@ class ProjectTools:
 
         return files
 
+    @staticmethod
+    def get_file_hash(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+        """
+        Return the SHA-256 hash of the file contents.
+        """
+        file_hash = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(chunk_size), b''):
+                file_hash.update(chunk)
+
+        return file_hash.hexdigest()
+
     @staticmethod
     def extract_date_from_filename(file_path: str) -> tuple:
         """
@@ -47,7 +63,7 @@ class ProjectTools:
         """
         try:
             filename = os.path.basename(file_path)
-            matches = re.match(r"(\d{4}-\d{2}-\d{2})_(\d{2}-\d{2})_(\d{2})", filename)
+            matches = ProjectTools.CAPTURE_NAME_PATTERN.match(filename)
             date_str = matches.group(1)  # Extract the yyyy-mm-dd prefix
             time_str = matches.group(2)  # Extract the time
             series_str = matches.group(3)  # Extract the series number
@@ -57,6 +73,29 @@ class ProjectTools:
 
         return date_str, date_str+"_"+time_str, int(series_str)
 
+    @staticmethod
+    def group_by_capture(file_paths) -> dict:
+        """
+        Group screenshots by capture series, parsing each file name once.
+
+        The group key is the capture date and minute, "yyyy-mm-dd_HH-MM", the same value
+        extract_date_time_from_filename returns as its second item. Files whose names don't
+        start with a capture date and time are left out.
+
+        Returns:
+            dict of group key -> sorted list of file paths, in group key order
+        """
+        groups = {}
+        for file_path in file_paths:
+            matches = ProjectTools.CAPTURE_NAME_PATTERN.match(os.path.basename(file_path))
+            if matches is None:
+                logging.warning(f"Skipping {file_path}, the name doesn't start with a capture date and time")
+                continue
+
+            groups.setdefault(f"{matches.group(1)}_{matches.group(2)}", []).append(file_path)
+
+        return {group: sorted(groups[group]) for group in sorted(groups)}
+
     @staticmethod
     def get_weekend_dates(file_date_str: str) -> tuple:
         """
@@ -0,0 +1,60 @@
+import cv2
+import numpy as np
+
+class RowFingerprints:
+    """
+    Perceptual fingerprints of the leaderboard rows already read in one capture group.
+
+    A capture group is the series of scrolled screenshots taken in the same minute (_01, _02, ...).
+    Neighbouring screenshots overlap by a few rows, so a row whose fingerprint was seen in an earlier
+    screenshot of the group doesn't need to be OCR'd again.
+
+    The fingerprint is an average hash of the thresholded row band on a HASH_WIDTH x HASH_HEIGHT grid.
+    Two fingerprints are compared by the share of their ink cells that differ, so the empty background
+    that every row shares doesn't make different rows look alike.
+    """
+    HASH_WIDTH = 128
+    HASH_HEIGHT = 16
+
+    def __init__(self, max_distance: float = 0.2):
+        """
+        Args:
+            max_distance: Rows whose fingerprints differ in at most this share of their ink cells are the same row
+        """
+        self.max_distance = max_distance
+        self.fingerprints = np.zeros((0, self.HASH_WIDTH * self.HASH_HEIGHT), dtype=bool)
+        self.rows_seen = 0
+        self.rows_skipped = 0
+
+    @classmethod
+    def fingerprint(cls, row_img: np.ndarray) -> np.ndarray:
+        """
+        Return the fingerprint of a thresholded row band, white text on black.
+        """
+        cells = cv2.resize(row_img, (cls.HASH_WIDTH, cls.HASH_HEIGHT), interpolation=cv2.INTER_AREA)
+        return (cells >= 64).ravel()
+
+    def is_duplicate(self, fingerprint: np.ndarray) -> bool:
+        """
+        Return True if a row with this fingerprint has already been seen.
+        """
+        if len(self.fingerprints) == 0:
+            return False
+
+        different = np.count_nonzero(self.fingerprints ^ fingerprint, axis=1)
+        ink = np.maximum(np.count_nonzero(self.fingerprints | fingerprint, axis=1), 1)
+        return bool((different / ink).min() <= self.max_distance)
+
+    def check_row(self, row_img: np.ndarray) -> bool:
+        """
+        Return True if the row was seen earlier in the group, otherwise remember it and return False.
+        """
+        fingerprint = self.fingerprint(row_img)
+
+        if self.is_duplicate(fingerprint):
+            self.rows_skipped += 1
+            return True
+
+        self.fingerprints = np.vstack([self.fingerprints, fingerprint])
+        self.rows_seen += 1
+        return False
@@ -0,0 +1,63 @@
+class RowMatcher:
+    """
+    Aligns OCR boxes from different leaderboard columns into rows.
+
+    Boxes are EasyOCR (box, text, confidence) items where box is the list of four corner points.
+    Both lists are sorted by the y-centre of their boxes and each value is assigned to its nearest
+    row in a single sweep, so tall stitched leaderboards don't need a nested loop over every pair.
+    """
+    @staticmethod
+    def box_center_y(box) -> float:
+        return sum(point[1] for point in box) / len(box)
+
+    @staticmethod
+    def assign(rows: list, values: list, max_distance: float) -> tuple:
+        """
+        Assign each value to the row whose y-centre is nearest, within max_distance pixels.
+        A row keeps at most one value; when two values compete for a row the nearer one wins.
+
+        Returns:
+            (row_values, unmatched_values) where row_values[i] is the value assigned to rows[i] or None
+        """
+        row_order = sorted(range(len(rows)), key=lambda i: RowMatcher.box_center_y(rows[i][0]))
+        row_ys = [RowMatcher.box_center_y(rows[i][0]) for i in row_order]
+
+        value_order = sorted(range(len(values)), key=lambda i: RowMatcher.box_center_y(values[i][0]))
+
+        row_values = [None] * len(rows)
+        row_distances = [None] * len(rows)
+        unmatched_values = []
+
+        position = 0
+        for value_index in value_order:
+            value = values[value_index]
+            value_y = RowMatcher.box_center_y(value[0])
+
+            # Values are visited top to bottom so the row pointer only ever moves down
+            while position + 1 < len(row_ys) and row_ys[position + 1] <= value_y:
+                position += 1
+
+            # The nearest row is either the last row above the value or the first row below it
+            nearest = None
+            nearest_distance = None
+            for candidate in (position, position + 1):
+                if candidate < len(row_ys):
+                    distance = abs(row_ys[candidate] - value_y)
+                    if nearest_distance is None or distance < nearest_distance:
+                        nearest, nearest_distance = candidate, distance
+
+            if nearest is None or nearest_distance > max_distance:
+                unmatched_values.append(value)
+                continue
+
+            row_index = row_order[nearest]
+            if row_values[row_index] is not None:
+                if row_distances[row_index] <= nearest_distance:
+                    unmatched_values.append(value)
+                    continue
+                unmatched_values.append(row_values[row_index])
+
+            row_values[row_index] = value
+            row_distances[row_index] = nearest_distance
+
+        return row_values, unmatched_values
@@ -0,0 +1,200 @@
+import logging
+import sqlite3
+import threading
+import time
+
+from contextlib import contextmanager
+
+from cls_sqlite_tools import SqliteTools
+
+class PooledConnection:
+    """
+    A connection of a SqliteConnectionPool and when it last passed a health check.
+    """
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+        self.last_checked = time.monotonic()
+
+class SqliteConnectionPool:
+    """
+    Connections to one SQLite database for a multithreaded process.
+
+    Each thread that reads gets its own read connection from a pool of at most max_readers, and keeps it
+    until it calls release_reader() or ends. All writes go through a single writer connection that one
+    thread at a time holds with writer(), so the writes are serialized instead of competing for the
+    database lock. With WAL journaling the readers keep reading while the writer writes.
+
+    The connections are opened with check_same_thread=False because a read connection moves to another
+    thread after it is released, the pool makes sure only one thread uses a connection at a time.
+    A connection that has been idle for health_check_seconds is checked with "SELECT 1" before it is
+    handed out and reopened if it fails.
+    """
+    def __init__(self, db_path: str, profile: str = "default", reader_profile: str = "report", max_readers: int = 4,
+                 timeout: float = 60.0, health_check_seconds: float = 30.0):
+        """
+        Args:
+            db_path: Database file
+            profile: SQLite PRAGMA profile of the writer connection, see SqliteTools
+            reader_profile: SQLite PRAGMA profile of the read connections, query_only by default
+            max_readers: Most read connections open at once, a thread waits when they are all in use
+            timeout: Seconds to wait for a read connection or the writer before raising TimeoutError
+            health_check_seconds: Idle time after which a connection is checked before it is used
+        """
+        self.db_path = db_path
+        self.profile = profile
+        self.reader_profile = reader_profile
+        self.max_readers = max(1, max_readers)
+        self.timeout = timeout
+        self.health_check_seconds = health_check_seconds
+
+        self._writer = PooledConnection(self._connect(profile))
+        self._writer_lock = threading.RLock()
+        self._writer_owner = None  # Thread ident holding the writer
+        self._writer_depth = 0  # Nested writer() blocks of the owner
+
+        self._readers = threading.Condition()
+        self._idle_readers = []
+        self._assigned_readers = {}  # Thread ident -> (thread, PooledConnection)
+        self._reader_count = 0
+        self._local = threading.local()
+        self._closed = False
+
+    def _connect(self, profile: str) -> sqlite3.Connection:
+        return SqliteTools.connect(self.db_path, profile, check_same_thread=False)
+
+    def _check_health(self, pooled: PooledConnection, profile: str):
+        """
+        Reopen the connection if it has been idle for a while and no longer answers.
+        """
+        now = time.monotonic()
+        if now - pooled.last_checked < self.health_check_seconds:
+            return
+
+        try:
+            pooled.connection.execute("SELECT 1").fetchone()
+        except sqlite3.Error as e:
+            logging.warning(f"Reopening SQLite connection to {self.db_path} that failed its health check: {e}")
+            try:
+                pooled.connection.close()
+            except sqlite3.Error:
+                pass
+            pooled.connection = self._connect(profile)
+
+        pooled.last_checked = time.monotonic()
+
+    def holds_writer(self) -> bool:
+        """
+        Check if the calling thread is inside a writer() block.
+        """
+        return self._writer_owner == threading.get_ident()
+
+    @contextmanager
+    def writer(self):
+        """
+        Hold the writer connection, blocks nest on the same thread.
+
+        Usage:
+            with pool.writer() as connection:
+                connection.execute(...)
+                connection.commit()
+        """
+        if not self._writer_lock.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Timed out after {self.timeout} seconds waiting for the writer connection to {self.db_path}")
+
+        try:
+            if self._writer_depth == 0:
+                if self._closed:
+                    raise RuntimeError(f"Connection pool for {self.db_path} is closed")
+                self._check_health(self._writer, self.profile)
+                self._writer_owner = threading.get_ident()
+            self._writer_depth += 1
+
+            try:
+                yield self._writer.connection
+            finally:
+                self._writer_depth -= 1
+                if self._writer_depth == 0:
+                    self._writer_owner = None
+        finally:
+            self._writer_lock.release()
+
+    def reader(self) -> sqlite3.Connection:
+        """
+        Return the calling thread's read connection, assigning it one the first time.
+        """
+        pooled = getattr(self._local, 'reader', None)
+        if pooled is None:
+            pooled = self._checkout_reader()
+            self._local.reader = pooled
+
+        self._check_health(pooled, self.reader_profile)
+        return pooled.connection
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Return the writer connection inside a writer() block, otherwise the calling thread's read connection.
+        """
+        return self._writer.connection if self.holds_writer() else self.reader()
+
+    def release_reader(self):
+        """
+        Give the calling thread's read connection back to the pool, e.g. when a worker thread is done reading.
+        """
+        pooled = getattr(self._local, 'reader', None)
+        if pooled is None:
+            return
+
+        self._local.reader = None
+        with self._readers:
+            self._assigned_readers.pop(threading.get_ident(), None)
+            if self._closed:
+                pooled.connection.close()
+            else:
+                self._idle_readers.append(pooled)
+            self._readers.notify()
+
+    def _checkout_reader(self) -> PooledConnection:
+        deadline = time.monotonic() + self.timeout
+        with self._readers:
+            while True:
+                if self._closed:
+                    raise RuntimeError(f"Connection pool for {self.db_path} is closed")
+
+                # Threads that ended without releasing their connection give it back here
+                for ident, (thread, pooled) in list(self._assigned_readers.items()):
+                    if not thread.is_alive():
+                        del self._assigned_readers[ident]
+                        self._idle_readers.append(pooled)
+
+                if self._idle_readers:
+                    pooled = self._idle_readers.pop()
+                    break
+
+                if self._reader_count < self.max_readers:
+                    pooled = PooledConnection(self._connect(self.reader_profile))
+                    self._reader_count += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Timed out after {self.timeout} seconds waiting for one of the {self.max_readers} "
+                                       f"read connections to {self.db_path}")
+                self._readers.wait(min(remaining, 1.0))
+
+            self._assigned_readers[threading.get_ident()] = (threading.current_thread(), pooled)
+            return pooled
+
+    def close(self):
+        """
+        Close every connection, read connections still assigned to a thread included.
+        """
+        with self._readers:
+            self._closed = True
+            for pooled in self._idle_readers + [pooled for thread, pooled in self._assigned_readers.values()]:
+                pooled.connection.close()
+            self._idle_readers = []
+            self._assigned_readers = {}
+            self._readers.notify_all()
+
+        with self._writer_lock:
+            self._writer.connection.close()
@@ -0,0 +1,82 @@
+import logging
+import re
+import sqlite3
+
+from cls_env_config import EnvConfigSingleton as EnvConfig
+
+class SqliteTools:
+    """
+    Connection factory for player_metrics.db.
+
+    Every connection gets a PRAGMA profile from the sqlite_profiles section of config.json. A named
+    profile only lists what it changes, the rest comes from the "default" profile. With WAL journaling
+    the reports read the database while an import is writing it instead of stalling on "database is locked".
+    """
+    # Used when config.json has no sqlite_profiles section
+    DEFAULT_PROFILE = {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    }
+    # The read-only profile of the pooled read connections, also used when config.json has no sqlite_profiles
+    REPORT_PROFILE = {"query_only": True}
+
+    # busy_timeout first so the journal_mode switch waits for other connections, query_only last
+    # so it doesn't block the other PRAGMAs
+    PRAGMA_ORDER = ("busy_timeout", "journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "query_only")
+
+    @staticmethod
+    def get_profile(profile: str = "default") -> dict:
+        """
+        Return the PRAGMAs of a profile, the named profile's settings over the default profile.
+        """
+        # merged_config is None when the repository root isn't found, e.g. a script run from another directory
+        profiles = (EnvConfig().merged_config or {}).get('sqlite_profiles') or {"report": SqliteTools.REPORT_PROFILE}
+
+        pragmas = dict(profiles.get('default', SqliteTools.DEFAULT_PROFILE))
+        if profile != "default":
+            if profile not in profiles:
+                raise ValueError(f"SQLite profile '{profile}' not found in config.json")
+            pragmas.update(profiles[profile])
+
+        return pragmas
+
+    @staticmethod
+    def apply_profile(connection: sqlite3.Connection, pragmas: dict):
+        """
+        Run the PRAGMAs on the connection.
+        """
+        def pragma_order(name):
+            return SqliteTools.PRAGMA_ORDER.index(name) if name in SqliteTools.PRAGMA_ORDER else len(SqliteTools.PRAGMA_ORDER)
+
+        for name in sorted(pragmas, key=pragma_order):
+            value = pragmas[name]
+            if isinstance(value, bool):
+                value = int(value)
+
+            # PRAGMA values can't be bound as parameters, only names and numbers are accepted
+            if not re.fullmatch(r"[a-z_]+", name) or not re.fullmatch(r"-?\d+|[A-Za-z_]+", str(value)):
+                raise ValueError(f"Invalid SQLite PRAGMA {name} = {value}")
+
+            result = connection.execute(f"PRAGMA {name} = {value}").fetchone()
+
+            # journal_mode returns the mode in effect, e.g. an in-memory database stays "memory"
+            if name == "journal_mode" and result is not None and str(result[0]).lower() != str(value).lower():
+                logging.warning(f"SQLite journal_mode is {result[0]}, not {value}")
+
+    @staticmethod
+    def connect(db_path: str, profile: str = "default", **connect_kwargs) -> sqlite3.Connection:
+        """
+        Open a connection to the database with the PRAGMAs of the profile applied.
+
+        Args:
+            db_path: Database file
+            profile: Name of the profile in the sqlite_profiles section of config.json
+            connect_kwargs: Passed on to sqlite3.connect
+        """
+        connection = sqlite3.connect(db_path, **connect_kwargs)
+        SqliteTools.apply_profile(connection, SqliteTools.get_profile(profile))
+        return connection
@@ -0,0 +1,174 @@
+import logging
+import queue
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+class StageStats:
+    """
+    Item, busy time and queue depth counters for one stage of a StagedPipeline.
+    """
+    def __init__(self, name: str, input_queue: queue.Queue = None):
+        self.name = name
+        self.input_queue = input_queue
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.max_depth = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        """
+        Count one item that kept the stage busy for seconds.
+        """
+        with self._lock:
+            self.items += 1
+            self.busy_seconds += seconds
+            self.max_depth = max(self.max_depth, self.depth)
+
+    @property
+    def depth(self) -> int:
+        """
+        Items waiting in the stage's input queue.
+        """
+        return self.input_queue.qsize() if self.input_queue is not None else 0
+
+    @property
+    def throughput(self) -> float:
+        """
+        Items per second since the pipeline started.
+        """
+        elapsed = time.perf_counter() - self.started
+        return self.items / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.name}: {self.items} items, {self.throughput:.2f} items/s, busy {self.busy_seconds:.1f} s, "
+                f"queue depth {self.depth} (max {self.max_depth})")
+
+class StagedPipeline:
+    """
+    Two-stage producer/consumer pipeline that keeps the items in order.
+
+    1. prepare(item) runs on a pool of prepare_workers threads, e.g. decoding and preprocessing images.
+    2. process(item, prepared) runs on a single thread in the original item order, e.g. OCR that has to
+       see the screenshots of a capture group in sequence.
+
+    The caller consumes the (item, result) pairs from results() in the original order on its own thread,
+    e.g. the database writes, which stay on the thread that owns the connection. It isn't a pipeline
+    thread, the caller records its time per item in stats['consume'].
+
+    The queues between the stages are bounded by queue_size so a slow stage holds back the ones
+    before it instead of piling up decoded images. An exception raised by prepare() or process() is
+    re-raised by results() for the item it belongs to.
+    """
+    def __init__(self, items, prepare, process, prepare_workers: int = 2, queue_size: int = 8):
+        self.items = list(items)
+        self.prepare = prepare
+        self.process = process
+        self.prepare_workers = max(1, prepare_workers)
+
+        # Pending prepare() futures in item order, and the processed results waiting for the consumer
+        self._prepared_queue = queue.Queue(maxsize=queue_size)
+        self._results_queue = queue.Queue(maxsize=queue_size)
+
+        # The prepare stage is fed straight from the items, the other stages from the queue before them
+        self.stats = {
+            'prepare': StageStats('prepare'),
+            'process': StageStats('process', self._prepared_queue),
+            'consume': StageStats('consume', self._results_queue),
+        }
+
+        self._stop_event = threading.Event()
+        self._executor = None
+        self._threads = []
+
+    def start(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.prepare_workers, thread_name_prefix="pipeline-prepare")
+        self._threads = [
+            threading.Thread(target=self._feed, name="pipeline-feed", daemon=True),
+            threading.Thread(target=self._process_in_order, name="pipeline-process", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        return self
+
+    def close(self):
+        """
+        Stop the stages, e.g. when the consumer gives up early. Unfinished items are dropped.
+        """
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def results(self):
+        """
+        Yield (item, result) for every item in order, blocking until each one has been processed.
+        The caller records the time it spends on each result in stats['consume'].
+        """
+        for _ in range(len(self.items)):
+            item, result, error = self._results_queue.get()
+            if error is not None:
+                raise error
+            yield item, result
+
+    def log_stats(self, level=logging.INFO):
+        for stage_stats in self.stats.values():
+            logging.log(level, f"Pipeline {stage_stats.summary()}")
+
+    def _put(self, target_queue: queue.Queue, value) -> bool:
+        """
+        Put value on a bounded queue, giving up when the pipeline is closed.
+        """
+        while not self._stop_event.is_set():
+            try:
+                target_queue.put(value, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _timed_prepare(self, item):
+        prepare_start = time.perf_counter()
+        prepared = self.prepare(item)
+        self.stats['prepare'].record(time.perf_counter() - prepare_start)
+        return prepared
+
+    def _feed(self):
+        # The bounded queue of futures limits how far the prepare stage runs ahead of the process stage
+        for item in self.items:
+            if not self._put(self._prepared_queue, (item, self._executor.submit(self._timed_prepare, item))):
+                return
+
+    def _process_in_order(self):
+        for _ in range(len(self.items)):
+            value = None
+            while value is None and not self._stop_event.is_set():
+                try:
+                    value = self._prepared_queue.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+            if value is None:
+                return
+
+            item, future = value
+            try:
+                prepared = future.result()
+                process_start = time.perf_counter()
+                result = self.process(item, prepared)
+                self.stats['process'].record(time.perf_counter() - process_start)
+                output = (item, result, None)
+            except Exception as e:
+                output = (item, None, e)
+
+            if not self._put(self._results_queue, output):
+                return
@@ -1,12 +1,12 @@
 import logging
 import os
-import sqlite3
 import sys
 
 import pandas as pd
 
 try:
     from cls_env_tools import EnvTools
+    from cls_sqlite_tools import SqliteTools
 except ImportError as e:
     logging.error(f"Error importing required modules: {e}")
     sys.exit(1)
@@ -288,7 +288,7 @@ def main():
         repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
     db_path = os.path.join(str(repo_root), 'player_metrics.db')
-    conn = sqlite3.connect(db_path)
+    conn = SqliteTools.connect(db_path, "report")
 
     try:
         df = get_low_activity_report(
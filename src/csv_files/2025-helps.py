@@ -1,13 +1,14 @@
 import csv
-import sqlite3
 from datetime import datetime
 
+from cls_sqlite_tools import SqliteTools
+
 # File paths
 csv_file_path = '/Users/tedbouskill/Repos/MyGitHub/wordscape-score-scraper/src/csv_files/2025-helps.csv'
 db_path = '/Users/tedbouskill/Repos/MyGitHub/wordscape-score-scraper/player_metrics.db'
 
 # Connect to the SQLite database
-conn = sqlite3.connect(db_path)
+conn = SqliteTools.connect(db_path)
 cursor = conn.cursor()
 
 # Read the CSV file
@@ -17,7 +18,7 @@ with open(csv_file_path, 'r') as csvfile:
         player_tag = row['Player Tag']
 
         # Get the player ID from the players table
-        cursor.execute("SELECT player_id FROM players WHERE LOWER(player_tag) = LOWER(?)", (player_tag,))
+        cursor.execute("SELECT id FROM players WHERE player_tag = ? COLLATE NOCASE", (player_tag,))
         player_id = cursor.fetchone()
 
         if player_id:
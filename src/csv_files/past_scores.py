@@ -1,8 +1,9 @@
 import csv
-import sqlite3
 from datetime import datetime, timedelta
 import os
 
+from cls_sqlite_tools import SqliteTools
+
 # Paths to the CSV file and SQLite database
 csv_file = "past_scores.csv"
 db_file = os.path.join("..", "player_metrics.db")  # Database in the parent folder
@@ -27,7 +28,7 @@ def calculate_friday_before(date_str):
 
 def import_scores_from_csv(csv_file, db_file):
     # Connect to the SQLite database
-    connection = sqlite3.connect(db_file)
+    connection = SqliteTools.connect(db_file)
     cursor = connection.cursor()
 
     # Read the CSV file
@@ -50,7 +51,7 @@ def import_scores_from_csv(csv_file, db_file):
             """, (player_tag, earliest_date))
 
             # Retrieve the player_id and start_date
-            cursor.execute("SELECT player_id, start_date FROM players WHERE player_tag = ?", (player_tag,))
+            cursor.execute("SELECT id, start_date FROM players WHERE player_tag = ? COLLATE NOCASE", (player_tag,))
             player = cursor.fetchone()  # Fetch one row as a tuple
 
             if player:
@@ -1,5 +1,6 @@
 import csv
-import sqlite3
+
+from cls_sqlite_tools import SqliteTools
 
 # Paths to the CSV file and SQLite database
 csv_file = "./players_seed.csv"
@@ -7,7 +8,7 @@ db_file = "../player_metrics.db"
 
 def seed_players_from_csv(csv_file, db_file):
     # Connect to the SQLite database
-    connection = sqlite3.connect(db_file)
+    connection = SqliteTools.connect(db_file)
     cursor = connection.cursor()
 
     # Read the CSV file
@@ -30,7 +31,7 @@ def seed_players_from_csv(csv_file, db_file):
             cursor.execute("""
             UPDATE players
             SET is_active = ?, join_date = ?, leave_date = ?
-            WHERE player_tag = ?
+            WHERE player_tag = ? COLLATE NOCASE
             """, (is_active, join_date, leave_date, player_tag))
 
     # Commit and close the connection
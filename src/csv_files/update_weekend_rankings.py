@@ -1,8 +1,8 @@
-import sqlite3
+from cls_sqlite_tools import SqliteTools
 
 def update_weekend_rankings(db_file):
     # Connect to the SQLite database
-    connection = sqlite3.connect(db_file)
+    connection = SqliteTools.connect(db_file)
     cursor = connection.cursor()
 
     # Get all unique weekend dates
@@ -1,6 +1,11 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
+import argparse
 import cv2
+import itertools
 import logging
+import multiprocessing
 import pytesseract
 import os
 import sys
@@ -14,20 +19,61 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 try:
     from cls_env_config import EnvConfigSingleton as EnvConfig
     from cls_env_tools import EnvTools
+    from cls_glyph_classifier import GlyphClassifier
     from cls_img_tools import ImageTools
+    from cls_layout_profiles import LayoutProfiles
     from cls_logging_manager import LoggingManagerSingleton as LoggingManager
+    from cls_ocr_cache import OcrCache
+    from cls_ocr_engine import OcrEngineSingleton as OcrEngine
+    from cls_ocr_journal import OcrJournal
     from cls_project_tools import ProjectTools
+    from cls_row_fingerprints import RowFingerprints
+    from cls_row_matcher import RowMatcher
+    from cls_staged_pipeline import StagedPipeline
     from cls_string_helpers import StringHelpers
 
-    from cls_db_tools import DbRepositorySingleton
+    from cls_db_tools import DbRepositorySingleton, player_tag_key
 except ImportError as e:
     logging.error(f"Error importing required modules: {e}")
     sys.exit(1)
 
-import easyocr
+# OCR engine, created in main() and in each OCR worker process by init_ocr_worker()
+ocr_engine = None
 
-# Initialize EasyOCR
-reader = easyocr.Reader(['en'])
+# Digit glyph classifier for the rank badge and scores, None until glyph templates have been harvested
+digit_classifier = None
+
+# Journal of the raw OCR results, set by init_importer() when a journal path is configured
+ocr_journal = None
+
+def create_ocr_engine(ocr_settings: dict, ocr_cache_settings: dict = None) -> OcrEngine:
+    """
+    Create the OCR engine, with the OCR result cache when ocr_cache_settings has a cache path.
+    """
+    engine = OcrEngine(**ocr_settings)
+    if ocr_cache_settings and ocr_cache_settings.get('cache_path'):
+        engine.set_cache(OcrCache(**ocr_cache_settings))
+    return engine
+
+def init_ocr_worker(ocr_settings: dict, ocr_cache_settings: dict = None, fast_path: bool = False, layout_cache_path: str = None,
+                    escalation: dict = None):
+    """
+    Process pool initializer that warms up the OCR engine once per worker process.
+    The player tags come with each task, see ocr_capture_group.
+    """
+    global ocr_engine, ocr_fast_path, digit_classifier, layout_profiles, escalation_settings
+    ocr_engine = create_ocr_engine(ocr_settings, ocr_cache_settings)
+    ocr_engine.warm_up()
+    digit_classifier = GlyphClassifier.load(DIGIT_GLYPHS_PATH)
+    layout_profiles = create_layout_profiles(layout_cache_path)
+    ocr_fast_path = fast_path
+    escalation_settings = {**escalation_settings, **(escalation or {})}
+
+def create_layout_profiles(layout_cache_path: str = None) -> LayoutProfiles:
+    """
+    Create the tournament screen layout profiles, cached in layout_cache_path when it is set.
+    """
+    return LayoutProfiles(layout_cache_path, 'team_tournament', LAYOUT_CROPS, LAYOUT_ANCHORS)
 
 PLAYER_TAG_IGNORE_LIST = [
     "DestroyaDrew",
@@ -59,6 +105,86 @@ PLAYER_TAG_CORRECTIONS_NORMALIZED = {
 # Set for fast exact (case-sensitive) membership checks.
 PLAYER_TAG_IGNORE_SET = {tag.strip() for tag in PLAYER_TAG_IGNORE_LIST}
 
+# Crop rectangles (x, y, width, height) in the 1200 px wide reference layout, a height of None runs to the bottom.
+# LayoutProfiles shifts them for other resolutions.
+STATE_CROP = (450, 680, 300, 100)
+RANK_CROP = (160, 480, 200, 200)
+PLAYERS_CROP = (300, 1030, 900, None)
+
+# Maximum distance in pixels between the y-centres of a player tag and its score in the 1200 px wide image
+SCORE_ROW_MAX_DISTANCE = 100
+
+# Row segmentation for the recognition-only fast path, in players crop coordinates.
+# The height limits drop the stars above each score, the FINISH button and other UI chrome.
+TAG_COLUMN = (0, 600)
+SCORE_COLUMN = (650, 900)
+ROW_BAND_SETTINGS = {'min_height': 20, 'max_height': 60, 'min_gap': 4}
+
+# The rows are segmented without the avatar outlines and card borders, which otherwise join a tag to the
+# avatar below it into one band taller than max_height, see ImageTools.remove_line_art
+ROW_LINE_ART_SETTINGS = {'stroke': 3, 'line_length': 100}
+
+# Player tags are left aligned, a tag band starting further right than this from the leftmost one is
+# what's left of an avatar
+TAG_LEFT_TOLERANCE = 7
+
+# Template of the FINISHED banner text used to classify the tournament state without running tesseract.
+# It's created from the first screenshot tesseract reads as FINISHED if the file is missing.
+FINISHED_TEMPLATE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'images', 'templates', 'finished_banner.png'))
+
+# Below this confidence the template match is ambiguous and tesseract reads the state instead
+STATE_MIN_CONFIDENCE = 0.5
+
+# Template of the TEAMMATES tab label above the player rows, the anchor for the players crop
+TEAMMATES_TAB_TEMPLATE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'images', 'templates', 'teammates_tab.png'))
+
+# Layout anchors: (template, search rectangle, top of the template in the reference layout).
+# The FINISHED banner only shows on finished tournaments, in progress screenshots keep the reference state and rank crops.
+LAYOUT_ANCHORS = {
+    'finished_banner': (FINISHED_TEMPLATE_PATH, (0, 400, 1200, 600), 723),
+    'teammates_tab': (TEAMMATES_TAB_TEMPLATE_PATH, (0, 600, 1200, 900), 858),
+}
+
+# Crops and the anchor each one moves with
+LAYOUT_CROPS = {
+    'state': (STATE_CROP, 'finished_banner'),
+    'rank': (RANK_CROP, 'finished_banner'),
+    'players': (PLAYERS_CROP, 'teammates_tab'),
+}
+
+# Digit glyph templates harvested by src/tools/harvest_digit_glyphs.py
+DIGIT_GLYPHS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'images', 'templates', 'digit_glyphs.npz'))
+
+# Below this confidence a rank or score read by the digit classifier goes to EasyOCR instead
+DIGIT_MIN_CONFIDENCE = 0.4
+
+# EasyOCR mag_ratio of the first OCR tier's readtext pass over the players crop. The text detector runs on 56%
+# of the pixels of the EasyOCR default of 1.0, the tag lines of the smallest sample screenshots stay about 11 px high.
+TIER1_MAG_RATIO = 0.75
+
+# Rows read below this confidence, with an unknown tag or without a numeric score go to the second OCR tier
+ESCALATION_MIN_CONFIDENCE = 0.5
+
+# The second tier reads the row band again upscaled by this factor, with this many pixels above and below it
+ESCALATION_SCALE = 2.0
+ESCALATION_ROW_PADDING = 6
+
+# Importer name recorded in the processed_images ledger
+IMPORT_TYPE = "tournament_scores"
+
+# Crop rectangles per source resolution, kept in memory until main() or init_ocr_worker() loads the layout cache
+layout_profiles = create_layout_profiles()
+
+# When True the players crop is segmented into rows and sent straight to the recognizer, skipping text detection
+ocr_fast_path = False
+
+# OCR tier settings: min_confidence and scale of the second tier, and the EasyOCR mag_ratio of the first
+# readtext pass (None keeps the EasyOCR default)
+escalation_settings = {'min_confidence': ESCALATION_MIN_CONFIDENCE, 'scale': ESCALATION_SCALE, 'tier1_mag_ratio': TIER1_MAG_RATIO}
+
+# player_tag_key of the tags of the players in the database, rows with other tags are escalated. None skips the tag check.
+known_player_tags = None
+
 def correct_player_tag(tag: str) -> str:
     """
     Correct common OCR misreadings of player tags.
@@ -84,40 +210,118 @@ def correct_player_tag(tag: str) -> str:
     normalized_tag = cleaned_tag.lower()
     return PLAYER_TAG_CORRECTIONS_NORMALIZED.get(normalized_tag, cleaned_tag)
 
-def process_image(file_name: str) -> tuple:
-    rank_txt = None
+def read_tournament_state(state_img) -> str:
+    """
+    Read the tournament state banner, "FINISHED" or the time left.
 
-    img, new_height = ImageTools.resize_image_opencv(file_name, new_width=1200)
+    The banner is matched against the FINISHED template first. Tesseract only runs when there is no
+    template yet or the match is ambiguous.
+    """
+    finished_template = ImageTools.load_template(FINISHED_TEMPLATE_PATH)
+    if finished_template is not None:
+        state, confidence = ImageTools.classify_tournament_state(state_img, finished_template)
+        logging.debug(f"Tournament state: {state}, Confidence: {confidence:.2f}")
+        if confidence >= STATE_MIN_CONFIDENCE:
+            return state
 
-    # Crop the state image which will tell us if the tournament is finished or in progress with the time left
-    state_img = ImageTools.crop_image_opencv(img, 450, 680, 300, 100)
     state_txt = pytesseract.image_to_string(state_img).strip()
 
-    # Check if the tournament is finished
+    # Harvest the template from the first FINISHED banner so the next screenshots skip tesseract
+    if state_txt == "FINISHED" and finished_template is None:
+        template = ImageTools.create_text_template(state_img)
+        if template is not None:
+            os.makedirs(os.path.dirname(FINISHED_TEMPLATE_PATH), exist_ok=True)
+            cv2.imwrite(FINISHED_TEMPLATE_PATH, template)
+            ImageTools.load_template.cache_clear()
+            logging.info(f"Saved FINISHED banner template to {FINISHED_TEMPLATE_PATH}")
+
+    return state_txt
+
+def preprocess_image(file_name: str, image_hash: str = None) -> dict:
+    """
+    Decode a tournament screenshot and prepare the images the OCR stage reads.
+
+    This only uses OpenCV and the state template so it can run on the decode threads of the pipeline
+    while the OCR stage works on the previous screenshots.
+
+    Args:
+        file_name: Screenshot to read
+        image_hash: Content hash from skip_committed_images, computed here when None
+
+    Returns:
+        dict with the image_hash, state_txt, rank_crop and rank_img (None unless the tournament is finished),
+        players_crop and the thresholded players_img
+    """
+    # The OCR cache is keyed on the file contents so renamed or re-exported screenshots still hit it
+    if image_hash is None:
+        image_hash = ProjectTools.get_file_hash(file_name)
+
+    # The screenshot is decoded once and only the state, rank and players regions are resized,
+    # everything downstream works on a single channel
+    source = ImageTools.decode_for_regions(file_name, new_width=1200)
+    new_height = source[2]
+    crops = layout_profiles.get_crops(file_name, source, ('state', 'rank'))
+
+    # The state image will tell us if the tournament is finished or in progress with the time left
+    state_txt = read_tournament_state(ImageTools.resize_region_opencv(source, crops['state'], grayscale=True))
+
+    # Extract the rank, isolating the dark brown text from the yellow star and light blue background
+    rank_img = None
     if state_txt == "FINISHED":
-        # Crop the rank image & extract the rank
-        rank_img = ImageTools.crop_image_opencv(img, 100, 540, 200, 110)
-        rank_img = ImageTools.convert_non_white_to_black_opencv(rank_img)
-        rank_txt = pytesseract.image_to_string(rank_img).strip()
-        logging.info(f"Team rank: {rank_txt}")
-        rank_img = ImageTools.crop_image_opencv(img, 160, 480, 200, 200)
-        # Isolate dark brown text from yellow star and light blue background
-        rank_img = ImageTools.isolate_dark_text_opencv(rank_img, threshold=150)
-        
-        # Upscale the image to help OCR (2x or 3x size)
-        rank_img = cv2.resize(rank_img, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC)
-        
-        # Apply slight blur to reduce noise, then sharpen
-        rank_img = cv2.GaussianBlur(rank_img, (3, 3), 0)
-        
-        # Show the image for debugging
-        #cv2.imshow("Rank Image", rank_img)
-        #cv2.waitKey(0)  # Wait for a key press to close the window
-        #cv2.destroyAllWindows()  # Close all OpenCV windows
-        
-        # Try with custom Tesseract config for better number recognition
-        rank_results = reader.readtext(rank_img, detail=0, paragraph=False)
-        
+        rank_img = ImageTools.isolate_dark_text_opencv(ImageTools.resize_region_opencv(source, crops['rank'], grayscale=True), threshold=150)
+
+    # Extract the player names and scores from the players image.
+    # The rows sit lower while the tournament is in progress so each state has its own players crop.
+    layout_variant = "FINISHED" if state_txt == "FINISHED" else "IN_PROGRESS"
+    players_crop = layout_profiles.get_crops(file_name, source, ('players',), layout_variant)['players']
+    players_crop = players_crop[:3] + (new_height - players_crop[1],)
+    players_img = ImageTools.threshold_gray(ImageTools.resize_region_opencv(source, players_crop, grayscale=True), 200)
+
+    return {
+        'image_hash': image_hash,
+        'state_txt': state_txt,
+        'rank_crop': crops['rank'],
+        'rank_img': rank_img,
+        'players_crop': players_crop,
+        'players_img': players_img,
+    }
+
+def ocr_preprocessed_image(prepared: dict, row_fingerprints: RowFingerprints = None) -> tuple:
+    """
+    Read the rank and player rows from the images prepared by preprocess_image.
+
+    Args:
+        prepared: Output of preprocess_image
+        row_fingerprints: Rows read from the earlier screenshots of the capture group, rows found there are
+            blanked out of the players crop before the OCR and the new rows are added
+
+    Returns:
+        (rank_txt, player_results, tier_counts) where player_results is the raw EasyOCR output for the players
+        crop and tier_counts the Counter of rows by the tier that read them, from escalate_player_rows
+    """
+    rank_txt = None
+    image_hash = prepared['image_hash']
+
+    # Check if the tournament is finished
+    if prepared['state_txt'] == "FINISHED":
+        rank_img = prepared['rank_img']
+
+        rank_results = read_rank_glyphs(rank_img)
+        if not rank_results:
+            # Upscale the image to help OCR (2x or 3x size)
+            rank_img = cv2.resize(rank_img, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC)
+
+            # Apply slight blur to reduce noise, then sharpen
+            rank_img = cv2.GaussianBlur(rank_img, (3, 3), 0)
+
+            # Show the image for debugging
+            #cv2.imshow("Rank Image", rank_img)
+            #cv2.waitKey(0)  # Wait for a key press to close the window
+            #cv2.destroyAllWindows()  # Close all OpenCV windows
+
+            # Try with custom Tesseract config for better number recognition
+            rank_results = ocr_engine.readtext_cached(rank_img, image_hash, prepared['rank_crop'], 150, detail=0, paragraph=False)
+
         # Extract the rank text from the list returned by easyocr
         if rank_results and len(rank_results) > 0:
             rank_txt = rank_results[0]
@@ -132,15 +336,251 @@ def process_image(file_name: str) -> tuple:
             logging.warning("No rank text extracted from image.")
             rank_txt = None
 
+    players_crop = prepared['players_crop']
+    players_img = prepared['players_img']
+
+    # Scrolled screenshots overlap, the rows already read from the earlier screenshots are skipped.
+    # The blanked rows are part of the cache key since they depend on the other screenshots in the group.
+    ocr_kwargs = {}
+    if row_fingerprints is not None:
+        skipped_rows, rows_left = mask_seen_rows(players_img, row_fingerprints)
+        if skipped_rows:
+            logging.info(f"Skipping {len(skipped_rows)} rows already read from this capture group")
+            if rows_left == 0:
+                return rank_txt, [], Counter()
+            ocr_kwargs['skipped_rows'] = skipped_rows
+
+    # First tier: the cheap pass over the whole crop
+    results = None
+    if ocr_fast_path:
+        results = ocr_engine.cached(image_hash, players_crop, 200, {'fast_path': {**ROW_BAND_SETTINGS, **ROW_LINE_ART_SETTINGS, 'tag_left_tolerance': TAG_LEFT_TOLERANCE}, **ocr_kwargs},
+                                    lambda: recognize_player_rows(players_img))
+
+    # Fall back to full text detection when the rows couldn't be segmented
+    if not results:
+        readtext_kwargs = {}
+        if escalation_settings.get('tier1_mag_ratio') is not None:
+            readtext_kwargs['mag_ratio'] = escalation_settings['tier1_mag_ratio']
+        results = ocr_engine.cached(image_hash, players_crop, 200, {**ocr_kwargs, **readtext_kwargs},
+                                    lambda: ocr_engine.readtext(players_img, **readtext_kwargs))
+
+    # Second tier: only the rows the first tier read poorly
+    results, tier_counts = escalate_player_rows(players_img, results, image_hash, players_crop, ocr_kwargs)
+
+    return rank_txt, results, tier_counts
+
+def player_row_needs_escalation(row_results) -> bool:
+    """
+    Return True when the OCR results of one leaderboard row can't be trusted: a result below the minimum
+    confidence, no tag or score, a tag that isn't a known player or a score that isn't numeric.
+    """
+    tags = [text for box, text, confidence in row_results if box[0][0] < 50]
+    scores = [text for box, text, confidence in row_results if box[0][0] > 650]
+
+    if not tags:
+        return True
+
+    # Rows of ignored tags are dropped by match_player_scores whatever their score
+    tag = correct_player_tag(tags[0]).strip()
+    if tag in PLAYER_TAG_IGNORE_SET:
+        return False
+
+    if any(confidence < escalation_settings['min_confidence'] for box, text, confidence in row_results):
+        return True
+
+    if known_player_tags is not None and player_tag_key(tag) not in known_player_tags:
+        return True
+
+    return not scores or not all(StringHelpers.is_all_numeric(score) for score in scores)
+
+def escalate_player_rows(players_img, results, image_hash: str, players_crop, ocr_kwargs: dict) -> tuple:
+    """
+    Read the rows that fail player_row_needs_escalation again from the row band upscaled by the escalation
+    scale with full text detection. The second tier replaces a row's results only when they pass the checks.
+
+    Returns:
+        (results, tier_counts) where tier_counts counts the rows read at 'tier1', fixed at 'tier2'
+        and still failing the checks after the second tier as 'unresolved'
+    """
+    tier_counts = Counter()
+
+    height = players_img.shape[0]
+    scale = escalation_settings['scale']
+
+    def y_center(box):
+        return (box[0][1] + box[2][1]) / 2
+
+    results = list(results)
+    for y_min, y_max in find_player_rows(players_img):
+        row_results = [result for result in results if y_min <= y_center(result[0]) <= y_max]
+        if not player_row_needs_escalation(row_results):
+            tier_counts['tier1'] += 1
+            continue
+
+        band_min = max(0, y_min - ESCALATION_ROW_PADDING)
+        band_max = min(height, y_max + ESCALATION_ROW_PADDING)
+        row_img = cv2.resize(players_img[band_min:band_max], None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+
+        tier2_results = ocr_engine.cached(image_hash, players_crop, 200, {**ocr_kwargs, 'tier2_row': [band_min, band_max], 'scale': scale},
+                                          lambda: ocr_engine.readtext(row_img))
+
+        # Back to players crop coordinates
+        tier2_results = [([[int(round(x / scale)), int(round(y / scale)) + band_min] for x, y in box], text, confidence)
+                         for box, text, confidence in tier2_results]
+
+        if tier2_results and not player_row_needs_escalation(tier2_results):
+            results = [result for result in results if not y_min <= y_center(result[0]) <= y_max] + tier2_results
+            tier_counts['tier2'] += 1
+        else:
+            tier_counts['unresolved'] += 1
+
+    if tier_counts['tier2'] or tier_counts['unresolved']:
+        logging.info(f"OCR tiers: {tier_counts['tier1']} rows read at tier 1, {tier_counts['tier2']} fixed at tier 2, "
+                     f"{tier_counts['unresolved']} unresolved")
+
+    return results, tier_counts
+
+def ocr_image(file_name: str, row_fingerprints: RowFingerprints = None, image_hash: str = None) -> tuple:
+    """
+    Run the OCR stage for a tournament screenshot, preprocessing and OCR in one call.
+
+    This doesn't touch the database so it can run in a worker process.
+
+    Returns:
+        (rank_txt, player_results, tier_counts) as returned by ocr_preprocessed_image
+    """
+    return ocr_preprocessed_image(preprocess_image(file_name, image_hash), row_fingerprints)
+
+def find_row_cells(players_img) -> tuple:
+    """
+    Segment the thresholded players crop into the tag and score cells of the leaderboard rows.
+
+    Returns:
+        (tag_cells, score_cells) as [x_min, x_max, y_min, y_max] boxes, see ImageTools.find_text_cells
+    """
+    text_img = ImageTools.remove_line_art(players_img, **ROW_LINE_ART_SETTINGS)
+
+    tag_cells = ImageTools.find_text_cells(text_img, *TAG_COLUMN, **ROW_BAND_SETTINGS)
+    if tag_cells:
+        tag_left = min(cell[0] for cell in tag_cells)
+        tag_cells = [cell for cell in tag_cells if cell[0] <= tag_left + TAG_LEFT_TOLERANCE]
+
+    score_cells = ImageTools.find_text_cells(text_img, *SCORE_COLUMN, **ROW_BAND_SETTINGS)
+
+    return tag_cells, score_cells
+
+def find_player_rows(players_img) -> list:
+    """
+    Return the [y_min, y_max] band of each leaderboard row in the thresholded players crop, from the top
+    of the player tag to the bottom of the score below it.
+    """
+    tag_cells, score_cells = find_row_cells(players_img)
+
+    rows = []
+    for x_min, x_max, y_min, y_max in tag_cells:
+        score_bottoms = [cell[3] for cell in score_cells if 0 <= cell[2] - y_min <= SCORE_ROW_MAX_DISTANCE]
+        rows.append([y_min, max([y_max] + score_bottoms[:1])])
+    return rows
+
+def mask_seen_rows(players_img, row_fingerprints: RowFingerprints) -> tuple:
+    """
+    Blank out the rows of the players crop that row_fingerprints has already seen and add the others to it.
+    Rows cut off by the top or bottom of the crop are always kept and never fingerprinted.
+
+    Returns:
+        (skipped_rows, rows_left) where skipped_rows are the [y_min, y_max] bands blanked out
+    """
+    height = players_img.shape[0]
+
+    skipped_rows = []
+    rows_left = 0
+    for y_min, y_max in find_player_rows(players_img):
+        if y_min > 0 and y_max < height and row_fingerprints.check_row(players_img[y_min:y_max]):
+            players_img[y_min:y_max] = 0
+            skipped_rows.append([y_min, y_max])
+        else:
+            rows_left += 1
+
+    return skipped_rows, rows_left
+
+def ocr_capture_group(image_files: list, player_tags=None, image_hashes: dict = None) -> tuple:
+    """
+    OCR the screenshots of one capture group in order so the rows they share are only read once.
+
+    Args:
+        image_files: Screenshots of the capture group
+        player_tags: Snapshot of the known player tags taken when the batch started, see refresh_known_player_tags
+        image_hashes: dict of image file -> content hash from skip_committed_images, so the files aren't hashed again
+
+    Returns:
+        (dict of image file -> (rank_txt, player_results, ocr_seconds, tier_counts), rows_skipped)
+    """
+    global known_player_tags
+    if player_tags is not None:
+        known_player_tags = player_tags
+
+    row_fingerprints = RowFingerprints()
+
+    group_results = {}
+    for image_file in image_files:
+        ocr_start = time.perf_counter()
+        rank_txt, results, tier_counts = ocr_image(image_file, row_fingerprints, (image_hashes or {}).get(image_file))
+        group_results[image_file] = (rank_txt, results, time.perf_counter() - ocr_start, tier_counts)
+
+    return group_results, row_fingerprints.rows_skipped
+
+def read_rank_glyphs(rank_img) -> list:
+    """
+    Read the rank badge with the digit classifier.
+
+    Returns:
+        [rank_txt] in the same form as readtext(detail=0), or an empty list when EasyOCR has to read it
+    """
+    if digit_classifier is None:
+        return []
+
+    # The badge text is dark on light, the classifier wants light glyphs and the background around the badge dropped
+    rank_txt, confidence = digit_classifier.classify(cv2.bitwise_not(rank_img), ignore_border=True)
+    logging.debug(f"Rank glyphs: {rank_txt}, Confidence: {confidence:.2f}")
+
+    if confidence < DIGIT_MIN_CONFIDENCE or not (rank_txt.startswith('#') and rank_txt[1:].isdigit()):
+        return []
+
+    return [rank_txt]
+
+def recognize_player_rows(players_img) -> list:
+    """
+    Recognition-only OCR of the players crop.
+
+    The leaderboard rows are found with a horizontal projection profile of the thresholded crop and
+    the tag and score cells are sent straight to the recognizer, skipping the CRAFT text detector.
+    Scores the digit classifier reads confidently don't go to the recognizer at all.
+
+    Returns:
+        EasyOCR style (box, text, confidence) results, or an empty list if no player rows were found
+    """
+    tag_cells, score_cells = find_row_cells(players_img)
+    if not tag_cells:
+        return []
+
+    score_results = []
+    if digit_classifier is not None:
+        score_results, score_cells = digit_classifier.read_cells(players_img, score_cells, "0123456789", DIGIT_MIN_CONFIDENCE)
+
+    return ocr_engine.recognize(players_img, tag_cells + score_cells, []) + score_results
+
+def match_player_scores(results) -> tuple:
+    """
+    Match the OCR player tags with their scores based on the y-coordinate of the boxes.
+
+    Returns:
+        (matches, unmatched_texts, unmatched_scores)
+    """
     player_results = []
     unmatched_texts = []
     score_results = []
-    ignored_player_boxes = []
+    ignored_player_results = []
 
-    # Crop the players image and extract the player names and scores
-    players_img = ImageTools.crop_image_opencv(img, 300, 1030, 900, new_height - 1030)
-    players_img = ImageTools.convert_non_white_to_black_opencv(players_img, 200)
-    results = reader.readtext(players_img)
     for box, text, confidence in results:
         # Apply OCR correction for common misreadings
         corrected_text = correct_player_tag(text)
@@ -150,12 +590,11 @@ def process_image(file_name: str) -> tuple:
         # Skip tags on the ignore list entirely (not an error, just not our players).
         if corrected_text.strip() in PLAYER_TAG_IGNORE_SET:
             logging.debug(f"Ignoring tag on ignore list: '{corrected_text}'")
-            ignored_player_boxes.append(box)
+            ignored_player_results.append((box, corrected_text, confidence))
             continue
 
-        player_id = db_repository.get_player_id(corrected_text)
         if box[0][0] < 50:
-            if player_id is not None:
+            if db_repository.find_player(corrected_text) is not None:
                 player_results.append((box, corrected_text, confidence))
             else:
                 unmatched_texts.append((corrected_text, confidence))
@@ -167,43 +606,20 @@ def process_image(file_name: str) -> tuple:
     logging.debug(f"Length of player results: {len(player_results)}")
     logging.debug(f"Length of score results: {len(score_results)}")
 
-    # Match numeric values with text values based on y-coordinate
+    # Match numeric values with text values based on y-coordinate. Ignored tags still own their row
+    # so their scores aren't reported as unmatched.
+    score_rows = player_results + ignored_player_results
+    row_scores, unmatched_score_results = RowMatcher.assign(score_rows, score_results, SCORE_ROW_MAX_DISTANCE)
+
     matches = []
-    unmatched_scores = []
-    for text_box, text, text_confidence in player_results:
-        text_y = text_box[0][1]  # y-coordinate of the top-left corner of the text box
-        matched = False
-        for num_box, num_text, num_confidence in score_results:
-            num_y = num_box[0][1]  # y-coordinate of the top-left corner of the numeric box
-            if 0 < abs(num_y - text_y) < 66:
-                matches.append((text, num_text))
-                matched = True
-                break
-        if not matched:
-            # text is already corrected from earlier processing
-            player_id = db_repository.get_player_id(text)
-            if player_id:
-                matches.append((text, 0))
-            else:
-                unmatched_texts.append((text, text_confidence))
-
-    # Track unmatched scores
-    for num_box, num_text, num_confidence in score_results:
-        num_y = num_box[0][1]  # y-coordinate of the top-left corner of the numeric box
-        matched = False
-        for text_box, text, text_confidence in player_results:
-            text_y = text_box[0][1]  # y-coordinate of the top-left corner of the text box
-            if 0 <= abs(num_y - text_y) < 100:
-                matched = True
-                break
-        if not matched:
-            for ignored_box in ignored_player_boxes:
-                ignored_y = ignored_box[0][1]
-                if 0 <= abs(num_y - ignored_y) < 100:
-                    matched = True
-                    break
-        if not matched:
-            unmatched_scores.append((num_text, num_confidence))
+    for (text_box, text, text_confidence), score in zip(player_results, row_scores):
+        if score is not None:
+            matches.append((text, int(score[1].replace(",", ""))))
+        else:
+            # Only known players are in player_results so a missing score is recorded as 0
+            matches.append((text, 0))
+
+    unmatched_scores = [(num_text, num_confidence) for num_box, num_text, num_confidence in unmatched_score_results]
 
     # Print matched results
     logging.debug("Matched Results:")
@@ -220,7 +636,7 @@ def process_image(file_name: str) -> tuple:
     for score, confidence in unmatched_scores:
         logging.debug(f"Score: {score}, Confidence: {confidence}")
 
-    return matches, unmatched_texts, unmatched_scores, rank_txt
+    return matches, unmatched_texts, unmatched_scores
 
 def process_player_matches(matches, weekend_date, friday_date):
     """
@@ -231,21 +647,19 @@ def process_player_matches(matches, weekend_date, friday_date):
     """
     all_ok = True
 
-    for player_tag, score in matches:
+    # Resolve the players in one round, creating missing ones (new players are on the team and active)
+    players = db_repository.ensure_players([player_tag for player_tag, score in matches], friday_date)
+
+    score_rows = []
+    score_tags = []
+    for (player_tag, score), (player_id, is_on_team, is_active, created) in zip(matches, players):
         logging.info(f"Player: {player_tag}, Score: {score}")
 
-        # Ensure the player exists; create if missing (this also marks new players active)
-        player_id = db_repository.get_player_id(player_tag)
-        if not player_id:
-            logging.info(f"Player '{player_tag}' not found; creating new player with start date {friday_date}")
-            player_id = db_repository.get_player_id_create_if_new(player_tag, friday_date)
+        if created:
+            logging.info(f"Player '{player_tag}' not found; created new player (id={player_id}) with start date {friday_date}")
 
-        # Check if player is active
-        is_active = db_repository.is_player_active(player_id)
-        
         # If not active, check if they're on_team; if so, activate them
         if not is_active:
-            is_on_team = db_repository.is_player_on_team(player_id)
             if is_on_team:
                 logging.info(f"Player '{player_tag}' (id={player_id}) is on_team but not active; activating")
                 db_repository.set_player_active(player_id)
@@ -257,36 +671,312 @@ def process_player_matches(matches, weekend_date, friday_date):
             all_ok = False
             continue
 
-        try:
-            db_repository.upsert_weekend_player_score(weekend_date, player_id, score)
-        except Exception as e:
-            logging.exception(f"Failed to upsert score for player '{player_tag}' (id={player_id}): {e}")
-            all_ok = False
+        score_rows.append((player_id, score))
+        score_tags.append(player_tag)
+
+    try:
+        outcomes = db_repository.bulk_upsert_weekend_player_scores(weekend_date, score_rows)
+    except Exception as e:
+        logging.exception(f"Failed to upsert the scores of {', '.join(score_tags)}: {e}")
+        return False
+
+    for player_tag, (player_id, score), outcome in zip(score_tags, score_rows, outcomes):
+        if outcome == DbRepositorySingleton.ROW_UNCHANGED and score == 0:
+            logging.debug(f"Kept the existing non-zero score of '{player_tag}' (id={player_id}) over 0")
 
     return all_ok
 
-def process_img_files(images):
+def init_importer(db_path: str, ocr_settings: dict, ocr_cache_settings: dict = None, fast_path: bool = False,
+                  layout_cache_path: str = None, escalation: dict = None, journal_path: str = None, db_pool_size: int = None):
+    """
+    Set up the database repository, OCR engine, digit classifier, layout profiles, OCR tiers and OCR journal
+    used by process_img_files.
+    """
+    global db_repository, ocr_engine, ocr_fast_path, digit_classifier, layout_profiles, escalation_settings
+    init_replay(db_path, journal_path, db_pool_size)
+    ocr_engine = create_ocr_engine(ocr_settings, ocr_cache_settings)
+    digit_classifier = GlyphClassifier.load(DIGIT_GLYPHS_PATH)
+    layout_profiles = create_layout_profiles(layout_cache_path)
+    ocr_fast_path = fast_path
+    escalation_settings = {**escalation_settings, **(escalation or {})}
+    refresh_known_player_tags()
+
+def refresh_known_player_tags():
+    """
+    Reload the player directory when another process changed the players, and take a new snapshot of the
+    tags. The OCR stage doesn't query the database, it checks the tags against the snapshot, which
+    process_img_files hands to the OCR workers with each capture group.
+    """
+    global known_player_tags
+    known_player_tags = set(db_repository.refresh_player_directory())
 
+def init_replay(db_path: str, journal_path: str = None, db_pool_size: int = None):
+    """
+    Set up the database repository and OCR journal, all that replay_journal needs. With db_pool_size the
+    repository is pooled and can be used from the pipeline threads, see DbRepositorySingleton.
+    """
+    global db_repository, ocr_journal
+    db_repository = DbRepositorySingleton(db_path, pool_size=db_pool_size)
+    ocr_journal = OcrJournal(journal_path) if journal_path else None
+
+def create_ocr_executor(ocr_workers: int, ocr_settings: dict = None, ocr_cache_settings: dict = None,
+                        layout_cache_path: str = None):
+    """
+    Start the pool of OCR worker processes, or return None when ocr_workers keeps the OCR in this process.
+    """
+    if ocr_workers <= 1:
+        return None
+
+    # Spawn (rather than fork) so each worker builds its own torch state for the EasyOCR reader
+    print(f"Starting OCR with {ocr_workers} worker processes...")
+    return ProcessPoolExecutor(max_workers=ocr_workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=init_ocr_worker, initargs=(ocr_settings or {}, ocr_cache_settings, ocr_fast_path, layout_cache_path,
+                                                                      escalation_settings))
+
+def create_ocr_pipeline(capture_groups, weekend_dates, decode_workers: int = 2, queue_size: int = 8,
+                        image_hashes: dict = None) -> StagedPipeline:
+    """
+    Build the in-process pipeline for the screenshots, queued in the order process_weekends applies them.
+
+    The decode threads run preprocess_image and a single OCR thread reads the screenshots in order so the
+    rows a capture group shares are only read once. The pipeline stops at the OCR, process_weekends
+    consumes its results on the calling thread and writes them to the database. Each result is (rank_txt, player_results, ocr_seconds, rows_skipped, tier_counts)
+    where rows_skipped is the running count for the capture group.
+    """
+    image_files = [image_file for sunday_date, files_date, friday_date, date_str in sorted(weekend_dates)
+                   for image_file in capture_groups[files_date]]
+    capture_group_of = {image_file: files_date for files_date, files in capture_groups.items() for image_file in files}
+
+    group_fingerprints = {}
+
+    def ocr_stage(image_file, prepared):
+        row_fingerprints = group_fingerprints.setdefault(capture_group_of[image_file], RowFingerprints())
+        ocr_start = time.perf_counter()
+        rank_txt, results, tier_counts = ocr_preprocessed_image(prepared, row_fingerprints)
+        return rank_txt, results, time.perf_counter() - ocr_start, row_fingerprints.rows_skipped, tier_counts
+
+    # The screenshots were hashed by skip_committed_images
+    image_hashes = image_hashes or {}
+
+    def decode_stage(image_file):
+        return preprocess_image(image_file, image_hashes.get(image_file))
+
+    return StagedPipeline(image_files, decode_stage, ocr_stage, decode_workers, queue_size)
+
+def process_img_files(images, ocr_workers: int = 1, ocr_settings: dict = None, ocr_cache_settings: dict = None,
+                      layout_cache_path: str = None, executor: ProcessPoolExecutor = None, decode_workers: int = 2,
+                      pipeline_queue_size: int = 8):
+    """
+    Process the tournament screenshots one weekend at a time.
+
+    When ocr_workers is greater than 1 the OCR stage runs in a pool of worker processes, each with its own
+    OCR engine built from ocr_settings. Each worker reads a whole capture group so the rows shared by its
+    screenshots are only read once. All of the database writes stay in this process and are applied in weekend order.
+
+    Otherwise the screenshots go through the pipeline from create_ocr_pipeline: decode_workers threads
+    decode and preprocess them ahead of the OCR thread, with at most pipeline_queue_size screenshots
+    waiting between the stages, while this thread writes the results of the earlier ones to the database.
+
+    A long-running caller can pass the executor from create_ocr_executor so the workers are started once,
+    it is left running when the images are done.
+    """
     weekend_dates = set()
 
     img_files_processed = 0
 
-    # Get weekend dates from the filenames
+    # Group the screenshots by capture series, then get the weekend dates from each group
     print("Preprocessing images to determine weekend dates...")
-    for image_file in images:
+    capture_groups, processed_images = skip_committed_images(ProjectTools.group_by_capture(images))
 
-        logging.debug(f"Processing {image_file} . . .")
+    for file_date in capture_groups:
+        date_str = file_date.split("_")[0]
 
-        date_str, file_date, series_str = ProjectTools.extract_date_time_from_filename(image_file)
-
-        logging.debug(f"Date: {date_str}, FileStr: {file_date}, Series: {series_str}")
+        logging.debug(f"Capture group: {file_date}, Files: {len(capture_groups[file_date])}")
 
         # Calculate weekend and Friday dates
         sunday_date, friday_date = ProjectTools.get_weekend_dates(date_str)
 
         weekend_dates.add((sunday_date, file_date, friday_date, date_str))
 
-    # for image_file in images:
+    ocr_futures = {}
+    ocr_pipeline = None
+
+    owns_executor = executor is None
+    if owns_executor:
+        executor = create_ocr_executor(ocr_workers, ocr_settings, ocr_cache_settings, layout_cache_path)
+
+    # Content hashes from the ledger lookup, passed on so each screenshot is read and hashed once
+    image_hashes = {image_file: image_hash for image_file, (image_hash, ledger_entry) in processed_images.items()}
+
+    if executor is not None:
+        # Queue the OCR in the same order the results are consumed below so the earliest weekends are ready first
+        for sunday_date, files_date, friday_date, date_str in sorted(weekend_dates):
+            ocr_futures[files_date] = executor.submit(ocr_capture_group, capture_groups[files_date], known_player_tags,
+                                                      {image_file: image_hashes[image_file] for image_file in capture_groups[files_date]})
+    elif capture_groups:
+        ocr_pipeline = create_ocr_pipeline(capture_groups, weekend_dates, decode_workers, pipeline_queue_size, image_hashes).start()
+
+    try:
+        img_files_processed = process_weekends(capture_groups, weekend_dates, ocr_futures, processed_images, ocr_pipeline)
+    finally:
+        if ocr_pipeline is not None:
+            ocr_pipeline.close()
+            ocr_pipeline.log_stats()
+
+        if owns_executor and executor is not None:
+            executor.shutdown(cancel_futures=True)
+        else:
+            for ocr_future in ocr_futures.values():
+                ocr_future.cancel()
+
+    return img_files_processed
+
+def skip_committed_images(capture_groups) -> tuple:
+    """
+    Look the screenshots up in the processed_images ledger by content hash.
+
+    Screenshots the ledger has as committed are sent to trash without being processed again, the way
+    they would have been after a successful run.
+
+    Returns:
+        (capture_groups, processed_images) where capture_groups leaves out the committed screenshots
+        and processed_images maps each remaining file to (image_hash, ledger entry or None)
+    """
+    remaining_groups = {}
+    processed_images = {}
+
+    for files_date, image_files in capture_groups.items():
+        for image_file in image_files:
+            image_hash = ProjectTools.get_file_hash(image_file)
+            entry = db_repository.get_processed_image(image_hash)
+
+            if entry is not None and entry['status'] == DbRepositorySingleton.IMAGE_COMMITTED:
+                logging.info(f"Skipping {os.path.basename(image_file)}, already committed for {entry['weekend_date']} "
+                             f"on {entry['processed_at']}")
+                send2trash(image_file)
+                continue
+
+            remaining_groups.setdefault(files_date, []).append(image_file)
+            processed_images[image_file] = (image_hash, entry)
+
+    return remaining_groups, processed_images
+
+def apply_image_matches(image_hash: str, image_file_name: str, ledger_entry: dict, sunday_date, friday_date, rank_txt,
+                        matches, unmatched_text, unmatched_scores, ocr_seconds: float, db_start: float) -> bool:
+    """
+    Write the rank and player scores matched from one screenshot and record it in the processed_images ledger.
+
+    Returns True if all of the matched player scores were recorded.
+    """
+    # The team tournament rank is not being scanned correctly at this time
+    if rank_txt is not None:
+        db_repository.upsert_weekend_team_rank(sunday_date, rank_txt)
+
+    # Rows recorded by an earlier run of a screenshot that needed review aren't written again
+    recorded_rows = {tuple(row) for row in ledger_entry['recorded_rows']} if ledger_entry else set()
+    new_matches = [match for match in matches if tuple(match) not in recorded_rows]
+
+    # Insert the player scores including creating new players and inserting friday as the join date
+    success = process_player_matches(new_matches, sunday_date, friday_date)
+    if success:
+        recorded_rows.update(tuple(match) for match in new_matches)
+
+    # Only committed screenshots are sent to trash, the others are re-run until they are reviewed
+    committed = success and not unmatched_text and not unmatched_scores
+    db_repository.record_processed_image(
+        image_hash, image_file_name, IMPORT_TYPE,
+        DbRepositorySingleton.IMAGE_COMMITTED if committed else DbRepositorySingleton.IMAGE_NEEDS_REVIEW,
+        sunday_date, matches, sorted(recorded_rows, key=str), ocr_seconds, time.perf_counter() - db_start)
+
+    return success
+
+def finish_weekend(sunday_date):
+    """
+    Fill in the zero scores, player ranks and team score once the screenshots of a weekend are applied.
+    """
+    # Set scores to 0 for missing players
+    db_repository.set_missing_scores_to_zero_for_weekend(sunday_date)
+
+    # Set the weekend date ranks
+    db_repository.update_ranks_for_weekend_date(sunday_date)
+
+    # Update team score for the weekend date
+    db_repository.upsert_weekend_team_score_for_date(sunday_date)
+
+def replay_journal() -> int:
+    """
+    Re-run the tag corrections, ignore list, row matching and database writes over the latest journal entry
+    of each screenshot, without the OCR engine.
+
+    The weekend scores aren't reset first, the replayed scores are upserted over them, so weekends that
+    also have screenshots imported before the journal existed keep those scores. The screenshots
+    themselves aren't touched, the ones now committed in the ledger are sent to trash by the next import.
+
+    Returns:
+        Number of journal entries that were committed
+    """
+    entries = ocr_journal.latest_entries(IMPORT_TYPE)
+    print(f"Replaying {len(entries)} screenshots from {ocr_journal.journal_path}...")
+
+    entries_committed = 0
+    for sunday_date, weekend_entries in itertools.groupby(entries, key=lambda entry: entry['weekend_date']):
+        print(f"\nReplaying {sunday_date}...")
+
+        with db_repository.transaction():
+            entries_committed += replay_weekend(sunday_date, weekend_entries)
+
+    return entries_committed
+
+def replay_weekend(sunday_date, weekend_entries) -> int:
+    """
+    Replay the journal entries of one weekend, see replay_journal.
+
+    Returns:
+        Number of entries that were committed
+    """
+    entries_committed = 0
+    for entry in weekend_entries:
+        logging.info(f"\tReplaying {entry['file_name']} for {sunday_date} . . .")
+
+        db_start = time.perf_counter()
+        matches, unmatched_text, unmatched_scores = match_player_scores(entry['results'])
+        success = apply_image_matches(entry['image_hash'], entry['file_name'], db_repository.get_processed_image(entry['image_hash']),
+                                      sunday_date, entry['friday_date'], entry['rank_txt'], matches, unmatched_text,
+                                      unmatched_scores, 0.0, db_start)
+
+        for text, confidence in unmatched_text:
+            logging.warning(f"Couldn't match this text: {text}, Confidence: {confidence}")
+        for score, confidence in unmatched_scores:
+            logging.warning(f"Score: {score}, Confidence: {confidence}")
+
+        if success and not unmatched_text and not unmatched_scores:
+            entries_committed += 1
+
+    finish_weekend(sunday_date)
+
+    return entries_committed
+
+def process_weekends(capture_groups, weekend_dates, ocr_futures, processed_images, ocr_pipeline: StagedPipeline = None) -> int:
+    """
+    Apply the OCR results to the database for each weekend in order. The database writes aren't a pipeline
+    stage of their own, they run here on the calling thread, which owns the database connection, as the
+    consumer of ocr_pipeline's results.
+
+    capture_groups is the dict of capture group -> sorted files from ProjectTools.group_by_capture and
+    processed_images the ledger lookups from skip_committed_images.
+
+    Capture groups with a pending future in ocr_futures use the worker results, the others come from
+    ocr_pipeline in order.
+    """
+    img_files_processed = 0
+
+    pipeline_results = ocr_pipeline.results() if ocr_pipeline is not None else None
+
+    # Player rows by the OCR tier that read them, for the tier-hit ratio in the summary
+    tier_counts = Counter()
+
+    # Rows skipped because an earlier screenshot of the capture group already had them, by weekend
+    rows_skipped = {}
 
     # Process the images for each sunday weekend date
     print("Processing images for each weekend date...")
@@ -294,80 +984,152 @@ def process_img_files(images):
         print(f"\nProcessing {sunday_date}...")
 
         # Get the image files for the weekend date
-        image_files_for_weekend = [img for img in images if files_date in img]
-
-        # Reset scores for the tournament
-        db_repository.reset_scores_for_tournament(sunday_date)
-
-        for image_file in sorted(image_files_for_weekend):
+        image_files_for_weekend = capture_groups[files_date]
+
+        # Wait on the worker process when the OCR of the capture group was dispatched to the pool
+        row_fingerprints = RowFingerprints()
+        group_results = {}
+        group_future = ocr_futures.pop(files_date, None)
+        if group_future is not None:
+            group_results, group_rows_skipped = group_future.result()
+            row_fingerprints.rows_skipped = group_rows_skipped
+
+        # Read the whole weekend first so its transaction isn't held open during the OCR
+        weekend_results = []
+        for image_file in image_files_for_weekend:
             image_file_name = os.path.basename(image_file)
 
             logging.info(f"\tProcessing {image_file_name} for {sunday_date} . . .")
 
             # Process the image
-            matches, unmatched_text, unmatched_scores, rank_txt = process_image(image_file)
-
-            #remaining_unmatched_text = []
-            #for text, confidence in unmatched_text:
-            #    player_id = db_repository.get_player_id(text)
-            #    if player_id:
-            #        logging.info(f"Player ID found in unmatched text: {text}, ID: {player_id}, assigning score: 0")
-            #        matches.append((text, 0))
-            #    else:
-            #        logging.warning(f"Unmatched Text: {text}, Confidence: {confidence}")
-            #        remaining_unmatched_text.append((text, confidence))
-
-            # Update unmatched_text with the remaining unmatched items
-            #unmatched_text = remaining_unmatched_text
-            # The team tournament rank is not being scanned correctly at this time
-            if rank_txt is not None:
-                db_repository.upsert_weekend_team_rank(sunday_date, rank_txt)
-
-            # Insert the player scores including creating new players and inserting friday as the join date
-            success = process_player_matches(matches, sunday_date, friday_date)
-
-            # If any player score was not recorded (for example player not active), skip deleting the file
-            if not success:
-                logging.error("One or more player scores were not recorded (inactive or error); skipping deletion of image")
-                continue
-
-            # This will skip deleting the file
-            if (len(unmatched_text) > 0):
-                logging.error("Unmatched Texts:")
-                for text, confidence in unmatched_text:
-                    logging.warning(f"Couldn't match this text: {text}, Confidence: {confidence}")
-                continue
-
-            # This will skip deleting the file
-            if (len(unmatched_scores) > 0):
-                logging.error("Unmatched Scores:")
-                for score, confidence in unmatched_scores:
-                    logging.warning(f"Score: {score}, Confidence: {confidence}")
-                continue
-
-            # Delete the file if it was processed successfully
+            from_pipeline = False
+            if image_file in group_results:
+                rank_txt, results, ocr_seconds, image_tier_counts = group_results[image_file]
+            else:
+                if pipeline_results is None:
+                    raise RuntimeError(f"No OCR worker result or pipeline for {image_file}")
+
+                pipeline_file, (rank_txt, results, ocr_seconds, group_rows_skipped, image_tier_counts) = next(pipeline_results)
+                if pipeline_file != image_file:
+                    raise RuntimeError(f"OCR pipeline returned {pipeline_file} while expecting {image_file}")
+                row_fingerprints.rows_skipped = group_rows_skipped
+                from_pipeline = True
+
+            tier_counts.update(image_tier_counts)
+
+            image_hash, ledger_entry = processed_images[image_file]
+
+            # Journal the raw OCR before matching so corrections can be replayed with --replay
+            if ocr_journal is not None:
+                ocr_journal.append({
+                    'image_hash': image_hash,
+                    'file_name': image_file_name,
+                    'import_type': IMPORT_TYPE,
+                    'capture_group': files_date,
+                    'weekend_date': sunday_date,
+                    'friday_date': friday_date,
+                    'rank_txt': rank_txt,
+                    'results': results,
+                })
+
+            weekend_results.append((image_file, rank_txt, results, ocr_seconds, from_pipeline))
+
+        # The weekend is written as one unit of work, a crash part way through leaves the previous scores in place
+        committed_files = []
+        with db_repository.transaction():
+            # Reset scores for the tournament
+            db_repository.reset_scores_for_tournament(sunday_date)
+
+            for image_file, rank_txt, results, ocr_seconds, from_pipeline in weekend_results:
+                image_file_name = os.path.basename(image_file)
+                image_hash, ledger_entry = processed_images[image_file]
+
+                matches, unmatched_text, unmatched_scores = match_player_scores(results)
+
+                db_start = time.perf_counter()
+
+                #remaining_unmatched_text = []
+                #for text, confidence in unmatched_text:
+                #    player_id = db_repository.get_player_id(text)
+                #    if player_id:
+                #        logging.info(f"Player ID found in unmatched text: {text}, ID: {player_id}, assigning score: 0")
+                #        matches.append((text, 0))
+                #    else:
+                #        logging.warning(f"Unmatched Text: {text}, Confidence: {confidence}")
+                #        remaining_unmatched_text.append((text, confidence))
+
+                # Update unmatched_text with the remaining unmatched items
+                #unmatched_text = remaining_unmatched_text
+                success = apply_image_matches(image_hash, image_file_name, ledger_entry, sunday_date, friday_date, rank_txt,
+                                              matches, unmatched_text, unmatched_scores, ocr_seconds, db_start)
+
+                if from_pipeline:
+                    ocr_pipeline.stats['consume'].record(time.perf_counter() - db_start)
+
+                # If any player score was not recorded (for example player not active), skip deleting the file
+                if not success:
+                    logging.error(f"One or more player scores from {image_file_name} were not recorded (inactive or error); skipping deletion of image")
+                    continue
+
+                # This will skip deleting the file
+                if (len(unmatched_text) > 0):
+                    logging.error(f"Unmatched Texts in {image_file_name}:")
+                    for text, confidence in unmatched_text:
+                        logging.warning(f"Couldn't match this text: {text}, Confidence: {confidence}")
+                    continue
+
+                # This will skip deleting the file
+                if (len(unmatched_scores) > 0):
+                    logging.error(f"Unmatched Scores in {image_file_name}:")
+                    for score, confidence in unmatched_scores:
+                        logging.warning(f"Score: {score}, Confidence: {confidence}")
+                    continue
+
+                committed_files.append(image_file)
+
+            # for img_file in sorted(img_files_for_weekend):
+
+            finish_weekend(sunday_date)
+
+        # Delete the files that were processed successfully, only once their weekend is committed
+        for image_file in committed_files:
             logging.debug(f"Deleting {image_file}")
             send2trash(image_file)
 
-            img_files_processed += 1
+        img_files_processed += len(committed_files)
 
-        # for img_file in sorted(img_files_for_weekend):
+        rows_skipped[sunday_date] = rows_skipped.get(sunday_date, 0) + row_fingerprints.rows_skipped
+        logging.info(f"Skipped {row_fingerprints.rows_skipped} rows already read from {files_date}")
 
-        # Set scores to 0 for missing players
-        db_repository.set_missing_scores_to_zero_for_weekend(sunday_date)
-
-        # Set the weekend date ranks
-        db_repository.update_ranks_for_weekend_date(sunday_date)
-        
-        # Update team score for the weekend date
-        db_repository.upsert_weekend_team_score_for_date(sunday_date)
+        if ocr_pipeline is not None:
+            ocr_pipeline.log_stats(logging.DEBUG)
 
     # for sunday_date, friday_date, files_date in sorted(weekend_dates): # Sort by weekend date
 
-    return
+    if rows_skipped:
+        print("\nDuplicate rows skipped per weekend:")
+    for sunday_date, skipped in sorted(rows_skipped.items()):
+        print(f"\t{sunday_date}: {skipped}")
+
+    tier_rows = sum(tier_counts.values())
+    if tier_rows:
+        print(f"\nOCR tiers: {tier_counts['tier1']} of {tier_rows} player rows read at tier 1 "
+              f"({100.0 * tier_counts['tier1'] / tier_rows:.1f}% tier-1 hit ratio), {tier_counts['tier2']} fixed at tier 2, "
+              f"{tier_counts['unresolved']} still failing the checks")
+
+    return img_files_processed
+
+def parse_arguments():
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Import the team tournament scores from the screenshots.")
+    parser.add_argument("--replay", action="store_true",
+                        help="Re-run the matching and database writes from the OCR journal instead of reading the screenshots")
+    return parser.parse_args()
 
 def main():
-    global process_start_time, logger, db_repository
+    global process_start_time, logger
+
+    args = parse_arguments()
 
     env_config = EnvConfig()
 
@@ -379,6 +1141,43 @@ def main():
     images_config = env_config.merged_config['constants']['tournament_images_folder']
     images_path = images_config.replace("{repo_root}", str(repo_root))
 
+    # Number of OCR worker processes, 1 keeps the OCR in this process
+    ocr_workers = int(env_config.merged_config['constants'].get('ocr_workers', 1))
+
+    # Uses the OCR service when it is running, otherwise EasyOCR is loaded in this process
+    ocr_settings = env_config.merged_config.get('ocr_service', {})
+
+    fast_path = bool(env_config.merged_config['constants'].get('ocr_fast_path', False))
+
+    # Rows the first OCR tier reads poorly are read again upscaled
+    escalation = {
+        'min_confidence': float(env_config.merged_config['constants'].get('ocr_escalation_min_confidence', ESCALATION_MIN_CONFIDENCE)),
+        'scale': float(env_config.merged_config['constants'].get('ocr_escalation_scale', ESCALATION_SCALE)),
+        'tier1_mag_ratio': env_config.merged_config['constants'].get('ocr_tier1_mag_ratio', TIER1_MAG_RATIO),
+    }
+
+    # Threads decoding the screenshots ahead of the OCR, and how many screenshots can wait between the stages
+    decode_workers = int(env_config.merged_config['constants'].get('decode_workers', 2))
+    pipeline_queue_size = int(env_config.merged_config['constants'].get('pipeline_queue_size', 8))
+
+    # Read connections of the pooled repository, null keeps the single connection
+    db_pool_size = env_config.merged_config['constants'].get('db_pool_size')
+
+    # Raw OCR results are cached on disk so reruns over screenshots left in the folder skip the OCR
+    ocr_cache_path = env_config.merged_config['constants'].get('ocr_cache_path')
+    ocr_cache_settings = {
+        'cache_path': ocr_cache_path.replace("{repo_root}", str(repo_root)) if ocr_cache_path else None,
+        'max_mb': env_config.merged_config['constants'].get('ocr_cache_max_mb', 256),
+    }
+
+    # Crop rectangles calibrated for each screenshot resolution
+    layout_cache_config = env_config.merged_config['constants'].get('layout_cache_path')
+    layout_cache_path = layout_cache_config.replace("{repo_root}", str(repo_root)) if layout_cache_config else None
+
+    # Raw OCR results of every screenshot, replayed by --replay
+    ocr_journal_config = env_config.merged_config['constants'].get('ocr_journal_path')
+    ocr_journal_path = ocr_journal_config.replace("{repo_root}", str(repo_root)) if ocr_journal_config else None
+
     logging_manager = None
 
     try:
@@ -398,12 +1197,23 @@ def main():
         img_files_processed = 0
         img_files_with_errors = 0
 
-        db_repository = DbRepositorySingleton(db_path)
+        if args.replay:
+            if not ocr_journal_path:
+                raise ValueError("--replay needs ocr_journal_path in config.json")
+
+            # No OCR engine, only the journal and the database
+            init_replay(db_path, ocr_journal_path, db_pool_size)
+            img_files_processed = replay_journal()
+        else:
+            init_importer(db_path, ocr_settings, ocr_cache_settings, fast_path, layout_cache_path, escalation, ocr_journal_path,
+                          db_pool_size)
 
-        img_files = ProjectTools.get_img_files(images_path)
-        logger.info(f"Processing {len(img_files)} rows . . .")
+            img_files = ProjectTools.get_img_files(images_path)
+            logger.info(f"Processing {len(img_files)} rows . . .")
 
-        results = process_img_files(img_files)
+            img_files_processed = process_img_files(img_files, ocr_workers=ocr_workers, ocr_settings=ocr_settings,
+                                                    ocr_cache_settings=ocr_cache_settings, layout_cache_path=layout_cache_path,
+                                                    decode_workers=decode_workers, pipeline_queue_size=pipeline_queue_size)
 
     except Exception as e:
         logging.exception(f"Uncaught exception in Main(): {e}")
@@ -415,6 +1225,9 @@ def main():
 
         logger.info(f"Program execution time: {duration:.2f} seconds")
 
+        if ocr_engine is not None and ocr_engine.cache is not None:
+            ocr_engine.cache.log_stats()
+
         if img_files_processed is not None and img_files_processed > 0:
             logger.info(f"Total files processed: {img_files_processed} at a rate of {duration / img_files_processed:.2f} seconds per file")
 
@@ -1,4 +1,6 @@
+import json
 import logging
+import numpy as np
 import os
 import sys
 import time
@@ -14,81 +16,172 @@ from send2trash import send2trash
 try:
     from cls_env_config import EnvConfigSingleton as EnvConfig
     from cls_env_tools import EnvTools
+    from cls_glyph_classifier import GlyphClassifier
     from cls_img_tools import ImageTools
+    from cls_layout_profiles import LayoutProfiles
     from cls_logging_manager import LoggingManagerSingleton as LoggingManager
+    from cls_ocr_cache import OcrCache
+    from cls_ocr_engine import OcrEngineSingleton as OcrEngine
     from cls_project_tools import ProjectTools
+    from cls_row_matcher import RowMatcher
 
-    from cls_db_tools import DbRepositorySingleton
+    from cls_db_tools import DbRepositorySingleton, to_db_integer
 except ImportError as e:
     logging.error(f"Error importing required modules: {e}")
     sys.exit(1)
 
-import easyocr
-
-# Initialize EasyOCR
-reader = easyocr.Reader(['en'])
-
-def process_image(file_name: str) -> tuple:
+# OCR engine, created in main()
+ocr_engine = None
+
+# Digit glyph classifier for the helps and stars columns, None until glyph templates have been harvested
+digit_classifier = None
+
+# Digit glyph templates harvested by src/tools/harvest_digit_glyphs.py
+DIGIT_GLYPHS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'images', 'templates', 'digit_glyphs.npz'))
+
+# Below this confidence a value read by the digit classifier goes to EasyOCR instead
+DIGIT_MIN_CONFIDENCE = 0.4
+
+# Leaderboard columns in the 1200 px wide image: (x, width, threshold, allowlist)
+STATS_COLUMNS = {
+    'players': (280, 440, 225, None),  # Only player tags
+    'helps': (740, 150, 245, "0123456789"),
+    'stars': (890, 250, 245, "0123456789,"),
+}
+
+# Left and right edges of the region covering all the stats columns
+STATS_LEFT = min(x for x, width, threshold, allowlist in STATS_COLUMNS.values())
+STATS_RIGHT = max(x + width for x, width, threshold, allowlist in STATS_COLUMNS.values())
+
+# Top of the leaderboard rows in the 1200 px wide reference layout, LayoutProfiles shifts it for other resolutions
+STATS_ROWS_Y = 600
+
+# Template of the MY TEAM tab label above the leaderboard, the anchor for the stats crop
+MY_TEAM_TAB_TEMPLATE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'images', 'templates', 'my_team_tab.png'))
+
+# Layout anchors: (template, search rectangle, top of the template in the reference layout)
+LAYOUT_ANCHORS = {
+    'my_team_tab': (MY_TEAM_TAB_TEMPLATE_PATH, (0, 0, 1200, 600), 187),
+}
+
+# Crops and the anchor each one moves with
+LAYOUT_CROPS = {
+    'stats': ((STATS_LEFT, STATS_ROWS_Y, STATS_RIGHT - STATS_LEFT, None), 'my_team_tab'),
+}
+
+# Crop rectangles per source resolution, kept in memory until main() loads the layout cache
+layout_profiles = LayoutProfiles(None, 'team_stats', LAYOUT_CROPS, LAYOUT_ANCHORS)
+
+# Maximum distance in pixels between the y-centres of a player tag and its helps / stars in the 1200 px wide image
+STATS_ROW_MAX_DISTANCE = 40
+
+# Importer name recorded in the processed_images ledger
+IMPORT_TYPE = "team_stats"
+
+def ocr_stats_columns(stats_img, y: int, image_hash: str) -> dict:
+    """
+    OCR the players, helps and stars columns with a single text detection pass.
+
+    stats_img is the region of the 1200 px wide image from STATS_LEFT to STATS_RIGHT, starting at y.
+
+    Each column is thresholded on its own and laid out on one canvas at its original x-position.
+    The detector runs once over the canvas, the detected boxes are assigned to a column by their
+    x-centre. The digit classifier reads the helps and stars boxes it is confident about and the
+    recognizer runs on the remaining boxes of each column with that column's allowlist.
+
+    Returns:
+        dict of column name -> list of (box, text, confidence) with boxes in canvas coordinates,
+        where the canvas x origin is the left edge of the players column
+    """
+    left, right = STATS_LEFT, STATS_RIGHT
+    height = stats_img.shape[0]
+    region_crop = (left, y, right - left, height)
+    thresholds = {name: column[2] for name, column in STATS_COLUMNS.items()}
+
+    def ocr_columns():
+        # Gaps between the columns stay black so the detector doesn't merge neighbouring values.
+        # Each column is thresholded straight into its slice of the canvas.
+        canvas = np.zeros((height, right - left), dtype=np.uint8)
+        for x, width, threshold, allowlist in STATS_COLUMNS.values():
+            column_img = ImageTools.crop_image_opencv(stats_img, x - left, 0, width, height)
+            column_height, column_width = column_img.shape[:2]
+            ImageTools.threshold_gray(column_img, threshold, out=canvas[:column_height, x - left:x - left + column_width])
+        #display_image_opencv(canvas, title="Stats Image")
+
+        horizontal_list, free_list = ocr_engine.detect(canvas, mag_ratio=2.0)
+        horizontal_list, free_list = horizontal_list[0], free_list[0]
+
+        column_boxes = {name: ([], []) for name in STATS_COLUMNS}
+        for box in horizontal_list:
+            name = stats_column_for_x(left + (box[0] + box[1]) / 2)
+            if name is not None:
+                column_boxes[name][0].append(box)
+        for box in free_list:
+            name = stats_column_for_x(left + sum(point[0] for point in box) / len(box))
+            if name is not None:
+                column_boxes[name][1].append(box)
+
+        columns = {}
+        for name, (column_horizontal, column_free) in column_boxes.items():
+            allowlist = STATS_COLUMNS[name][3]
+
+            columns[name] = []
+            if digit_classifier is not None and allowlist is not None:
+                columns[name], column_horizontal = digit_classifier.read_cells(canvas, column_horizontal, allowlist, DIGIT_MIN_CONFIDENCE)
+
+            if column_horizontal or column_free:
+                columns[name] += ocr_engine.recognize(canvas, column_horizontal, column_free, allowlist=allowlist)
+        return columns
+
+    return ocr_engine.cached(image_hash, region_crop, thresholds, {'mag_ratio': 2.0, 'detect': 'once'}, ocr_columns)
+
+def stats_column_for_x(x: float):
+    """
+    Return the name of the stats column containing the x-coordinate, or None if it falls between the columns.
+    """
+    for name, (column_x, width, threshold, allowlist) in STATS_COLUMNS.items():
+        if column_x <= x < column_x + width:
+            return name
+    return None
+
+def process_image(file_name: str, image_hash: str = None) -> tuple:
     rank_txt = None
 
-    img, new_height = ImageTools.resize_image_opencv(file_name, new_width=1200)
+    # The OCR cache is keyed on the file contents so renamed or re-exported screenshots still hit it,
+    # process_img_files passes the hash it looked the ledger up with
+    if image_hash is None:
+        image_hash = ProjectTools.get_file_hash(file_name)
 
-    offset_height = 600
-    players_img = ImageTools.crop_image_opencv(img, 280, offset_height, 440, new_height - offset_height) # Only player tags
-    players_img = ImageTools.convert_non_white_to_black_opencv(players_img, 225)
-    #display_image_opencv(players_img, title="Players Image")
+    # Only the stats columns are resized, everything downstream works on a single channel
+    source = ImageTools.decode_for_regions(file_name, new_width=1200)
+    stats_crop = layout_profiles.get_crops(file_name, source, ('stats',))['stats']
+    stats_img = ImageTools.resize_region_opencv(source, stats_crop, grayscale=True)
+
+    columns = ocr_stats_columns(stats_img, stats_crop[1], image_hash)
 
     player_results = []
-    results = reader.readtext(players_img, mag_ratio=2.0)
-    for box, text, confidence in results:
+    for box, text, confidence in columns['players']:
         if box[0][0] < 50:
             player_results.append((box, text, confidence))
         #print(f"Player: {player[1]} - Box y {player[0][0][1]}")
 
-    helps_img = ImageTools.crop_image_opencv(img, 740, offset_height, 150, new_height - offset_height)
-    helps_img = ImageTools.convert_non_white_to_black_opencv(helps_img, 245)
-    #display_image_opencv(helps_img, title="Helps Image")
-
-    player_helps = []
-    results = reader.readtext(helps_img, mag_ratio=2.0, allowlist="0123456789")
-    for box, text, confidence in results:
-        player_helps.append((box, text, confidence))
-        #print(f"Helps: {help[1]} - Box y {help[0][0][1]}")
-
-    player_stars = []
-    stars_img = ImageTools.crop_image_opencv(img, 890, offset_height, 250, new_height - offset_height)
-    stars_img = ImageTools.convert_non_white_to_black_opencv(stars_img, 245)
-    #display_image_opencv(stars_img, title="Stars Image")
-    results = reader.readtext(stars_img, mag_ratio=2.0, allowlist="0123456789,")
-    for box, text, confidence in results:
-        player_stars.append((box, text, confidence))
-        #print(f"Stars: {text} - Box y {box[0][1]}")
+    player_helps = list(columns['helps'])
+    player_stars = list(columns['stars'])
 
     logging.debug(f"Length of player results: {len(player_results)}")
     logging.debug(f"Length of player helps: {len(player_helps)}")
-    logging.debug(f"Length of player stars: {len(results)}")
+    logging.debug(f"Length of player stars: {len(player_stars)}")
 
     # Match numeric values with text values based on y-coordinate
+    row_helps, _ = RowMatcher.assign(player_results, player_helps, STATS_ROW_MAX_DISTANCE)
+    row_stars, _ = RowMatcher.assign(player_results, player_stars, STATS_ROW_MAX_DISTANCE)
+
     matches = []
     unmatched = []
-    for player_text_box, player_text, player_text_confidence in player_results:
-        player_y = player_text_box[0][1]  # y-coordinate of the top-left corner of the text box
-        helps_stars = (None, None)
-        for help_text_box, help_text, help_text_confidence in player_helps:
-            help_y = help_text_box[0][1]  # y-coordinate of the top-left corner of the numeric box
-            if -40 <= (player_y - help_y) <= 25:
-                helps_stars = (help_text, None)
-                break;
-
+    for (player_text_box, player_text, player_text_confidence), help_result, star_result in zip(player_results, row_helps, row_stars):
         # if we didn't find a Helps match it's because it was 0 which EasyOCR is not recognizing
-        if helps_stars[0] is None:
-            helps_stars = (0, None)
-
-        for star_text_box, star_text, star_text_confidence in results:
-            star_y = star_text_box[0][1]
-            if -40 <= (player_y - star_y) <= 25:
-                helps_stars = (helps_stars[0], star_text)
-                break
+        helps_stars = (help_result[1] if help_result is not None else 0,
+                       star_result[1] if star_result is not None else None)
 
         if helps_stars[1] is None:
             unmatched.append((player_text, helps_stars))
@@ -99,39 +192,43 @@ def process_image(file_name: str) -> tuple:
 
 def process_img_files(images):
 
-    file_groups = set()
-
-    # Get weekend dates from the filenames
-    for image_file in images:
-
-        logging.debug(f"Processing {image_file} . . .")
+    # Group the screenshots by capture series
+    capture_groups = ProjectTools.group_by_capture(images)
 
-        date_str, file_str, series_str = ProjectTools.extract_date_time_from_filename(image_file)
-
-        logging.debug(f"Date: {date_str}, FileStr: {file_str}, Series: {series_str}")
-
-        file_groups.add((file_str, date_str))
-
-    # for image_file in images:
-
-    for file_str, date_str in sorted(file_groups):
+    for file_str, image_files_group in capture_groups.items():
+        date_str = file_str.split("_")[0]
         print(f"Processing {file_str} . . . for {date_str}")
 
         sunday_date = ProjectTools.next_sunday(datetime.strptime(date_str, "%Y-%m-%d"))
 
         logging.debug(f"Sunday Date: {sunday_date}")
 
-        # Get the image files for the weekend date
-        image_files_group = [img for img in images if file_str in img]
-
         player_metrics = {}
         unmatched_metrics = {}
         delete_files = []
 
-        for image_file in sorted(image_files_group):
+        # Ledger entries of the screenshots read in this group: image file -> (image_hash, matches, ocr_seconds)
+        group_images = {}
+
+        # Rows recorded by an earlier run of a screenshot that needed review aren't written again
+        recorded_rows = set()
+
+        for image_file in image_files_group:
             print(f"Processing {image_file} . . .")
 
-            matches, unmatched = process_image(image_file)
+            # Screenshots committed by an earlier run are sent to trash without reading them again
+            image_hash = ProjectTools.get_file_hash(image_file)
+            ledger_entry = db_repository.get_processed_image(image_hash)
+            if ledger_entry is not None:
+                if ledger_entry['status'] == DbRepositorySingleton.IMAGE_COMMITTED:
+                    logging.info(f"Skipping {os.path.basename(image_file)}, already committed for {ledger_entry['weekend_date']}")
+                    send2trash(image_file)
+                    continue
+                recorded_rows.update(json.dumps(row) for row in ledger_entry['recorded_rows'])
+
+            ocr_start = time.perf_counter()
+            matches, unmatched = process_image(image_file, image_hash)
+            group_images[image_file] = (image_hash, matches, time.perf_counter() - ocr_start)
 
             # if we have matches and no unmatched, then we can delete the image file
             if (len(matches) > 0) and (len(unmatched) == 0):
@@ -143,44 +240,71 @@ def process_img_files(images):
             for unmatch in unmatched:
                 unmatched_metrics[unmatch[0]] = unmatch
 
-        # Get the players from the database
-        player_rows = db_repository.get_players()
-
-        # Create a dictionary with player_tag as the key
-        players_dict = {player[1]: player for player in player_rows}  # Assuming player_tag is at index 1
-
-        missing_player_stats = set()
-
-        for player_tag, player in players_dict.items():
-            player_id = player[0]  # Access player_id using index 0
-            on_team = player[2]  # Access on_team using index 2
-            leave_date = player[4]  # Access leave_date using index 4
-
-            # If the player is not on the team, skip them
-            if on_team == 0:
-                continue
-
-            # The player is on the time, find their metrics from the OCR results
-            player_metric = player_metrics.get(player_tag)
-            if player_metric:
-                helps = player_metric[1][0]
-                stars = int(player_metric[1][1].replace(",", ""))
-
-                db_repository.upsert_weekly_player_stats(sunday_date, player_id, helps, stars)
-            else:
-                missing_player_stats.add(player)
-
-        # for player, metrics in sorted(player_metrics):
-
-        # If there are missing players from the OCR results, they are not on the team
-        for missing_player in missing_player_stats:
-            player_tag = missing_player[1]  # Access player_tag using index 1
-            unmatched = unmatched_metrics.get(player_tag)
-            if unmatched:
-                logging.warning(f"Player: {player_tag}, Unmatched: {unmatched}")
-            else:
-                logging.warning(f"Player: {player_tag}, No OCR results")
-
+        if not group_images:
+            continue
+
+        db_start = time.perf_counter()
+
+        # The group's stats and ledger entries are written as one unit of work
+        with db_repository.transaction():
+            # Get the players from the database
+            player_rows = db_repository.get_players()
+
+            # Create a dictionary with player_tag as the key
+            players_dict = {player[1]: player for player in player_rows}  # Assuming player_tag is at index 1
+
+            missing_player_stats = set()
+
+            # Stats to write and the OCR rows they came from
+            stats_rows = []
+            stats_metrics = []
+
+            for player_tag, player in players_dict.items():
+                player_id = player[0]  # Access player_id using index 0
+                on_team = player[2]  # Access on_team using index 2
+                leave_date = player[4]  # Access leave_date using index 4
+
+                # If the player is not on the team, skip them
+                if on_team == 0:
+                    continue
+
+                # The player is on the time, find their metrics from the OCR results
+                player_metric = player_metrics.get(player_tag)
+                if player_metric:
+                    if json.dumps(player_metric) not in recorded_rows:
+                        # helps is the int 0 when the OCR didn't find it
+                        helps = to_db_integer(player_metric[1][0])
+                        stars = to_db_integer(player_metric[1][1])
+
+                        stats_rows.append((player_id, helps, stars))
+                        stats_metrics.append(player_metric)
+                else:
+                    missing_player_stats.add(player)
+
+            # All of the group's stats in one round
+            db_repository.bulk_upsert_weekly_player_stats(sunday_date, stats_rows)
+            recorded_rows.update(json.dumps(player_metric) for player_metric in stats_metrics)
+
+            # for player, metrics in sorted(player_metrics):
+
+            # If there are missing players from the OCR results, they are not on the team
+            for missing_player in missing_player_stats:
+                player_tag = missing_player[1]  # Access player_tag using index 1
+                unmatched = unmatched_metrics.get(player_tag)
+                if unmatched:
+                    logging.warning(f"Player: {player_tag}, Unmatched: {unmatched}")
+                else:
+                    logging.warning(f"Player: {player_tag}, No OCR results")
+
+            # The rows of the whole group are written together so each screenshot records the group's write time
+            db_seconds = time.perf_counter() - db_start
+            for image_file, (image_hash, matches, ocr_seconds) in group_images.items():
+                status = DbRepositorySingleton.IMAGE_COMMITTED if image_file in delete_files else DbRepositorySingleton.IMAGE_NEEDS_REVIEW
+                image_recorded_rows = [match for match in matches if json.dumps(match) in recorded_rows]
+                db_repository.record_processed_image(image_hash, os.path.basename(image_file), IMPORT_TYPE, status, sunday_date,
+                                                     matches, image_recorded_rows, ocr_seconds, db_seconds)
+
+        # Only sent to trash once the group is committed
         for delete_file in delete_files:
             send2trash(delete_file)
 
@@ -188,8 +312,23 @@ def process_img_files(images):
 
     return
 
+def init_importer(db_path: str, ocr_settings: dict, ocr_cache_path: str = None, ocr_cache_max_mb: int = 256,
+                  layout_cache_path: str = None):
+    """
+    Set up the database repository, OCR engine, digit classifier and layout profiles used by process_img_files.
+    The OCR engine is a singleton, a cache already set on it by another importer in this process is kept.
+    """
+    global db_repository, ocr_engine, digit_classifier, layout_profiles
+    db_repository = DbRepositorySingleton(db_path)
+    ocr_engine = OcrEngine(**ocr_settings)
+    if ocr_cache_path and ocr_engine.cache is None:
+        ocr_engine.set_cache(OcrCache(ocr_cache_path, ocr_cache_max_mb))
+    digit_classifier = GlyphClassifier.load(DIGIT_GLYPHS_PATH)
+    if layout_cache_path:
+        layout_profiles = LayoutProfiles(layout_cache_path, 'team_stats', LAYOUT_CROPS, LAYOUT_ANCHORS)
+
 def main():
-    global process_start_time, logger, db_repository
+    global process_start_time, logger
 
     env_config = EnvConfig()
 
@@ -202,6 +341,16 @@ def main():
     images_path = images_config.replace("{repo_root}", str(repo_root))
     print(f"Images Path: {images_path}")
 
+    # Uses the OCR service when it is running, otherwise EasyOCR is loaded in this process
+    ocr_settings = env_config.merged_config.get('ocr_service', {})
+
+    # Raw OCR results are cached on disk so reruns over screenshots left in the folder skip the OCR
+    ocr_cache_path = env_config.merged_config['constants'].get('ocr_cache_path')
+    ocr_cache_max_mb = env_config.merged_config['constants'].get('ocr_cache_max_mb', 256)
+
+    # Crop rectangles calibrated for each screenshot resolution
+    layout_cache_path = env_config.merged_config['constants'].get('layout_cache_path')
+
     logging_manager = None
 
     try:
@@ -221,7 +370,9 @@ def main():
         img_files_processed = 0
         img_files_with_errors = 0
 
-        db_repository = DbRepositorySingleton(db_path)
+        init_importer(db_path, ocr_settings,
+                      ocr_cache_path.replace("{repo_root}", str(repo_root)) if ocr_cache_path else None, ocr_cache_max_mb,
+                      layout_cache_path.replace("{repo_root}", str(repo_root)) if layout_cache_path else None)
 
         img_files = ProjectTools.get_img_files(images_path)
         logger.info(f"Processing {len(img_files)} rows . . .")
@@ -237,6 +388,9 @@ def main():
 
         logger.info(f"Program execution time: {duration:.2f} seconds")
 
+        if ocr_engine is not None and ocr_engine.cache is not None:
+            ocr_engine.cache.log_stats()
+
         if img_files_processed is not None and img_files_processed > 0:
             logger.info(f"Total files processed: {img_files_processed} at a rate of {duration / img_files_processed:.2f} seconds per file")
 
@@ -72,12 +72,18 @@ def prompt_for_date() -> str:
         return sunday_date
 
 
-def prompt_for_scores(db_repository: DbRepositorySingleton, sunday_date: str, friday_date: str):
+def prompt_for_scores(db_repository: DbRepositorySingleton, sunday_date: str, friday_date: str) -> list:
     """
     Interactively prompt for player name and score pairs.
     Type 'done' or press Enter on an empty line to finish.
+
+    Each entry is saved as soon as it is entered by save_score, so a Ctrl+C or an error later in the
+    session keeps the scores already typed. No transaction is open while waiting for input.
+
+    Returns:
+        List of (player_tag, score, player_id) saved
     """
-    entries = []
+    saved = []
 
     print(f"\nEntering scores for weekend: {sunday_date}")
     print("Type player name and score (example: Dewey 5054), or 'done' to finish.\n")
@@ -104,20 +110,41 @@ def prompt_for_scores(db_repository: DbRepositorySingleton, sunday_date: str, fr
             print("    Score cannot be negative.")
             continue
 
+        player_id = save_score(db_repository, sunday_date, friday_date, player_tag, score)
+        if player_id is None:
+            print(f"    Failed to create player '{player_tag}'. Skipping.")
+            continue
+
+        print(f"    Saved {player_tag} (ID: {player_id}): {score}")
+        saved.append((player_tag, score, player_id))
+
+    return saved
+
+
+def save_score(db_repository: DbRepositorySingleton, sunday_date: str, friday_date: str, player_tag: str, score: int):
+    """
+    Write one entered score and the weekend's derived values as one transaction, so an error
+    part way through leaves the weekend as it was.
+
+    Returns:
+        The player id, or None if the player couldn't be created
+    """
+    with db_repository.transaction():
         player_id = db_repository.get_player_id(player_tag)
         if player_id is None:
-            print(f"    Player '{player_tag}' not found. Creating new player with start date {friday_date}...")
+            print(f"    Creating new player '{player_tag}' with start date {friday_date}...")
             player_id = db_repository.get_player_id_create_if_new(player_tag, friday_date)
 
         if player_id is None:
-            print(f"    Failed to create player '{player_tag}'. Skipping.")
-            continue
+            return None
 
         db_repository.upsert_weekend_player_score(sunday_date, player_id, score)
-        entries.append((player_tag, score, player_id))
-        print(f"    Saved {player_tag} (ID: {player_id}) score: {score}")
 
-    return entries
+        db_repository.set_missing_scores_to_zero_for_weekend(sunday_date)
+        db_repository.update_ranks_for_weekend_date(sunday_date)
+        db_repository.upsert_weekend_team_score_for_date(sunday_date)
+
+    return player_id
 
 
 def main():
@@ -134,17 +161,12 @@ def main():
             sunday_date = prompt_for_date()
             friday_date = get_friday_date(sunday_date)
 
-            entries = prompt_for_scores(db_repository, sunday_date, friday_date)
+            saved = prompt_for_scores(db_repository, sunday_date, friday_date)
 
-            if entries:
-                print(f"\nSaved {len(entries)} score(s) for {sunday_date}.")
-                for player_tag, score, player_id in entries:
+            if saved:
+                print(f"\nSaved {len(saved)} score(s) for {sunday_date}.")
+                for player_tag, score, player_id in saved:
                     print(f"  {player_tag} (ID: {player_id}): {score}")
-
-                print("\nUpdating derived values...")
-                db_repository.set_missing_scores_to_zero_for_weekend(sunday_date)
-                db_repository.update_ranks_for_weekend_date(sunday_date)
-                db_repository.upsert_weekend_team_score_for_date(sunday_date)
                 print("Done.")
             else:
                 print("\nNo scores entered.")
@@ -154,7 +176,7 @@ def main():
                 break
 
     except KeyboardInterrupt:
-        print("\n\nCancelled.")
+        print("\n\nCancelled. The scores entered before Ctrl+C are saved.")
     finally:
         DbRepositorySingleton.cleanup()
 
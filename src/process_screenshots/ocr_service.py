@@ -0,0 +1,57 @@
+"""
+OCR Service
+===========
+Keeps an EasyOCR reader loaded so import_team_scores.py and import_team_stats.py
+don't pay for loading torch and the model weights on every run.
+
+Usage:
+    python ocr_service.py
+
+The importers use the service when it is running and fall back to in-process OCR otherwise.
+Stop the service with Ctrl+C.
+
+The service listens on a Unix domain socket in ~/.wordscape-ocr, a directory only the user can
+access. Clients authenticate with the ocr_service.authkey from app_keys.json or, when it isn't set,
+with the random key the service writes to ~/.wordscape-ocr/authkey (mode 0600) on first start.
+"""
+
+import logging
+import os
+import sys
+
+# Set up root logger configuration
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+try:
+    from cls_env_config import EnvConfigSingleton as EnvConfig
+    from cls_logging_manager import LoggingManagerSingleton as LoggingManager
+    from cls_ocr_engine import OcrServer
+except ImportError as e:
+    logging.error(f"Error importing required modules: {e}")
+    sys.exit(1)
+
+def main():
+    env_config = EnvConfig()
+
+    ocr_settings = env_config.merged_config.get('ocr_service', {})
+
+    try:
+        logging_manager = LoggingManager(script_dir)
+        logging_manager.setup_default_logging(script_name, console_level=logging.INFO)
+    except Exception as e:
+        logging.exception(f"Error initializing LoggingManager: {e}")
+        sys.exit(1)
+
+    server = OcrServer(**ocr_settings)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nOCR service stopped.")
+
+if __name__ == "__main__":
+    # Get the script name without the extension
+    script_name = os.path.splitext(os.path.basename(__file__))[0]
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    main()
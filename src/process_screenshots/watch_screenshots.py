@@ -0,0 +1,205 @@
+"""
+Watch Screenshots
+=================
+Long-running ingest mode for import_team_scores.py and import_team_stats.py. Watches the
+tournament_images_folder and team_images_folder and imports each new screenshot within
+seconds of it landing, instead of waiting for a batch run.
+
+Usage:
+    python watch_screenshots.py [--poll-seconds N] [--settle-seconds N] [--batch-seconds N] [--queue-size N]
+
+Workflow:
+    1. A watcher thread polls both folders and queues each PNG once its size and modification
+       time have stopped changing, so files still being exported aren't read half written.
+    2. The queue is bounded, the watcher waits when the importers fall behind.
+    3. The main thread takes the screenshots that arrived together as one batch and imports them
+       with the importer for their folder, committing each weekend as it goes. The OCR worker
+       processes are started once and reused for every batch.
+
+Screenshots left in the folders by a batch (unmatched text, inactive players) are picked up
+again only when they change. The players are reloaded before each batch when another process
+has changed them. Stop with Ctrl+C.
+"""
+
+import argparse
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+# Set up root logger configuration
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+try:
+    from cls_env_config import EnvConfigSingleton as EnvConfig
+    from cls_env_tools import EnvTools
+    from cls_folder_watcher import FolderWatcher
+    from cls_logging_manager import LoggingManagerSingleton as LoggingManager
+
+    import import_team_scores
+    import import_team_stats
+except ImportError as e:
+    logging.error(f"Error importing required modules: {e}")
+    sys.exit(1)
+
+def watch_folders(watcher: FolderWatcher, file_queue: queue.Queue, poll_seconds: float, stop_event: threading.Event):
+    """
+    Watcher thread: queue each screenshot as it settles, waiting while the queue is full.
+    """
+    for path in watcher.watch(poll_seconds, stop_event):
+        queued_at = time.time()
+        while not stop_event.is_set():
+            try:
+                file_queue.put((path, queued_at), timeout=1.0)
+                break
+            except queue.Full:
+                continue
+
+def next_batch(file_queue: queue.Queue, batch_seconds: float, max_files: int) -> list:
+    """
+    Wait for the next screenshot, then collect the ones that arrive within batch_seconds of it so the
+    screenshots of one capture series are imported together.
+
+    Returns:
+        List of (path, queued_at)
+    """
+    batch = [file_queue.get()]
+
+    deadline = time.monotonic() + batch_seconds
+    while len(batch) < max_files:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(file_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+
+    return batch
+
+def import_batch(batch: list, folders: dict, importers: dict):
+    """
+    Import a batch of screenshots with the importer for the folder each one is in.
+    """
+    # Players added or changed by another process since the last batch, e.g. with manage_team_players.py
+    try:
+        import_team_scores.refresh_known_player_tags()
+    except Exception as e:
+        logging.exception(f"Error reloading the players: {e}")
+
+    for name, folder in folders.items():
+        batch_files = [path for path, queued_at in batch if os.path.dirname(os.path.abspath(path)) == folder]
+        if not batch_files:
+            continue
+
+        logging.info(f"Importing {len(batch_files)} {name} screenshots . . .")
+        try:
+            importers[name](batch_files)
+        except Exception as e:
+            logging.exception(f"Error importing {name} screenshots: {e}")
+
+    oldest = min(queued_at for path, queued_at in batch)
+    logging.info(f"Batch of {len(batch)} screenshots done {time.time() - oldest:.1f} seconds after the first was queued")
+
+def parse_arguments(constants: dict):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Watch the screenshot folders and import new screenshots as they land.")
+    parser.add_argument("--poll-seconds", type=float, default=constants.get('watch_poll_seconds', 2.0),
+                        help="Seconds between scans of the folders")
+    parser.add_argument("--settle-seconds", type=float, default=constants.get('watch_settle_seconds', 3.0),
+                        help="Seconds a file must stay unchanged before it is imported")
+    parser.add_argument("--batch-seconds", type=float, default=constants.get('watch_batch_seconds', 2.0),
+                        help="Seconds to wait for more screenshots after the first one of a batch")
+    parser.add_argument("--queue-size", type=int, default=constants.get('watch_queue_size', 64),
+                        help="Maximum screenshots waiting to be imported")
+    return parser.parse_args()
+
+def main():
+    env_config = EnvConfig()
+    constants = env_config.merged_config['constants']
+
+    args = parse_arguments(constants)
+
+    repo_root = EnvTools.find_repo_root()
+
+    def repo_path(path_config):
+        return path_config.replace("{repo_root}", str(repo_root)) if path_config else None
+
+    db_path = repo_path(constants['db_path'])
+    folders = {
+        'tournament': os.path.abspath(repo_path(constants['tournament_images_folder'])),
+        'team': os.path.abspath(repo_path(constants['team_images_folder'])),
+    }
+
+    # Same settings as the batch importers
+    ocr_workers = int(constants.get('ocr_workers', 1))
+    ocr_settings = env_config.merged_config.get('ocr_service', {})
+    fast_path = bool(constants.get('ocr_fast_path', False))
+    ocr_cache_settings = {
+        'cache_path': repo_path(constants.get('ocr_cache_path')),
+        'max_mb': constants.get('ocr_cache_max_mb', 256),
+    }
+    layout_cache_path = repo_path(constants.get('layout_cache_path'))
+    ocr_journal_path = repo_path(constants.get('ocr_journal_path'))
+    escalation = {
+        'min_confidence': float(constants.get('ocr_escalation_min_confidence', import_team_scores.ESCALATION_MIN_CONFIDENCE)),
+        'scale': float(constants.get('ocr_escalation_scale', import_team_scores.ESCALATION_SCALE)),
+        'tier1_mag_ratio': constants.get('ocr_tier1_mag_ratio', import_team_scores.TIER1_MAG_RATIO),
+    }
+    decode_workers = int(constants.get('decode_workers', 2))
+    pipeline_queue_size = int(constants.get('pipeline_queue_size', 8))
+    db_pool_size = constants.get('db_pool_size')
+
+    try:
+        logging_manager = LoggingManager(script_dir)
+        logging_manager.setup_default_logging(script_name, console_level=logging.INFO)
+    except Exception as e:
+        logging.exception(f"Error initializing LoggingManager: {e}")
+        sys.exit(1)
+
+    import_team_scores.init_importer(db_path, ocr_settings, ocr_cache_settings, fast_path, layout_cache_path, escalation,
+                                     ocr_journal_path, db_pool_size)
+    import_team_stats.init_importer(db_path, ocr_settings, ocr_cache_settings['cache_path'], ocr_cache_settings['max_mb'],
+                                    layout_cache_path)
+
+    # The OCR workers load EasyOCR once and stay up for every batch
+    executor = import_team_scores.create_ocr_executor(ocr_workers, ocr_settings, ocr_cache_settings, layout_cache_path)
+
+    importers = {
+        'tournament': lambda files: import_team_scores.process_img_files(files, executor=executor, decode_workers=decode_workers,
+                                                                         pipeline_queue_size=pipeline_queue_size),
+        'team': import_team_stats.process_img_files,
+    }
+
+    watcher = FolderWatcher(folders.values(), settle_seconds=args.settle_seconds)
+    file_queue = queue.Queue(maxsize=args.queue_size)
+    stop_event = threading.Event()
+
+    watcher_thread = threading.Thread(target=watch_folders, args=(watcher, file_queue, args.poll_seconds, stop_event),
+                                      name="folder-watcher", daemon=True)
+    watcher_thread.start()
+
+    print(f"Watching {folders['tournament']} and {folders['team']}, press Ctrl+C to stop.")
+
+    try:
+        while True:
+            import_batch(next_batch(file_queue, args.batch_seconds, args.queue_size), folders, importers)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        stop_event.set()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+        ocr_engine = import_team_scores.ocr_engine
+        if ocr_engine is not None and ocr_engine.cache is not None:
+            ocr_engine.cache.log_stats()
+
+if __name__ == "__main__":
+    # Get the script name without the extension
+    script_name = os.path.splitext(os.path.basename(__file__))[0]
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark remove_everything_but_white
+=====================================
+Compares the vectorized ImageTools.remove_everything_but_white with the original
+per-pixel loop on the sample screenshots and checks both produce the same image.
+
+Usage:
+    python benchmark_remove_white.py [--images DIR] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from PIL import Image
+
+try:
+    from cls_img_tools import ImageTools
+    from cls_project_tools import ProjectTools
+except ImportError as e:
+    print(f"Error importing required modules: {e}")
+    sys.exit(1)
+
+SAMPLES_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'images', 'png_samples'))
+
+def remove_everything_but_white_loop(image, threshold=250):
+    """
+    The original per-pixel implementation, kept here as the baseline.
+    """
+    image = image.convert("RGB")
+
+    output_image = Image.new("RGB", image.size, (0, 0, 0))
+
+    pixels = image.load()
+    output_pixels = output_image.load()
+
+    for y in range(image.height):
+        for x in range(image.width):
+            r, g, b = pixels[x, y]
+            if r > threshold and g > threshold and b > threshold:
+                output_pixels[x, y] = (255, 255, 255)
+            else:
+                output_pixels[x, y] = (0, 0, 0)
+
+    return output_image
+
+def time_call(function, image, repeat: int) -> float:
+    """
+    Return the best time of repeat calls in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(image)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def parse_arguments():
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark remove_everything_but_white on the sample PNGs.")
+    parser.add_argument("--images", default=SAMPLES_PATH, help="Folder of PNGs, searched recursively")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of the vectorized version per image, the best is reported")
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+
+    img_files = sorted(ProjectTools.get_img_files(args.images, recursive=True))
+    if not img_files:
+        print(f"No PNGs found under {args.images}")
+        return
+
+    total_loop = 0.0
+    total_vectorized = 0.0
+
+    print(f"{'Image':<45} {'Size':>11} {'Loop (s)':>9} {'Array (s)':>10} {'Speedup':>8}")
+    for img_file in img_files:
+        image = Image.open(img_file)
+        image.load()
+
+        # The loop is slow enough that one run is representative
+        loop_seconds = time_call(remove_everything_but_white_loop, image, 1)
+        vectorized_seconds = time_call(ImageTools.remove_everything_but_white, image, args.repeat)
+
+        expected = np.asarray(remove_everything_but_white_loop(image))
+        actual = np.asarray(ImageTools.remove_everything_but_white(image))
+        if not np.array_equal(expected, actual):
+            print(f"Mismatch for {img_file}")
+
+        total_loop += loop_seconds
+        total_vectorized += vectorized_seconds
+
+        name = os.path.relpath(img_file, args.images)
+        size = f"{image.width}x{image.height}"
+        print(f"{name:<45} {size:>11} {loop_seconds:>9.3f} {vectorized_seconds:>10.4f} {loop_seconds / vectorized_seconds:>7.0f}x")
+
+    print(f"\nTotal: loop {total_loop:.2f} s, vectorized {total_vectorized:.3f} s ({total_loop / total_vectorized:.0f}x faster)")
+
+if __name__ == "__main__":
+    main()
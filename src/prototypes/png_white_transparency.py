@@ -1,4 +1,6 @@
 from PIL import Image, ImageOps
+import cv2
+import numpy as np
 import os
 
 def has_transparency(image):
@@ -20,37 +22,28 @@ def has_transparency(image):
         return True
     return False
 
-def remove_everything_but_white(image, threshold=250):
+def remove_everything_but_white(image, threshold=250, as_array=False):
     """
     Remove everything but white from an image.
 
     Args:
         image (PIL.Image.Image): The image to process.
-        threshold (int): Brightness threshold for white (0-255). Defaults to 200.
+        threshold (int): Brightness threshold for white (0-255). Defaults to 250.
+        as_array (bool): Return the RGB NumPy array instead of a PIL image.
 
     Returns:
-        PIL.Image.Image: The processed image with only white pixels retained.
+        PIL.Image.Image: The processed image with only white pixels retained (an RGB array when as_array is True).
     """
-    # Ensure the image is in RGB mode
-    image = image.convert("RGB")
+    # Convert to a NumPy array once, in RGB mode
+    pixels = np.asarray(image.convert("RGB"))
 
-    # Create a new image for the output
-    output_image = Image.new("RGB", image.size, (0, 0, 0))  # Black background
+    # A pixel is "white" when all channels are above the threshold, inRange builds that mask in one pass
+    mask = cv2.inRange(pixels, (threshold + 1,) * 3, (255,) * 3)
 
-    # Process each pixel
-    pixels = image.load()
-    output_pixels = output_image.load()
+    # Keep white, set everything else to black
+    output = cv2.cvtColor(mask, cv2.COLOR_GRAY2RGB)
 
-    for y in range(image.height):
-        for x in range(image.width):
-            r, g, b = pixels[x, y]
-            # Check if the pixel is "white" (all channels above the threshold)
-            if r > threshold and g > threshold and b > threshold:
-                output_pixels[x, y] = (255, 255, 255)  # Keep white
-            else:
-                output_pixels[x, y] = (0, 0, 0)  # Set everything else to black
-
-    return output_image
+    return output if as_array else Image.fromarray(output)
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,172 @@
+"""
+Harvest Digit Glyphs
+====================
+Builds the digit glyph templates used by import_team_scores.py and import_team_stats.py
+to read the rank badge, scores, helps and stars without EasyOCR.
+
+Usage:
+    python harvest_digit_glyphs.py [--tournament-images DIR] [--team-images DIR] [--append]
+
+Workflow:
+    1. Crops the numeric cells (tournament scores and rank badge, team helps and stars)
+       from every screenshot in the folders, defaulting to images/png_samples.
+    2. Reads each cell with EasyOCR and keeps the confident, well formed reads as labels.
+    3. Splits each labelled cell into glyphs and saves them to images/templates/digit_glyphs.npz.
+"""
+
+import argparse
+import cv2
+import logging
+import os
+import sys
+
+import numpy as np
+
+# Set up root logger configuration
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+try:
+    from cls_env_config import EnvConfigSingleton as EnvConfig
+    from cls_glyph_classifier import GlyphClassifier
+    from cls_img_tools import ImageTools
+    from cls_ocr_engine import OcrEngineSingleton as OcrEngine
+    from cls_project_tools import ProjectTools
+except ImportError as e:
+    logging.error(f"Error importing required modules: {e}")
+    sys.exit(1)
+
+REPO_IMAGES = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'images'))
+
+DIGIT_GLYPHS_PATH = os.path.join(REPO_IMAGES, 'templates', 'digit_glyphs.npz')
+
+DIGITS = "0123456789"
+
+# Same crops as import_team_scores.py, in the 1200 px wide image
+SCORE_COLUMN = (650, 900)
+RANK_CROP = (160, 480, 200, 200)
+TOURNAMENT_ROW_BANDS = {'min_height': 20, 'max_height': 60, 'min_gap': 4}
+
+# Same columns as import_team_stats.py: (x, width, threshold, allowlist).
+# The stars column is narrowed to leave out the star icon after each value.
+TEAM_COLUMNS = {
+    'helps': (740, 150, 245, DIGITS),
+    'stars': (890, 220, 245, DIGITS + ","),
+}
+TEAM_ROWS_Y = 600
+TEAM_ROW_BANDS = {'min_height': 15, 'max_height': 60, 'min_gap': 4}
+
+def tournament_cells(file_name: str):
+    """
+    Yield (glyph_img, ocr_img, allowlist, ignore_border) for the score cells and rank badge of a tournament screenshot.
+    """
+    img, new_height = ImageTools.resize_image_opencv(file_name, new_width=1200, grayscale=True)
+
+    players_img = ImageTools.crop_image_opencv(img, 300, 1030, 900, new_height - 1030)
+    players_img = ImageTools.threshold_gray(players_img, 200)
+    for x_min, x_max, y_min, y_max in ImageTools.find_text_cells(players_img, *SCORE_COLUMN, **TOURNAMENT_ROW_BANDS):
+        cell = players_img[y_min:y_max, x_min:x_max]
+        yield cell, cell, DIGITS, False
+
+    # The rank badge is dark text on light, upscaled for EasyOCR the same way the importer does
+    rank_img = ImageTools.isolate_dark_text_opencv(ImageTools.crop_image_opencv(img, *RANK_CROP), threshold=150)
+    rank_ocr_img = cv2.GaussianBlur(cv2.resize(rank_img, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC), (3, 3), 0)
+    yield cv2.bitwise_not(rank_img), rank_ocr_img, "#" + DIGITS, True
+
+def team_cells(file_name: str):
+    """
+    Yield (glyph_img, ocr_img, allowlist, ignore_border) for the helps and stars cells of a team stats screenshot.
+    """
+    img, new_height = ImageTools.resize_image_opencv(file_name, new_width=1200, grayscale=True)
+
+    for x, width, threshold, allowlist in TEAM_COLUMNS.values():
+        column_img = ImageTools.crop_image_opencv(img, x, TEAM_ROWS_Y, width, new_height - TEAM_ROWS_Y)
+        column_img = ImageTools.threshold_gray(column_img, threshold)
+        for x_min, x_max, y_min, y_max in ImageTools.find_text_cells(column_img, 0, width, **TEAM_ROW_BANDS):
+            cell = column_img[y_min:y_max, x_min:x_max]
+            yield cell, cell, allowlist, False
+
+def read_label(ocr_engine: OcrEngine, ocr_img, allowlist: str, min_confidence: float):
+    """
+    Read a cell with EasyOCR, returning the text if it is one confident read made only of allowlist characters.
+    """
+    results = ocr_engine.readtext(ocr_img, allowlist=allowlist, paragraph=False)
+    if len(results) != 1:
+        return None
+
+    box, text, confidence = results[0]
+    text = text.replace(" ", "")
+    if confidence < min_confidence or not text or not set(text) <= set(allowlist):
+        return None
+
+    return text
+
+def limit_per_character(classifier: GlyphClassifier, max_per_character: int) -> GlyphClassifier:
+    """
+    Keep the first max_per_character templates of each character so classification stays fast.
+    """
+    keep = np.concatenate([np.flatnonzero(classifier.labels == character)[:max_per_character]
+                           for character in np.unique(classifier.labels)])
+    keep.sort()
+    return GlyphClassifier(classifier.templates[keep], classifier.labels[keep].tolist())
+
+def parse_arguments():
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Harvest digit glyph templates from screenshots.")
+    parser.add_argument("--tournament-images", default=os.path.join(REPO_IMAGES, 'png_samples', 'weekend_scores'),
+                        help="Folder of tournament screenshots")
+    parser.add_argument("--team-images", default=os.path.join(REPO_IMAGES, 'png_samples', 'team_helps_scores'),
+                        help="Folder of team stats screenshots")
+    parser.add_argument("--output", default=DIGIT_GLYPHS_PATH, help="Glyph template file to write")
+    parser.add_argument("--append", action="store_true", help="Add to the existing templates instead of replacing them")
+    parser.add_argument("--min-confidence", type=float, default=0.9, help="Minimum EasyOCR confidence for a label")
+    parser.add_argument("--max-per-character", type=int, default=40, help="Maximum templates kept per character")
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+
+    env_config = EnvConfig()
+
+    # Uses the OCR service when it is running, otherwise EasyOCR is loaded in this process
+    ocr_engine = OcrEngine(**env_config.merged_config.get('ocr_service', {}))
+
+    classifier = GlyphClassifier.load(args.output) if args.append else None
+    if classifier is None:
+        classifier = GlyphClassifier()
+
+    sources = [(args.tournament_images, tournament_cells), (args.team_images, team_cells)]
+
+    cells_read = 0
+    cells_harvested = 0
+    for images_path, cells in sources:
+        if not os.path.isdir(images_path):
+            logging.warning(f"Skipping missing folder {images_path}")
+            continue
+
+        for image_file in ProjectTools.get_img_files(images_path):
+            logging.info(f"Harvesting {os.path.basename(image_file)} . . .")
+
+            for glyph_img, ocr_img, allowlist, ignore_border in cells(image_file):
+                cells_read += 1
+                text = read_label(ocr_engine, ocr_img, allowlist, args.min_confidence)
+                if text is None:
+                    continue
+
+                if classifier.add_glyphs(glyph_img, text, ignore_border) > 0:
+                    cells_harvested += 1
+                else:
+                    logging.debug(f"Glyph count doesn't match '{text}', skipping cell")
+
+    if len(classifier) == 0:
+        logging.error("No glyphs harvested, the templates were not saved")
+        return
+
+    classifier = limit_per_character(classifier, args.max_per_character)
+    classifier.save(args.output)
+
+    characters = ", ".join(f"'{character}': {count}" for character, count in zip(*np.unique(classifier.labels, return_counts=True)))
+    print(f"Harvested {cells_harvested} of {cells_read} cells into {len(classifier)} templates ({characters})")
+    print(f"Saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -63,16 +63,6 @@ def get_last_scored_weekend(db_conn, player_id: int) -> str | None:
     return row[0] if row and row[0] else None
 
 
-def set_player_off_team_with_date(db_conn, player_id: int, leave_date: str):
-    """Set on_team = 0 and leave_date to a specific date."""
-    cursor = db_conn.cursor()
-    cursor.execute(
-        "UPDATE players SET on_team = 0, leave_date = ? WHERE id = ?",
-        (leave_date, player_id),
-    )
-    db_conn.commit()
-
-
 # ── input collection ─────────────────────────────────────────────────────────
 
 def prompt_for_player_tags() -> list[str]:
@@ -128,49 +118,46 @@ def main():
     print(f"\n  Entered {len(entered_tags)} player(s): {', '.join(entered_tags)}")
     print(f"  Next Friday (for new players): {friday_date}\n")
 
-    # ── reconcile entered tags against the database ──────────────────────
-    added: list[str] = []        # brand-new players
-    reactivated: list[str] = []  # existing players put back on team
-
-    entered_keys: set[str] = set()  # lowercase keys for later comparison
-
-    for tag in entered_tags:
-        entered_keys.add(tag.lower())
-
-        player_id = db_repository.get_player_id(tag)
-
-        if player_id is None:
-            # New player — create with next Friday as start_date
-            db_repository.get_player_id_create_if_new(tag, friday_date)
-            added.append(tag)
-            print(f"  ✚  Added new player '{tag}' (start_date={friday_date})")
-        else:
-            # Player exists — make sure they are on the team
-            # get_team_members returns (id, player_tag, is_active) for on_team=1
-            # We need a quick check whether this player is already on_team
-            cursor = db_conn.cursor()
-            cursor.execute("SELECT on_team FROM players WHERE id = ?", (player_id,))
-            row = cursor.fetchone()
-            if row and row[0] != 1:
-                db_repository.set_player_on_team(player_id)
-                reactivated.append(tag)
-                print(f"  ↺  Reactivated '{tag}' (on_team=1, leave_date cleared)")
-            else:
-                print(f"  ✓  '{tag}' already on team")
+    # The additions and removals are applied as one transaction, a failure part way leaves the roster as it was
+    with db_repository.transaction():
+        # ── reconcile entered tags against the database ──────────────────
+        added: list[str] = []        # brand-new players
+        reactivated: list[str] = []  # existing players put back on team
 
-    # ── deactivate players no longer on the team ─────────────────────────
-    removed: list[tuple[str, str]] = []  # (tag, leave_date)
+        entered_keys: set[str] = set()  # lowercase keys for later comparison
 
-    current_team = db_repository.get_team_members()  # list of (id, player_tag, is_active)
+        for tag in entered_tags:
+            entered_keys.add(tag.lower())
 
-    for player_id, player_tag, _is_active in current_team:
-        if player_tag.lower() not in entered_keys:
-            last_weekend = get_last_scored_weekend(db_conn, player_id)
-            leave_date = last_weekend if last_weekend else date.today().strftime("%Y-%m-%d")
+            player_id = db_repository.get_player_id(tag)
 
-            set_player_off_team_with_date(db_conn, player_id, leave_date)
-            removed.append((player_tag, leave_date))
-            print(f"  ✖  Removed '{player_tag}' (on_team=0, leave_date={leave_date})")
+            if player_id is None:
+                # New player — create with next Friday as start_date
+                db_repository.get_player_id_create_if_new(tag, friday_date)
+                added.append(tag)
+                print(f"  ✚  Added new player '{tag}' (start_date={friday_date})")
+            else:
+                # Player exists — make sure they are on the team
+                if not db_repository.is_player_on_team(player_id):
+                    db_repository.set_player_on_team(player_id)
+                    reactivated.append(tag)
+                    print(f"  ↺  Reactivated '{tag}' (on_team=1, leave_date cleared)")
+                else:
+                    print(f"  ✓  '{tag}' already on team")
+
+        # ── deactivate players no longer on the team ─────────────────────
+        removed: list[tuple[str, str]] = []  # (tag, leave_date)
+
+        current_team = db_repository.get_team_members()  # list of (id, player_tag, is_active)
+
+        for player_id, player_tag, _is_active in current_team:
+            if player_tag.lower() not in entered_keys:
+                last_weekend = get_last_scored_weekend(db_conn, player_id)
+                leave_date = last_weekend if last_weekend else date.today().strftime("%Y-%m-%d")
+
+                db_repository.set_player_off_team(player_id, leave_date)
+                removed.append((player_tag, leave_date))
+                print(f"  ✖  Removed '{player_tag}' (on_team=0, leave_date={leave_date})")
 
     # ── summary ──────────────────────────────────────────────────────────
     print("\n── Summary ─────────────────────────────────────")
@@ -1,11 +1,11 @@
 import json
 import logging
 import os
-import sqlite3
 import sys
 
 try:
     from cls_env_tools import EnvTools
+    from cls_sqlite_tools import SqliteTools
 
 except ImportError as e:
     logging.error(f"Error importing required modules: {e}")
@@ -21,7 +21,7 @@ def generate_alltime_highlights(db_path, json_path):
       - Top 5 highest individual player scores in a single weekend
       - Top 3 weekend score averages for active players (on_team=1, min 5 weekends played)
     """
-    conn = sqlite3.connect(db_path)
+    conn = SqliteTools.connect(db_path, "report")
     c = conn.cursor()
 
     # --- Top 5 highest team weekend scores ---
@@ -1,11 +1,11 @@
 import json
 import logging
 import os
-import sqlite3
 import sys
 
 try:
     from cls_env_tools import EnvTools
+    from cls_sqlite_tools import SqliteTools
 
 except ImportError as e:
     logging.error(f"Error importing required modules: {e}")
@@ -18,7 +18,7 @@ def create_json_files():
     db_path = os.path.join(env_tools.find_repo_root(), 'player_metrics.db')
     print(db_path)
 
-    conn = sqlite3.connect(db_path)
+    conn = SqliteTools.connect(db_path, "report")
 
     json_folder = os.path.join(env_tools.find_repo_root(),'docs')
 
@@ -2,12 +2,12 @@ import json
 import logging
 import os
 import sys
-import sqlite3
 
 from datetime import datetime, timedelta
 
 try:
     from cls_env_tools import EnvTools
+    from cls_sqlite_tools import SqliteTools
 
 except ImportError as e:
     logging.error(f"Error importing required modules: {e}")
@@ -54,7 +54,7 @@ def generate_weekend_report(db_path, json_path, weekend_date=None):
       - A JSON string containing the report.
     """
 
-    conn = sqlite3.connect(db_path)
+    conn = SqliteTools.connect(db_path, "report")
     c = conn.cursor()
 
     # Determine recent weekend_date if not provided.
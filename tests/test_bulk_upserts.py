@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "__workspace_packages__"))
+
+from cls_db_tools import DbRepositorySingleton
+
+SCORES_SCHEMA = """
+    CREATE TABLE tournament_results (weekend_date TEXT NOT NULL, player_id INTEGER NOT NULL, score INTEGER NOT NULL, rank INTEGER);
+    CREATE UNIQUE INDEX uix_tournament_results ON tournament_results (weekend_date ASC, player_id);
+    CREATE TABLE weekly_player_stats (weekend_date TEXT NOT NULL, player_id INTEGER NOT NULL, helps INTEGER NOT NULL DEFAULT (0), stars INTEGER);
+    CREATE UNIQUE INDEX uix_weekly_player_stats ON weekly_player_stats (weekend_date, player_id);
+"""
+
+WEEKEND = "2025-08-03"
+
+@pytest.fixture
+def db_repository():
+    DbRepositorySingleton.cleanup()
+    repository = DbRepositorySingleton(":memory:")
+    repository.connection.executescript(SCORES_SCHEMA)
+    yield repository
+    DbRepositorySingleton.cleanup()
+
+def test_same_ocr_score_is_unchanged(db_repository):
+    assert db_repository.bulk_upsert_weekend_player_scores(WEEKEND, [(1, "1234")]) == [DbRepositorySingleton.ROW_INSERTED]
+    assert db_repository.bulk_upsert_weekend_player_scores(WEEKEND, [(1, "1234")]) == [DbRepositorySingleton.ROW_UNCHANGED]
+    assert db_repository.bulk_upsert_weekend_player_scores(WEEKEND, [(1, "1,234")]) == [DbRepositorySingleton.ROW_UNCHANGED]
+    assert db_repository.bulk_upsert_weekend_player_scores(WEEKEND, [(1, "1300")]) == [DbRepositorySingleton.ROW_UPDATED]
+
+    score = db_repository.connection.execute("SELECT score, typeof(score) FROM tournament_results").fetchone()
+    assert score == (1300, "integer")
+
+def test_zero_score_keeps_existing_score(db_repository):
+    db_repository.bulk_upsert_weekend_player_scores(WEEKEND, [(1, "2500")])
+
+    assert db_repository.bulk_upsert_weekend_player_scores(WEEKEND, [(1, 0)]) == [DbRepositorySingleton.ROW_UNCHANGED]
+    assert db_repository.connection.execute("SELECT score FROM tournament_results").fetchone() == (2500,)
+
+def test_same_ocr_stats_are_unchanged(db_repository):
+    assert db_repository.bulk_upsert_weekly_player_stats(WEEKEND, [(1, "12", "3,456"), (2, 0, "10")]) == \
+        [DbRepositorySingleton.ROW_INSERTED, DbRepositorySingleton.ROW_INSERTED]
+    assert db_repository.bulk_upsert_weekly_player_stats(WEEKEND, [(1, "12", "3456"), (2, "0", "11")]) == \
+        [DbRepositorySingleton.ROW_UNCHANGED, DbRepositorySingleton.ROW_UPDATED]
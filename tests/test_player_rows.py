@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "__workspace_packages__"))
+sys.path.insert(0, os.path.join(REPO_ROOT, "src", "process_screenshots"))
+
+import import_team_scores
+
+SAMPLES_DIR = os.path.join(REPO_ROOT, "images", "png_samples", "weekend_scores")
+
+# Player rows fully on screen in each sample, the reduced copies are the same screenshots at a quarter of the size
+SAMPLE_ROWS = {
+    "2025-08-03_22-31_01.png": 6,
+    "IMG_1167.PNG": 6,  # butterfly's "Not Participating" line is its own row
+    "IMG_1167_reduced.png": 6,
+    "IMG_5981.PNG": 6,  # The avatars touch the tags of chibong and Murphy
+    "IMG_5981_reduced.png": 6,
+    "IMG_5984.PNG": 6,
+    "IMG_5984_reduced.png": 6,
+    "IMG_6324.PNG": 7,
+    "IMG_6324_reduced.png": 7,
+}
+
+@pytest.mark.parametrize("file_name, row_count", SAMPLE_ROWS.items())
+def test_find_player_rows(file_name, row_count):
+    players_img = import_team_scores.preprocess_image(os.path.join(SAMPLES_DIR, file_name))['players_img']
+
+    rows = import_team_scores.find_player_rows(players_img)
+
+    assert len(rows) == row_count
+
+def test_tag_cells_skip_avatars():
+    players_img = import_team_scores.preprocess_image(os.path.join(SAMPLES_DIR, "IMG_5981.PNG"))['players_img']
+
+    tag_cells, score_cells = import_team_scores.find_row_cells(players_img)
+
+    # Each tag pairs with the score on the same line, the avatar above it isn't a row of its own
+    assert len(tag_cells) == 6
+    for x_min, x_max, y_min, y_max in tag_cells:
+        assert any(abs((y_min + y_max) / 2 - (cell[2] + cell[3]) / 2) <= 10 for cell in score_cells)
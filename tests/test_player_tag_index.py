@@ -0,0 +1,70 @@
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "__workspace_packages__"))
+
+from cls_db_tools import DbRepositorySingleton, player_tag_key
+
+PLAYERS_SCHEMA = """
+    CREATE TABLE players (id INTEGER PRIMARY KEY AUTOINCREMENT, player_tag TEXT NOT NULL UNIQUE,
+        on_team INTEGER NOT NULL DEFAULT (0) CHECK (on_team IN (0, 1)), is_active INTEGER NOT NULL DEFAULT (0) CHECK (is_active IN (0, 1)),
+        start_date TEXT NOT NULL DEFAULT CURRENT_DATE, leave_date TEXT);
+    CREATE INDEX idx_player_tag ON players (player_tag);
+"""
+
+MIGRATION_SCRIPT = os.path.join(REPO_ROOT, "SQLite-Scripts", "Migrate_Player_Tag_Index.sql")
+
+def migrate(repository):
+    with open(MIGRATION_SCRIPT, encoding="utf-8") as f:
+        repository.connection.executescript(f.read())
+
+@pytest.fixture
+def db_repository():
+    DbRepositorySingleton.cleanup()
+    repository = DbRepositorySingleton(":memory:")
+    repository.connection.executescript(PLAYERS_SCHEMA)
+    repository.connection.executemany("INSERT INTO players (player_tag, on_team, is_active) VALUES (?, 1, 1)",
+                                      [("Hobbes",), ("Straße",), ("Émile",)])
+    yield repository
+    DbRepositorySingleton.cleanup()
+
+def test_player_tag_lookup_scans_before_migration(db_repository):
+    db_repository.load_player_directory()
+
+    assert not db_repository.uses_player_tag_index()
+
+def test_player_tag_lookup_uses_index_after_migration(db_repository):
+    migrate(db_repository)
+
+    assert db_repository.uses_player_tag_index()
+    assert any("SEARCH" in detail for detail in db_repository.explain_player_tag_lookup())
+
+    indexes = {row[0] for row in db_repository.connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert DbRepositorySingleton.PLAYER_TAG_INDEX in indexes
+    assert "idx_player_tag" not in indexes
+
+def test_directory_load_is_read_only(db_repository):
+    db_repository.connection.execute("PRAGMA query_only = ON")
+
+    assert db_repository.find_player("hobbes") is not None
+
+def test_directory_matches_nocase(db_repository):
+    migrate(db_repository)
+    db_repository.load_player_directory()
+
+    for player_tag in ("HOBBES", "hobbes", "Straße", "STRAßE", "Émile", "éMILE", "ÉMILE", "STRASSE", "émile"):
+        in_directory = db_repository.find_player(player_tag) is not None
+        in_index = db_repository.connection.execute(DbRepositorySingleton.PLAYER_TAG_LOOKUP, (player_tag,)).fetchone() is not None
+        assert in_directory == in_index, player_tag
+
+    assert player_tag_key("STRAßE") == player_tag_key("straße") != player_tag_key("STRASSE")
+
+def test_ensure_players_agrees_with_index(db_repository):
+    migrate(db_repository)
+    players = db_repository.ensure_players(["HOBBES", "émile", "STRASSE"], "2025-08-01")
+
+    assert [created for player_id, on_team, is_active, created in players] == [False, True, True]
+    assert db_repository.connection.execute("SELECT count(*) FROM players").fetchone()[0] == 5
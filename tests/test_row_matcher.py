@@ -0,0 +1,85 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "__workspace_packages__"))
+
+from cls_row_matcher import RowMatcher
+
+def ocr_item(text, y, height=20):
+    """
+    An EasyOCR (box, text, confidence) item whose box is centred on y.
+    """
+    top, bottom = y - height / 2, y + height / 2
+    return ([[0, top], [100, top], [100, bottom], [0, bottom]], text, 0.99)
+
+def texts(items):
+    return [item[1] if item is not None else None for item in items]
+
+def test_values_go_to_the_nearest_row():
+    rows = [ocr_item("alice", 100), ocr_item("bob", 200), ocr_item("carol", 300)]
+    values = [ocr_item("3000", 305), ocr_item("1000", 92), ocr_item("2000", 210)]
+
+    row_values, unmatched = RowMatcher.assign(rows, values, max_distance=40)
+
+    assert texts(row_values) == ["1000", "2000", "3000"]
+    assert unmatched == []
+
+def test_rows_out_of_order_keep_their_positions():
+    rows = [ocr_item("carol", 300), ocr_item("alice", 100), ocr_item("bob", 200)]
+    values = [ocr_item("1000", 100), ocr_item("3000", 300)]
+
+    row_values, unmatched = RowMatcher.assign(rows, values, max_distance=40)
+
+    assert texts(row_values) == ["3000", "1000", None]
+    assert unmatched == []
+
+def test_values_beyond_max_distance_are_unmatched():
+    rows = [ocr_item("alice", 100), ocr_item("bob", 200)]
+    values = [ocr_item("1000", 140), ocr_item("2000", 239), ocr_item("9999", 500)]
+
+    row_values, unmatched = RowMatcher.assign(rows, values, max_distance=39)
+
+    assert texts(row_values) == [None, "2000"]
+    assert texts(unmatched) == ["1000", "9999"]
+
+def test_value_at_exactly_max_distance_is_matched():
+    rows = [ocr_item("alice", 100)]
+
+    row_values, unmatched = RowMatcher.assign(rows, [ocr_item("1000", 140)], max_distance=40)
+
+    assert texts(row_values) == ["1000"]
+    assert unmatched == []
+
+def test_nearer_value_wins_a_contested_row():
+    rows = [ocr_item("alice", 100), ocr_item("bob", 300)]
+    values = [ocr_item("far", 130), ocr_item("near", 105)]
+
+    row_values, unmatched = RowMatcher.assign(rows, values, max_distance=40)
+
+    assert texts(row_values) == ["near", None]
+    assert texts(unmatched) == ["far"]
+
+def test_tied_values_keep_the_first_one_from_the_top():
+    rows = [ocr_item("alice", 100), ocr_item("bob", 300)]
+    values = [ocr_item("below", 110), ocr_item("above", 90)]
+
+    row_values, unmatched = RowMatcher.assign(rows, values, max_distance=40)
+
+    assert texts(row_values) == ["above", None]
+    assert texts(unmatched) == ["below"]
+
+def test_value_halfway_between_rows_goes_to_the_upper_row():
+    rows = [ocr_item("alice", 100), ocr_item("bob", 200)]
+
+    row_values, unmatched = RowMatcher.assign(rows, [ocr_item("1000", 150)], max_distance=60)
+
+    assert texts(row_values) == ["1000", None]
+    assert unmatched == []
+
+def test_no_rows_leaves_every_value_unmatched():
+    values = [ocr_item("1000", 100)]
+
+    row_values, unmatched = RowMatcher.assign([], values, max_distance=40)
+
+    assert row_values == []
+    assert texts(unmatched) == ["1000"]
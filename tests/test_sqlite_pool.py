@@ -0,0 +1,124 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "__workspace_packages__"))
+
+from cls_db_tools import DbRepositorySingleton
+from cls_sqlite_pool import SqliteConnectionPool
+
+READER_THREADS = 6
+WRITES = 200
+
+def run_concurrently(writer, reader):
+    """
+    Run one writer thread and READER_THREADS reader threads until the writer is done, return the errors they raised.
+    """
+    writer_done = threading.Event()
+    errors = []
+
+    def guarded(target):
+        def run():
+            try:
+                target(writer_done)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                if target is writer:
+                    writer_done.set()
+        return run
+
+    threads = [threading.Thread(target=guarded(writer))] + \
+              [threading.Thread(target=guarded(reader)) for _ in range(READER_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    assert not any(thread.is_alive() for thread in threads)
+    return errors
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SqliteConnectionPool(str(tmp_path / "pool.db"), max_readers=3, timeout=10.0)
+    with pool.writer() as connection:
+        connection.execute("CREATE TABLE counter (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)")
+        connection.commit()
+    yield pool
+    pool.close()
+
+def test_readers_see_committed_writes(pool):
+    def writer(writer_done):
+        for value in range(1, WRITES + 1):
+            with pool.writer() as connection:
+                connection.execute("INSERT INTO counter (value) VALUES (?)", (value,))
+                connection.commit()
+
+    def reader(writer_done):
+        seen = 0
+        while True:
+            finished = writer_done.is_set()
+            count, = pool.reader().execute("SELECT count(*) FROM counter").fetchone()
+            # Each read sees a committed snapshot that never goes back in time
+            assert count >= seen
+            seen = count
+            if finished:
+                break
+        assert seen == WRITES
+        pool.release_reader()
+
+    # More reader threads than read connections, so the threads also wait for released connections
+    assert run_concurrently(writer, reader) == []
+
+def test_readers_dont_see_uncommitted_writes(pool):
+    with pool.writer() as connection:
+        connection.execute("INSERT INTO counter (value) VALUES (1)")
+
+        read_count = []
+        thread = threading.Thread(target=lambda: read_count.append(pool.reader().execute("SELECT count(*) FROM counter").fetchone()[0]))
+        thread.start()
+        thread.join()
+        assert read_count == [0]
+
+        connection.commit()
+
+    assert pool.reader().execute("SELECT count(*) FROM counter").fetchone()[0] == 1
+
+def test_read_connections_are_query_only(pool):
+    with pytest.raises(Exception, match="readonly"):
+        pool.reader().execute("INSERT INTO counter (value) VALUES (1)")
+
+@pytest.fixture
+def pooled_repository(tmp_path):
+    DbRepositorySingleton.cleanup()
+    repository = DbRepositorySingleton(str(tmp_path / "player_metrics.db"), pool_size=3)
+    with repository.transaction():
+        repository.connection.execute("""
+            CREATE TABLE tournament_results (weekend_date TEXT NOT NULL, player_id INTEGER NOT NULL, score INTEGER NOT NULL, rank INTEGER)
+        """)
+        repository.connection.execute("CREATE UNIQUE INDEX uix_tournament_results ON tournament_results (weekend_date ASC, player_id)")
+    yield repository
+    DbRepositorySingleton.cleanup()
+
+def test_pooled_repository_readers_and_writer(pooled_repository):
+    def writer(writer_done):
+        for player_id in range(1, WRITES + 1):
+            pooled_repository.bulk_upsert_weekend_player_scores("2025-08-03", [(player_id, str(player_id * 10))])
+
+    def reader(writer_done):
+        seen = 0
+        while True:
+            finished = writer_done.is_set()
+            count, total = pooled_repository.connection.execute("SELECT count(*), coalesce(sum(score), 0) FROM tournament_results").fetchone()
+            assert count >= seen
+            # Every committed row is complete
+            assert total == 10 * count * (count + 1) // 2
+            seen = count
+            if finished:
+                break
+        assert seen == WRITES
+        pooled_repository.release_reader()
+
+    assert run_concurrently(writer, reader) == []